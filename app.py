@@ -1,4 +1,5 @@
-from components.db import init_db, update_db_schema
+from components.db import init_db, update_db_schema, maybe_compact_check_history
+from components.metrics import start_metrics_server
 from components.ui import render_ui
 import streamlit as st
 from datetime import datetime
@@ -14,6 +15,9 @@ st.set_page_config(
 # Initialize the app and update schema if needed
 init_db()
 update_db_schema()
+maybe_compact_check_history()
+# Prometheus /metrics for this server process (once; see components/metrics.py)
+start_metrics_server()
 
 # Initialize session state
 if 'refresh_counter' not in st.session_state:
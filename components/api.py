@@ -0,0 +1,229 @@
+"""
+Read-only JSON API over the local store, for tools that used to scrape the dashboard.
+
+Serves the last persisted dashboard snapshot, alerts and table history. Every
+response carries an ETag derived from cheap store version markers, so a poller that
+sends If-None-Match gets an empty 304 when nothing changed. Requests only read the
+local SQLite store and never query SQL Server. Run from the repository root:
+
+    python -m components.api --port 8765
+
+Endpoints:
+- GET /api/snapshot   tables and jobs of the last collection
+- GET /api/tables     tables only
+- GET /api/jobs       jobs only
+- GET /api/alerts     page_size, cursor_time + cursor_id, alert_type, source_type,
+                      status, hours_back, source_prefix
+- GET /api/history    db, table, hours (default 24), max_points (default 500)
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from components.db import (
+    init_db, update_db_schema, load_dashboard_snapshot, get_alerts_page, get_store_versions
+)
+from components.snapshot import json_safe
+from components.trends import get_table_trends, MAX_TREND_POINTS
+
+DEFAULT_PORT = 8765
+# Responses over a time window relative to now are revalidated this often
+TIME_WINDOW_SECONDS = 60
+# Rendered bodies kept per distinct request; reset when it grows past this
+MAX_CACHED_RESPONSES = 256
+
+_responses = {}
+_responses_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Serialize numpy scalars and timestamps"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _param(params, name, default=None, cast=str):
+    values = params.get(name)
+    if not values or values[0] == "":
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ApiError(400, f"Invalid value for {name}: {values[0]!r}")
+
+
+def _snapshot_body(sections):
+    snapshot = load_dashboard_snapshot()
+    if snapshot is None:
+        raise ApiError(503, "No snapshot has been collected yet")
+    body = {"version": snapshot["version"], "collected_at": snapshot["collected_at"]}
+    if "tables" in sections:
+        body["tables"] = snapshot["table_results"]
+    if "jobs" in sections:
+        body["jobs"] = snapshot["job_results"]
+    return body
+
+
+def _alerts_body(params):
+    cursor = None
+    cursor_time = _param(params, "cursor_time")
+    if cursor_time is not None:
+        cursor = (cursor_time, _param(params, "cursor_id", 0, int))
+    alerts, next_cursor = get_alerts_page(
+        page_size=min(_param(params, "page_size", 50, int), 1000),
+        cursor=cursor,
+        alert_type=_param(params, "alert_type"),
+        source_type=_param(params, "source_type"),
+        status=_param(params, "status"),
+        hours_back=_param(params, "hours_back", None, int),
+        source_prefix=_param(params, "source_prefix"))
+    return {
+        "alerts": alerts.to_dict("records"),
+        "next_cursor": ({"cursor_time": next_cursor[0], "cursor_id": next_cursor[1]}
+                        if next_cursor else None),
+    }
+
+
+def _history_body(params):
+    db_name = _param(params, "db")
+    table_name = _param(params, "table")
+    if not db_name or not table_name:
+        raise ApiError(400, "db and table are required")
+    row_counts, sizes = get_table_trends(
+        db_name, table_name,
+        hours_back=_param(params, "hours", 24, int),
+        max_points=max(3, min(_param(params, "max_points", MAX_TREND_POINTS, int), 5000)))
+    return {
+        "db": db_name,
+        "table": table_name,
+        "row_counts": row_counts.assign(check_time=row_counts["check_time"].astype(str))
+                                .to_dict("records"),
+        "sizes": sizes.assign(check_time=sizes["check_time"].astype(str)).to_dict("records"),
+    }
+
+
+# path -> (version marker it depends on, body builder)
+ROUTES = {
+    "/api/snapshot": ("snapshot", lambda params: _snapshot_body({"tables", "jobs"})),
+    "/api/tables": ("snapshot", lambda params: _snapshot_body({"tables"})),
+    "/api/jobs": ("snapshot", lambda params: _snapshot_body({"jobs"})),
+    "/api/alerts": ("alerts", _alerts_body),
+    "/api/history": ("checks", _history_body),
+}
+
+
+def etag_for(path, query):
+    """ETag of a request: the store version its data depends on, plus the query"""
+    if path not in ROUTES:
+        raise ApiError(404, f"Unknown endpoint {path}")
+    marker = ROUTES[path][0]
+    version = get_store_versions()[marker]
+    # "Last N hours" results drift as time passes even when nothing is written
+    if marker == "checks" or "hours_back=" in query:
+        version = f"{version}-{int(time.time() // TIME_WINDOW_SECONDS)}"
+    return f'"{marker}-{version}-{zlib.crc32(query.encode("utf-8")):08x}"'
+
+
+def render(path, query, etag):
+    """Body bytes of a request, reused while its ETag is unchanged"""
+    key = (path, query)
+    with _responses_lock:
+        cached = _responses.get(key)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+
+    build = ROUTES[path][1]
+    # Snapshots persisted before missing values were mapped to None may still hold NaN;
+    # allow_nan=False makes any that slip through fail loudly instead of emitting NaN
+    body = json.dumps(json_safe(build(parse_qs(query))), default=_json_default,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
+    with _responses_lock:
+        if len(_responses) >= MAX_CACHED_RESPONSES:
+            _responses.clear()
+        _responses[key] = (etag, body)
+    return body
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "SQLMonitorAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            # The ETag is known before any body is built, so unchanged data costs
+            # one version lookup
+            etag = etag_for(url.path, url.query)
+            if_none_match = self.headers.get("If-None-Match", "")
+            if etag in [t.strip() for t in if_none_match.split(",")]:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = render(url.path, url.query, etag)
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"Error serving {self.path}: {str(e)}")
+            self._send_json(500, {"error": "Internal error"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # Clients may keep the body but must revalidate it before use
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    print(f"Serving SQL Monitor API on http://{host}:{port}/api/snapshot")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.api",
+        description="Serve the SQL Monitor local store as a read-only JSON API.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"Port to listen on (default {DEFAULT_PORT})")
+    args = parser.parse_args(argv)
+
+    init_db()
+    update_db_schema()
+    serve(args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
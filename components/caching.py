@@ -0,0 +1,88 @@
+"""
+Pluggable result caching for the data modules, so they import without Streamlit.
+
+Functions are decorated with cache_data(ttl=...). By default results are kept in a
+small in-process TTL cache, which is all the CLI and collector processes need. The
+Streamlit UI installs st.cache_data instead (see use_streamlit_cache), keeping the
+app's caching behaviour unchanged.
+"""
+import functools
+import threading
+import time
+
+_backend = None
+
+
+def _freeze(value):
+    """Hashable stand-in for dict/list/set arguments"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+def memory_cache(func, ttl):
+    """Default backend: per-function dict of results that expire after ttl seconds"""
+    lock = threading.Lock()
+    results = {}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = _freeze((args, kwargs))
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        now = time.monotonic()
+        with lock:
+            hit = results.get(key)
+            if hit is not None and now - hit[0] < ttl:
+                return hit[1]
+        value = func(*args, **kwargs)
+        with lock:
+            results[key] = (time.monotonic(), value)
+        return value
+
+    wrapper.clear = results.clear
+    return wrapper
+
+
+def set_cache_backend(backend):
+    """
+    Route every cache_data function through backend(func, ttl) -> wrapped function.
+    Must be called before the first call of any cached function to take effect.
+    """
+    global _backend
+    _backend = backend
+
+
+def use_streamlit_cache():
+    """Cache through st.cache_data, shared by every session of the Streamlit server"""
+    import streamlit as st
+    set_cache_backend(lambda func, ttl: st.cache_data(ttl=ttl)(func))
+
+
+def cache_data(ttl):
+    """Cache a function's results for ttl seconds through the configured backend"""
+    def decorator(func):
+        cached = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached
+            # The backend is chosen at first call, after the app had a chance to set it
+            if cached is None:
+                cached = (_backend or memory_cache)(func, ttl)
+            return cached(*args, **kwargs)
+
+        def clear():
+            if cached is not None and hasattr(cached, "clear"):
+                cached.clear()
+
+        wrapper.clear = clear
+        return wrapper
+    return decorator
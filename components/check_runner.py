@@ -0,0 +1,191 @@
+"""
+Run every configured table and job check once, without a browser session.
+
+Uses the same checks as the dashboard (results are logged and alerts raised the same
+way) and prints machine-readable results. Run from the repository root:
+
+    python -m components.check_runner
+    python -m components.check_runner --format ndjson --parallel 8
+    python -m components.check_runner --db Sales --table Sales.Orders --jobs-only
+
+Exit codes follow the usual monitoring-plugin convention:
+0 all healthy, 1 warnings, 2 errors or failed jobs, 3 the runner itself failed.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from datetime import datetime
+
+from components.db import (
+    init_db, update_db_schema, load_saved_table_config, load_saved_job_config
+)
+from components.checks import get_latest_table_results, get_latest_job_results
+from components.snapshot import status_category, json_safe
+
+EXIT_OK = 0
+EXIT_WARNING = 1
+EXIT_ERROR = 2
+EXIT_UNKNOWN = 3
+
+
+def _json_default(value):
+    """Serialize numpy scalars and timestamps found in job records"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def select_tables(saved_tables, databases=None, tables=None):
+    """
+    Narrow load_saved_table_config rows to the given databases and tables.
+    Tables may be given as 'db.table' or as a bare table name (any database).
+    Names compare case-insensitively, like SQL Server identifiers.
+    """
+    if databases:
+        wanted = {db.lower() for db in databases}
+        saved_tables = saved_tables[saved_tables["db_name"].str.lower().isin(wanted)]
+    if tables:
+        qualified = {t.lower() for t in tables if "." in t}
+        bare = {t.lower() for t in tables if "." not in t}
+        full_names = (saved_tables["db_name"] + "." + saved_tables["table_name"]).str.lower()
+        saved_tables = saved_tables[full_names.isin(qualified) |
+                                    saved_tables["table_name"].str.lower().isin(bare)]
+    return saved_tables
+
+
+def table_severity(status):
+    """Exit code contributed by one table status"""
+    category = status_category(status)
+    if category == "Error":
+        return EXIT_ERROR
+    if category == "Warning":
+        return EXIT_WARNING
+    return EXIT_OK
+
+
+def job_severity(job):
+    """Exit code contributed by one job run"""
+    if job.get("Status") == "Failed":
+        return EXIT_ERROR
+    if job.get("Duration Status") in ("Slow", "Fast"):
+        return EXIT_WARNING
+    return EXIT_OK
+
+
+def run_checks(databases=None, tables=None, jobs=None, check_tables=True, check_jobs=True,
+               max_workers=4):
+    """
+    Run the selected checks once.
+
+    Returns {'checked_at', 'duration_seconds', 'tables': [...], 'jobs': [...],
+    'summary': {...}, 'exit_code': int}.
+    """
+    started = time.monotonic()
+    checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    table_results = []
+    expected_tables = 0
+    if check_tables:
+        saved_tables = select_tables(load_saved_table_config(), databases, tables)
+        expected_tables = len(saved_tables)
+        table_results = get_latest_table_results(saved_tables, max_workers=max_workers)
+
+    job_results = []
+    if check_jobs:
+        job_names = jobs or load_saved_job_config()["job_name"].tolist()
+        job_results = get_latest_job_results(job_names)
+
+    table_codes = [table_severity(str(r["Status"])) for r in table_results]
+    job_codes = [job_severity(r) for r in job_results]
+    # A table whose check failed outright has no result; treat it as an error
+    failed_checks = expected_tables - len(table_results)
+    codes = table_codes + job_codes + [EXIT_ERROR] * failed_checks
+
+    return {
+        "checked_at": checked_at,
+        "duration_seconds": round(time.monotonic() - started, 3),
+        "tables": table_results,
+        "jobs": job_results,
+        "summary": {
+            "tables_checked": len(table_results),
+            "tables_failed_to_check": failed_checks,
+            "table_warnings": table_codes.count(EXIT_WARNING),
+            "table_errors": table_codes.count(EXIT_ERROR),
+            "job_runs": len(job_results),
+            "job_warnings": job_codes.count(EXIT_WARNING),
+            "jobs_failed": job_codes.count(EXIT_ERROR),
+        },
+        "exit_code": max(codes, default=EXIT_OK),
+    }
+
+
+def write_report(report, fmt, out):
+    """Write a run_checks report as one JSON document or as NDJSON lines"""
+    # Missing values (e.g. the Duration Z Score of runs without enough history) are
+    # NaN in job records; JSON has no NaN, so they are written as null
+    report = json_safe(report)
+    if fmt == "json":
+        json.dump(report, out, default=_json_default, allow_nan=False, indent=2)
+        out.write("\n")
+        return
+
+    for record in report["tables"]:
+        out.write(json.dumps({"kind": "table", **record}, default=_json_default,
+                             allow_nan=False) + "\n")
+    for record in report["jobs"]:
+        out.write(json.dumps({"kind": "job", **record}, default=_json_default,
+                             allow_nan=False) + "\n")
+    summary = {key: value for key, value in report.items() if key not in ("tables", "jobs")}
+    out.write(json.dumps({"kind": "summary", **summary}, default=_json_default,
+                         allow_nan=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.check_runner",
+        description="Run the configured table and job checks once and print the results.")
+    parser.add_argument("--db", action="append", dest="databases", metavar="NAME",
+                        help="Only check tables in this database (repeatable)")
+    parser.add_argument("--table", action="append", dest="tables", metavar="[DB.]TABLE",
+                        help="Only check this table (repeatable)")
+    parser.add_argument("--job", action="append", dest="jobs", metavar="NAME",
+                        help="Only check this job (repeatable)")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--tables-only", action="store_true", help="Skip job checks")
+    scope.add_argument("--jobs-only", action="store_true", help="Skip table checks")
+    parser.add_argument("--parallel", type=int, default=4, metavar="N",
+                        help="Number of table checks to run at once (default 4)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="Output format (default json)")
+    parser.add_argument("--output", default="-",
+                        help="Write results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    try:
+        # Check errors and warnings are printed; keep stdout for the results
+        with contextlib.redirect_stdout(sys.stderr):
+            init_db()
+            update_db_schema()
+            report = run_checks(
+                databases=args.databases, tables=args.tables, jobs=args.jobs,
+                check_tables=not args.jobs_only, check_jobs=not args.tables_only,
+                max_workers=args.parallel)
+    except Exception as e:
+        print(f"Error running checks: {str(e)}", file=sys.stderr)
+        return EXIT_UNKNOWN
+
+    if args.output == "-":
+        write_report(report, args.format, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            write_report(report, args.format, f)
+    return report["exit_code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
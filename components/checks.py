@@ -0,0 +1,311 @@
+"""
+Check evaluation and dashboard collection, independent of Streamlit.
+
+Shared by the Streamlit UI and by command-line / collector processes.
+"""
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from components.sql import (
+    check_selected_tables, get_table_size_info, get_job_history, get_connection
+)
+from components.db import (
+    load_saved_table_config, log_table_check_result, load_saved_job_config, log_alert,
+    load_column_config, save_dashboard_snapshot, load_dashboard_snapshot
+)
+from components.snapshot import snapshot_cache, DashboardSnapshot
+from components.refresh import refresh_governor
+from components.metrics import publish_metrics
+from components.telemetry import query_target, flush_query_log
+from components.profiling import phase
+
+
+def check_table(row):
+    """
+    Check one configured table (a load_saved_table_config row): row count, column
+    conditions and size. Logs the result to table_check_log and raises alerts for
+    issues. Returns the dashboard result dict, or None if the check failed outright.
+    """
+    result = None
+    try:
+        # Get table specific thresholds
+        table_min = row['min_rows'] if pd.notna(
+            row['min_rows']) else None
+        table_max = row['max_rows'] if pd.notna(
+            row['max_rows']) else None
+        table_col_min_match = row['column_min_match_count'] if pd.notna(
+            row['column_min_match_count']) else 1
+
+        table_min_dict = {
+            row['table_name']: table_min} if table_min is not None else {}
+        table_max_dict = {
+            row['table_name']: table_max} if table_max is not None else {}
+        table_col_min_match_dict = {
+            row['table_name']: table_col_min_match}
+
+        # Get table status
+        check_result_df = check_selected_tables(
+            row["db_name"], [row["table_name"]], table_min_dict, table_max_dict, table_col_min_match_dict)
+
+        count = 0
+        status = "Error"
+        if not check_result_df.empty:
+            count = int(
+                check_result_df.iloc[0]["Rows"]) if check_result_df.iloc[0]["Rows"].isdigit() else 0
+            if count == 0:  # Explicitly check for empty tables first
+                status = "Empty"
+            else:
+                status = check_result_df.iloc[0]["Status"]
+
+        # Get size info
+        size_info = get_table_size_info(
+            row["db_name"], row["table_name"])
+        data_mb = size_info['data_kb'] / 1024
+        index_mb = size_info['index_kb'] / 1024
+        total_mb = data_mb + index_mb
+
+        result = {
+            'Database': row["db_name"],
+            'Table': row["table_name"],
+            'Row Count': count,
+            'Status': status,
+            'Min Rows': table_min if table_min is not None else "None",
+            'Max Rows': table_max if table_max is not None else "None",
+            'Data MB': round(data_mb, 2),
+            'Index MB': round(index_mb, 2),
+            'Total MB': round(total_mb, 2),
+            'Last Check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        # Log check result to table_check_log
+        log_table_check_result(
+            row["db_name"],
+            row["table_name"],
+            count,
+            status,
+            total_mb=round(total_mb, 2)
+        )
+
+        # Special handling for MoveFrames unprocessed records
+        if row["table_name"] == "MoveFrames":
+            table_column_configs = load_column_config(
+                row["db_name"], row["table_name"])
+            if not table_column_configs.empty:
+                # Check if we're monitoring Processed=0
+                processed_config = table_column_configs[
+                    (table_column_configs["column_name"] == "Processed") &
+                    (table_column_configs["condition_value"] == "0")
+                ]
+                if not processed_config.empty:
+                    conn = get_connection(row["db_name"])
+                    cursor = conn.cursor()
+                    try:
+                        # Count unprocessed records for today
+                        query = """
+                        SELECT COUNT(*) 
+                        FROM [{0}].[dbo].[MoveFrames] 
+                        WHERE CAST(MoveDate AS DATE) = CAST(GETDATE() AS DATE)
+                        AND Processed = 0
+                        """.format(row["db_name"])
+                        cursor.execute(query)
+                        unprocessed_count = cursor.fetchone()[0]
+
+                        if unprocessed_count > 0:
+                            status = "Warn-UnprocessedRecords"
+                            details = f"Database: {row['db_name']}\n"
+                            details += f"Table: {row['table_name']}\n"
+                            details += f"Unprocessed Records: {unprocessed_count}\n"
+                            details += f"Date: {datetime.now().strftime('%Y-%m-%d')}\n"
+
+                            log_alert(
+                                alert_type="Table",
+                                source_type="Unprocessed Records",
+                                source_name=f"{row['db_name']}.{row['table_name']}",
+                                status=status,
+                                message=f"Found {unprocessed_count} unprocessed records in {row['table_name']} for today",
+                                details=details
+                            )
+                    finally:
+                        if cursor:
+                            cursor.close()
+                        if conn:
+                            conn.close()
+
+        # Log alerts for other table issues
+        elif status != "OK":
+            source_type = ""
+            if status == "Empty":
+                source_type = "Empty Table"
+            elif status.startswith("Error"):
+                source_type = "Table Error"
+            elif status == "Warn-LowCount":
+                source_type = "Low Row Count"
+            elif status == "Warn-HighCount":
+                source_type = "High Row Count"
+
+            if source_type:
+                details = f"Database: {row['db_name']}\n"
+                details += f"Table: {row['table_name']}\n"
+                details += f"Row Count: {count}\n"
+
+                if status == "Warn-LowCount" and table_min is not None:
+                    details += f"Min Threshold: {table_min}\n"
+                elif status == "Warn-HighCount" and table_max is not None:
+                    details += f"Max Threshold: {table_max}\n"
+
+                log_alert(
+                    alert_type="Table",
+                    source_type=source_type,
+                    source_name=f"{row['db_name']}.{row['table_name']}",
+                    status=status,
+                    message=f"Table {row['db_name']}.{row['table_name']} has {status} status",
+                    details=details
+                )
+    except Exception as e:
+        print(
+            f"Error processing table {row['db_name']}.{row['table_name']}: {str(e)}")
+    return result
+
+
+def _check_table_tagged(row):
+    """check_table with its SQL Server calls attributed to the table (see telemetry.py)"""
+    with query_target(row["db_name"], row["table_name"]):
+        return check_table(row)
+
+
+def get_latest_table_results(saved_tables=None, max_workers=1):
+    """
+    Check every configured table (or the given load_saved_table_config rows),
+    running up to max_workers checks at a time. Returns a list of result dicts.
+    """
+    if saved_tables is None:
+        with phase("config load"):
+            saved_tables = load_saved_table_config()
+    rows = [row for _, row in saved_tables.iterrows()]
+
+    with phase("table checks"):
+        if max_workers > 1 and len(rows) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_check_table_tagged, rows))
+        else:
+            results = [_check_table_tagged(row) for row in rows]
+    return [result for result in results if result is not None]
+
+
+def get_latest_job_results(job_names=None):
+    """
+    Last 24 hours of runs of every monitored job (or of job_names), logging alerts
+    for failures and duration anomalies. Returns a list of run dicts.
+    """
+    if job_names is None:
+        with phase("config load"):
+            job_names = load_saved_job_config()['job_name'].tolist()
+
+    if job_names:
+        # Last 24 hours with anomaly detection
+        with phase("job queries"):
+            job_history = get_job_history(24, detect_anomalies=True)
+        filtered_history = job_history[job_history['Job Name'].isin(
+            job_names)]
+
+        # Log alerts for job issues
+        for _, job in filtered_history.iterrows():
+            # Log failed jobs
+            if job['Status'] == 'Failed':
+                details = f"Job Name: {job['Job Name']}\n"
+                details += f"Run Date: {job['Run Date']}\n"
+                details += f"Run Time: {job['Run Time']}\n"
+                details += f"Duration: {job['Duration']}\n"
+                details += f"Message: {job['Message']}\n"
+
+                log_alert(
+                    alert_type="Job",
+                    source_type="Failed Job",
+                    source_name=job['Job Name'],
+                    status="Failed",
+                    message=f"Job {job['Job Name']} failed at {job['Run Date']} {job['Run Time']}",
+                    details=details
+                )
+
+            # Log duration anomalies if present
+            if 'Duration Status' in job and job['Duration Status'] in ['Slow', 'Fast']:
+                details = f"Job Name: {job['Job Name']}\n"
+                details += f"Run Date: {job['Run Date']}\n"
+                details += f"Run Time: {job['Run Time']}\n"
+                details += f"Duration: {job['Duration']}\n"
+                details += f"Normal Duration: {job['Duration Status']}\n"
+                if 'Duration Seconds' in job:
+                    details += f"Duration in seconds: {job['Duration Seconds']}\n"
+
+                log_alert(
+                    alert_type="Job",
+                    source_type="Duration Anomaly",
+                    source_name=job['Job Name'],
+                    status=job['Duration Status'],
+                    message=f"Job {job['Job Name']} had abnormal duration ({job['Duration Status']}) at {job['Run Date']} {job['Run Time']}",
+                    details=details
+                )
+
+        return filtered_history.to_dict('records')
+    return []
+
+
+DASHBOARD_SNAPSHOT_KEY = "dashboard_snapshot"
+
+
+def collect_dashboard_snapshot():
+    """
+    Run one full collection cycle (every table check and the monitored job history)
+    and persist the result so the next server start can render it straight away.
+    """
+    with refresh_governor.cycle():
+        snapshot = DashboardSnapshot(
+            get_latest_table_results(), get_latest_job_results(),
+            collected_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    try:
+        save_dashboard_snapshot(*snapshot.records(), snapshot.collected_at)
+    except Exception as e:
+        print(f"Error saving dashboard snapshot: {str(e)}")
+    try:
+        publish_metrics(snapshot)
+    except Exception as e:
+        print(f"Error rendering metrics: {str(e)}")
+    flush_query_log()
+    return snapshot
+
+
+def get_dashboard_snapshot(requested_interval):
+    """
+    Latest DashboardSnapshot, shared by every session.
+
+    A cycle runs at most once per effective interval for the whole server. The tick that
+    finds the snapshot older than the interval runs the cycle and shows its result, so a
+    screen is never a cycle behind. A tick that arrives while a cycle is still running
+    reuses the previous snapshot instead of queueing behind it. Right after a restart the
+    snapshot persisted by the last cycle is served (with restored=True) while the first
+    collection runs in the background.
+    """
+    if snapshot_cache.peek(DASHBOARD_SNAPSHOT_KEY) is None:
+        persisted = load_dashboard_snapshot()
+        if persisted is not None:
+            restored = DashboardSnapshot(
+                persisted['table_results'], persisted['job_results'],
+                collected_at=persisted['collected_at'], restored=True)
+            snapshot_cache.prime(DASHBOARD_SNAPSHOT_KEY,
+                                 restored, collect_dashboard_snapshot)
+
+    if refresh_governor.is_running():
+        previous = snapshot_cache.peek(DASHBOARD_SNAPSHOT_KEY)
+        if previous is not None:
+            refresh_governor.skip_tick()
+            return previous
+
+    interval = refresh_governor.effective_interval(requested_interval)
+    return snapshot_cache.get(DASHBOARD_SNAPSHOT_KEY, collect_dashboard_snapshot,
+                              ttl=interval)
+
+
+def invalidate_dashboard_snapshot():
+    """Collect a fresh snapshot on the next tick, e.g. after monitored tables or jobs changed"""
+    snapshot_cache.invalidate(DASHBOARD_SNAPSHOT_KEY)
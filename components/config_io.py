@@ -0,0 +1,372 @@
+"""
+Bulk import/export of monitoring configuration (tables, column conditions, jobs).
+
+Usable without Streamlit from the repository root:
+
+    python -m components.config_io export monitors.yaml
+    python -m components.config_io import monitors.csv --dry-run
+    python -m components.config_io import monitors.yaml --replace
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+
+import pandas as pd
+
+from components.db import (
+    init_db, update_db_schema, load_saved_table_config, load_column_config,
+    load_saved_job_config, apply_config_bulk
+)
+
+# Condition types offered by the column condition editor in render_table_monitor
+CONDITION_TYPES = ["equals", "not_equals", "greater_than", "less_than", "in",
+                   "date_equals_today", "date_greater_than", "date_less_than"]
+
+TABLE_FIELDS = ["db_name", "table_name", "min_rows",
+                "max_rows", "column_min_match_count"]
+COLUMN_FIELDS = ["db_name", "table_name", "column_name",
+                 "condition_type", "condition_value"]
+JOB_FIELDS = ["job_name"]
+
+# CSV exports hold all three sections in one file, told apart by this column
+CSV_FIELDS = ["section"] + TABLE_FIELDS + \
+    [f for f in COLUMN_FIELDS + JOB_FIELDS if f not in TABLE_FIELDS]
+
+
+def _optional_int(value, default=None):
+    """Convert '', None and NaN to default, anything else to int"""
+    if value is None or value == "" or (isinstance(value, float) and pd.isna(value)):
+        return default
+    return int(value)
+
+
+def _normalize_entry(section, item, build):
+    """build(item), with any problem reported as a ValueError naming the entry"""
+    try:
+        return build(item)
+    except KeyError as e:
+        raise ValueError(f"{section} entry {item!r} is missing {e}") from e
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"{section} entry {item!r}: {e}") from e
+
+
+def _normalize(config):
+    """Coerce a loaded config into {'tables': [...], 'columns': [...], 'jobs': [...]} with clean types"""
+    if not isinstance(config, dict):
+        raise ValueError("Configuration must be a mapping with tables, columns and jobs")
+
+    tables = [_normalize_entry("tables", item, lambda item: {
+        "db_name": str(item["db_name"]),
+        "table_name": str(item["table_name"]),
+        "min_rows": _optional_int(item.get("min_rows")),
+        "max_rows": _optional_int(item.get("max_rows")),
+        "column_min_match_count": _optional_int(item.get("column_min_match_count"), 1)
+    }) for item in config.get("tables") or []]
+
+    columns = [_normalize_entry("columns", item, lambda item: {
+        "db_name": str(item["db_name"]),
+        "table_name": str(item["table_name"]),
+        "column_name": str(item["column_name"]),
+        "condition_type": str(item["condition_type"]),
+        "condition_value": "" if item.get("condition_value") is None else str(item["condition_value"])
+    }) for item in config.get("columns") or []]
+
+    # Jobs may be given as plain names or as {"job_name": ...} mappings
+    jobs = [_normalize_entry("jobs", item, lambda item: str(
+        item["job_name"] if isinstance(item, dict) else item))
+        for item in config.get("jobs") or []]
+
+    return {"tables": tables, "columns": columns, "jobs": jobs}
+
+
+def export_config():
+    """Read the current configuration from the local store"""
+    tables_df = load_saved_table_config()
+    columns_df = load_column_config()
+    jobs_df = load_saved_job_config()
+
+    return _normalize({
+        "tables": tables_df[TABLE_FIELDS].to_dict("records") if not tables_df.empty else [],
+        "columns": columns_df[COLUMN_FIELDS].to_dict("records") if not columns_df.empty else [],
+        "jobs": jobs_df["job_name"].tolist() if not jobs_df.empty else []
+    })
+
+
+def dump_config(config, fmt="yaml"):
+    """Serialize a config dict to YAML or CSV text"""
+    if fmt == "yaml":
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError(
+                "YAML support requires PyYAML (pip install pyyaml); use CSV instead.")
+        return yaml.safe_dump(config, sort_keys=False, allow_unicode=True)
+
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for item in config["tables"]:
+            writer.writerow({"section": "table", **item})
+        for item in config["columns"]:
+            writer.writerow({"section": "column", **item})
+        for job in config["jobs"]:
+            writer.writerow({"section": "job", "job_name": job})
+        return out.getvalue()
+
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def parse_config(text, fmt="yaml"):
+    """Parse YAML or CSV text into a normalized config dict"""
+    if fmt == "yaml":
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError(
+                "YAML support requires PyYAML (pip install pyyaml); use CSV instead.")
+        try:
+            loaded = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}") from e
+        return _normalize(loaded or {})
+
+    if fmt == "csv":
+        sections = {"table": [], "column": [], "job": []}
+        for row in csv.DictReader(io.StringIO(text)):
+            section = (row.get("section") or "").strip()
+            if section not in sections:
+                raise ValueError(f"Unknown section '{section}' in CSV row: {row}")
+            sections[section].append(row)
+        return _normalize({
+            "tables": sections["table"],
+            "columns": sections["column"],
+            "jobs": sections["job"]
+        })
+
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def format_for_path(path):
+    """Pick yaml or csv from a file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".yaml", ".yml"):
+        return "yaml"
+    if ext == ".csv":
+        return "csv"
+    raise ValueError(f"Cannot tell format of '{path}'; use .yaml, .yml or .csv")
+
+
+def validate_config(config, check_server=True):
+    """
+    Validate a normalized config. Returns a list of error messages (empty when valid).
+
+    With check_server, databases, tables, columns and jobs are checked against SQL Server
+    metadata. Metadata is fetched once per database (get_tables / get_all_table_columns,
+    both cached), so validating thousands of entries costs a handful of queries.
+    """
+    errors = []
+
+    for item in config["tables"]:
+        name = f"{item['db_name']}.{item['table_name']}"
+        for field in ("min_rows", "max_rows", "column_min_match_count"):
+            if item[field] is not None and item[field] < 0:
+                errors.append(f"Table {name}: {field} must not be negative")
+        if item["min_rows"] is not None and item["max_rows"] is not None \
+                and item["min_rows"] > item["max_rows"]:
+            errors.append(f"Table {name}: min_rows is greater than max_rows")
+
+    for item in config["columns"]:
+        name = f"{item['db_name']}.{item['table_name']}.{item['column_name']}"
+        if item["condition_type"] not in CONDITION_TYPES:
+            errors.append(
+                f"Column {name}: unknown condition_type '{item['condition_type']}'")
+        elif item["condition_type"] != "date_equals_today" and not item["condition_value"]:
+            errors.append(f"Column {name}: condition_value is required")
+
+    if not check_server:
+        return errors
+
+    from components.sql import get_databases, get_tables, get_all_table_columns, get_all_jobs
+
+    databases = {db.lower() for db in get_databases()}
+    wanted_dbs = {item["db_name"] for item in config["tables"] + config["columns"]}
+    tables_by_db = {}
+    columns_by_db = {}
+    for db in wanted_dbs:
+        if db.lower() not in databases:
+            errors.append(f"Database {db} does not exist on the server")
+            continue
+        # SQL Server identifiers compare case-insensitively under the default collation
+        tables_by_db[db] = {t.lower() for t in get_tables(db)}
+        columns_by_db[db] = {
+            table.lower(): {c["name"].lower() for c in cols}
+            for table, cols in get_all_table_columns(db).items()
+        }
+
+    for item in config["tables"] + config["columns"]:
+        db = item["db_name"]
+        if db in tables_by_db and item["table_name"].lower() not in tables_by_db[db]:
+            errors.append(f"Table {db}.{item['table_name']} does not exist")
+
+    for item in config["columns"]:
+        db = item["db_name"]
+        table_columns = columns_by_db.get(db, {}).get(item["table_name"].lower())
+        if table_columns is not None and item["column_name"].lower() not in table_columns:
+            errors.append(
+                f"Column {db}.{item['table_name']}.{item['column_name']} does not exist")
+
+    if config["jobs"]:
+        all_jobs = get_all_jobs()
+        known_jobs = set(all_jobs["Job Name"]) if not all_jobs.empty else set()
+        for job in config["jobs"]:
+            if job not in known_jobs:
+                errors.append(f"Job {job} does not exist or has not run in the last year")
+
+    # The same error is reported once even if several entries trigger it
+    return list(dict.fromkeys(errors))
+
+
+def diff_config(config, replace=False):
+    """
+    Compare a normalized config with the current configuration.
+
+    Returns {section: {"added": [...], "changed": [(old, new), ...], "removed": [...],
+    "unchanged": int}}. Rows are only reported as removed when replace is True.
+    """
+    current = export_config()
+    keys = {
+        "tables": lambda t: (t["db_name"], t["table_name"]),
+        "columns": lambda c: (c["db_name"], c["table_name"], c["column_name"]),
+        "jobs": lambda j: j,
+    }
+
+    diff = {}
+    for section, key in keys.items():
+        existing = {key(item): item for item in current[section]}
+        incoming = {key(item): item for item in config[section]}
+        diff[section] = {
+            "added": [item for k, item in incoming.items() if k not in existing],
+            "changed": [(existing[k], item) for k, item in incoming.items()
+                        if k in existing and existing[k] != item],
+            "removed": [item for k, item in existing.items() if k not in incoming] if replace else [],
+            "unchanged": sum(1 for k, item in incoming.items() if existing.get(k) == item),
+        }
+    return diff
+
+
+def format_diff(diff):
+    """Render a diff_config result as human-readable lines"""
+    def describe(section, item):
+        if section == "tables":
+            return (f"{item['db_name']}.{item['table_name']} (min_rows={item['min_rows']}, "
+                    f"max_rows={item['max_rows']}, column_min_match_count={item['column_min_match_count']})")
+        if section == "columns":
+            return (f"{item['db_name']}.{item['table_name']}.{item['column_name']} "
+                    f"{item['condition_type']} {item['condition_value']!r}")
+        return item
+
+    lines = []
+    for section, changes in diff.items():
+        lines.append(
+            f"{section}: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+            f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged")
+        for item in changes["added"]:
+            lines.append(f"  + {describe(section, item)}")
+        for old, new in changes["changed"]:
+            lines.append(f"  ~ {describe(section, old)}  ->  {describe(section, new)}")
+        for item in changes["removed"]:
+            lines.append(f"  - {describe(section, item)}")
+    return lines
+
+
+def import_config(config, replace=False):
+    """Apply a normalized config to the local store in one transaction"""
+    apply_config_bulk(config["tables"], config["columns"],
+                      config["jobs"], replace=replace)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.config_io",
+        description="Import or export SQL Monitor configuration as YAML or CSV.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser(
+        "export", help="Write the current configuration to a file")
+    export_parser.add_argument("path", help="Output file (.yaml, .yml or .csv), '-' for stdout")
+    export_parser.add_argument("--format", choices=["yaml", "csv"],
+                               help="Override the format implied by the file extension")
+
+    import_parser = subparsers.add_parser(
+        "import", help="Load configuration from a file")
+    import_parser.add_argument("path", help="Input file (.yaml, .yml or .csv)")
+    import_parser.add_argument("--format", choices=["yaml", "csv"],
+                               help="Override the format implied by the file extension")
+    import_parser.add_argument("--dry-run", action="store_true",
+                               help="Only show what would change")
+    import_parser.add_argument("--replace", action="store_true",
+                               help="Delete configuration that is not in the file")
+    import_parser.add_argument("--skip-server-check", action="store_true",
+                               help="Do not validate names against SQL Server metadata")
+
+    args = parser.parse_args(argv)
+
+    init_db()
+    update_db_schema()
+
+    if args.command == "export":
+        try:
+            fmt = args.format or ("yaml" if args.path == "-" else format_for_path(args.path))
+            text_out = dump_config(export_config(), fmt)
+            if args.path == "-":
+                sys.stdout.write(text_out)
+            else:
+                with open(args.path, "w", encoding="utf-8", newline="") as f:
+                    f.write(text_out)
+        except (OSError, ValueError) as e:
+            print(f"Could not export to {args.path}: {e}", file=sys.stderr)
+            return 1
+        if args.path != "-":
+            print(f"Exported configuration to {args.path}")
+        return 0
+
+    from components.sql import driver_error
+
+    try:
+        fmt = args.format or format_for_path(args.path)
+        with open(args.path, encoding="utf-8", newline="") as f:
+            text_in = f.read()
+        config = parse_config(text_in, fmt)
+        errors = validate_config(config, check_server=not args.skip_server_check)
+    except driver_error() as e:
+        print(f"Could not check {args.path} against SQL Server: {e}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, KeyError, TypeError, RuntimeError) as e:
+        # Unreadable files and malformed rows are reported like validation errors,
+        # not as a traceback
+        print(f"Could not read {args.path}: {e}", file=sys.stderr)
+        return 1
+
+    for line in format_diff(diff_config(config, replace=args.replace)):
+        print(line)
+
+    if errors:
+        print(f"\n{len(errors)} validation error(s):", file=sys.stderr)
+        for error in errors:
+            print(f"  {error}", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        print("\nDry run: no changes applied.")
+        return 0
+
+    import_config(config, replace=args.replace)
+    print("\nConfiguration applied.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,57 @@
 from sqlalchemy import create_engine, text
 import pandas as pd
+import json
 import os
+import re
 import sqlite3
+import time
+import zlib
 
 DB_PATH = "sqlite:///data/job_monitor.db"
 engine = create_engine(DB_PATH)
+# SQLite file used instead of data/job_monitor.db, if any (see use_database)
+_db_file = None
+
+# Raw check rows older than this are folded into hourly rollups
+RAW_CHECK_RETENTION_DAYS = 7
+# Hourly rollups older than this are folded into daily rollups
+HOURLY_ROLLUP_RETENTION_DAYS = 90
+# Minimum seconds between two automatic compaction runs
+COMPACTION_INTERVAL_SECONDS = 3600
+# Sampled query timings older than this are deleted by compaction
+QUERY_LOG_RETENTION_DAYS = 7
+# Profiled reruns kept in profile_runs; older ones are dropped on insert
+MAX_PROFILE_RUNS = 20
+
+_last_compaction = 0.0
+
+# Ranks a status string so rollups can keep the worst one seen in a bucket:
+# 0 = OK, 1 = warning, 2 = empty, 3 = error/failed
+_STATUS_SEVERITY_SQL = """
+    CASE
+        WHEN status LIKE 'Error%' OR status = 'Failed' THEN 3
+        WHEN status = 'Empty' THEN 2
+        WHEN status LIKE 'Warn%' OR status IN ('Retry', 'Canceled', 'Slow', 'Fast') THEN 1
+        ELSE 0
+    END"""
+
+
+def use_database(db_file):
+    """
+    Point the local store at another SQLite file, e.g. for benchmarks that must not
+    write into the real store. Call before init_db. SQLMON_DB_FILE does the same at import.
+    """
+    global DB_PATH, engine, _db_file
+    db_file = os.path.abspath(db_file)
+    os.makedirs(os.path.dirname(db_file), exist_ok=True)
+    _db_file = db_file
+    DB_PATH = f"sqlite:///{db_file}"
+    engine.dispose()
+    engine = create_engine(DB_PATH)
+
+
+if os.getenv("SQLMON_DB_FILE"):
+    use_database(os.getenv("SQLMON_DB_FILE"))
 
 
 def init_db():
@@ -27,7 +74,8 @@ def init_db():
             table_name TEXT,
             check_time TEXT,
             row_count INTEGER,
-            status TEXT
+            status TEXT,
+            total_mb REAL
         );
         """))
         conn.execute(text("""
@@ -71,6 +119,102 @@ def init_db():
             UNIQUE(db_name, table_name, column_name)
         );
         """))
+        for granularity in ("hourly", "daily"):
+            conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS table_check_rollup_{granularity} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                db_name TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                sample_count INTEGER NOT NULL,
+                min_row_count INTEGER,
+                max_row_count INTEGER,
+                last_row_count INTEGER,
+                last_total_mb REAL,
+                last_check_time TEXT,
+                ok_count INTEGER DEFAULT 0,
+                warn_count INTEGER DEFAULT 0,
+                empty_count INTEGER DEFAULT 0,
+                error_count INTEGER DEFAULT 0,
+                worst_severity INTEGER DEFAULT 0,
+                worst_status TEXT,
+                UNIQUE(db_name, table_name, bucket)
+            );
+            """))
+            conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS job_check_rollup_{granularity} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_name TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                sample_count INTEGER NOT NULL,
+                last_status TEXT,
+                last_run TEXT,
+                last_check_time TEXT,
+                ok_count INTEGER DEFAULT 0,
+                warn_count INTEGER DEFAULT 0,
+                error_count INTEGER DEFAULT 0,
+                worst_severity INTEGER DEFAULT 0,
+                worst_status TEXT,
+                UNIQUE(job_name, bucket)
+            );
+            """))
+        # Single row holding the last full dashboard collection, for warm starts
+        conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS dashboard_snapshot (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            collected_at TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        """))
+        # Sampled SQL Server call timings written by components/telemetry.py
+        conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS query_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            logged_at TEXT NOT NULL,
+            function TEXT,
+            operation TEXT,
+            db_name TEXT,
+            table_name TEXT,
+            duration_ms REAL,
+            rows INTEGER,
+            bytes INTEGER,
+            error TEXT
+        );
+        """))
+        conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_query_log_time
+        ON query_log (logged_at)
+        """))
+        # Most recent profiled reruns written by components/profiling.py
+        conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS profile_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profiled_at TEXT NOT NULL,
+            view TEXT,
+            total_ms REAL,
+            phases TEXT,
+            hotspots TEXT,
+            profile BLOB
+        );
+        """))
+        # Compaction scans and deletes by check_time; trend queries go per object
+        conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_table_check_log_time
+        ON table_check_log (check_time)
+        """))
+        conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_table_check_log_table_time
+        ON table_check_log (db_name, table_name, check_time)
+        """))
+        conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_job_monitor_log_time
+        ON job_monitor_log (check_time)
+        """))
+        conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_job_monitor_log_job_time
+        ON job_monitor_log (job_name, check_time)
+        """))
 
 
 def update_db_schema():
@@ -79,7 +223,7 @@ def update_db_schema():
     This handles cases where the database was created with an older schema.
     """
     # Connect directly with sqlite3 to check schema
-    db_file = os.path.join(os.path.dirname(
+    db_file = _db_file or os.path.join(os.path.dirname(
         os.path.dirname(__file__)), "data", "job_monitor.db")
     if not os.path.exists(db_file):
         init_db()  # Ensure DB and tables are created if db file doesn't exist
@@ -114,8 +258,64 @@ def update_db_schema():
         if 'details' not in columns:
             cursor.execute("ALTER TABLE alert_log ADD COLUMN details TEXT")
 
+        # Keyset pagination walks (alert_time, id), optionally under one equality filter
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_alert_log_time ON alert_log (alert_time, id)")
+        for column in ("alert_type", "source_type", "status", "source_name"):
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_alert_log_{column}_time ON alert_log ({column}, alert_time, id)")
+
+        # Full-text index over message/details, kept in sync with alert_log by triggers
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='alert_log_fts'")
+        if not cursor.fetchone():
+            try:
+                cursor.execute("""
+                CREATE VIRTUAL TABLE alert_log_fts USING fts5(
+                    message, details,
+                    content='alert_log', content_rowid='id', prefix='2 3'
+                )""")
+                cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS alert_log_fts_ai AFTER INSERT ON alert_log BEGIN
+                    INSERT INTO alert_log_fts (rowid, message, details)
+                    VALUES (new.id, new.message, new.details);
+                END""")
+                cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS alert_log_fts_ad AFTER DELETE ON alert_log BEGIN
+                    INSERT INTO alert_log_fts (alert_log_fts, rowid, message, details)
+                    VALUES ('delete', old.id, old.message, old.details);
+                END""")
+                cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS alert_log_fts_au AFTER UPDATE ON alert_log BEGIN
+                    INSERT INTO alert_log_fts (alert_log_fts, rowid, message, details)
+                    VALUES ('delete', old.id, old.message, old.details);
+                    INSERT INTO alert_log_fts (rowid, message, details)
+                    VALUES (new.id, new.message, new.details);
+                END""")
+                # Index alerts logged before the FTS table existed
+                cursor.execute(
+                    "INSERT INTO alert_log_fts (alert_log_fts) VALUES ('rebuild')")
+            except sqlite3.OperationalError as e:
+                # SQLite builds without FTS5 fall back to LIKE search in search_alerts
+                print(f"WARNING: Full-text search unavailable: {str(e)}")
+
         conn.commit()
 
+    # Update: Check and add size columns for row count / size trends, and the
+    # snapshot version used for HTTP ETags
+    for table, column, definition in (("table_check_log", "total_mb", "REAL"),
+                                      ("table_check_rollup_hourly", "last_total_mb", "REAL"),
+                                      ("table_check_rollup_daily", "last_total_mb", "REAL"),
+                                      ("dashboard_snapshot", "version", "INTEGER NOT NULL DEFAULT 0")):
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        if cursor.fetchone():
+            cursor.execute(f"PRAGMA table_info({table})")
+            if column not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    conn.commit()
+
     # Update: Check and add columns for table_monitor_config
     cursor.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='table_monitor_config'")
@@ -138,46 +338,131 @@ def update_db_schema():
     conn.close()
 
 
+_UPSERT_TABLE_CONFIG_SQL = """
+INSERT INTO table_monitor_config
+(db_name, table_name, min_rows, max_rows, column_min_match_count)
+VALUES (:db, :table, :min_r, :max_r, :min_match_c)
+ON CONFLICT(db_name, table_name) DO UPDATE SET
+    min_rows = excluded.min_rows,
+    max_rows = excluded.max_rows,
+    column_min_match_count = excluded.column_min_match_count
+"""
+
+_UPSERT_COLUMN_CONFIG_SQL = """
+INSERT INTO column_monitor_config
+(db_name, table_name, column_name, condition_type, condition_value)
+VALUES (:db, :table, :column, :cond_type, :cond_value)
+ON CONFLICT(db_name, table_name, column_name) DO UPDATE SET
+    condition_type = excluded.condition_type,
+    condition_value = excluded.condition_value
+"""
+
+# Drops the columns of a table that are no longer configured; :keep is a JSON array
+_PRUNE_COLUMN_CONFIG_SQL = """
+DELETE FROM column_monitor_config
+WHERE db_name = :db AND table_name = :table
+AND column_name NOT IN (SELECT value FROM json_each(:keep))
+"""
+
+_INSERT_JOB_CONFIG_SQL = """
+INSERT INTO job_monitor_config (job_name)
+VALUES (:job)
+ON CONFLICT(job_name) DO NOTHING
+"""
+
+
+def _table_config_params(db, tables, min_rows_dict=None, max_rows_dict=None, column_min_match_count_dict=None):
+    """Build one parameter dict per table for _UPSERT_TABLE_CONFIG_SQL"""
+    params = []
+    for table in tables:
+        min_r = min_rows_dict.get(table) if min_rows_dict else None
+        max_r = max_rows_dict.get(table) if max_rows_dict else None
+        # Get the min match count for the current table, default to 1 if not provided
+        min_match_c = column_min_match_count_dict.get(
+            table, 1) if column_min_match_count_dict else 1
+
+        # Ensure min_match_c is an int, handle None or non-int values if necessary
+        if not isinstance(min_match_c, int):
+            try:
+                min_match_c = int(
+                    min_match_c) if min_match_c is not None else 1
+            except ValueError:
+                min_match_c = 1  # Default if conversion fails
+
+        params.append({
+            "db": db,
+            "table": table,
+            "min_r": min_r,
+            "max_r": max_r,
+            "min_match_c": min_match_c
+        })
+    return params
+
+
+def _column_config_params(db_name, column_configs_by_table):
+    """Build upsert and prune parameter lists for a {table: [column config, ...]} mapping"""
+    upserts = []
+    prunes = []
+    for table_name, column_configs in column_configs_by_table.items():
+        for config in column_configs:
+            upserts.append({
+                "db": db_name,
+                "table": table_name,
+                "column": config["column_name"],
+                "cond_type": config["condition_type"],
+                "cond_value": config["condition_value"]
+            })
+        prunes.append({
+            "db": db_name,
+            "table": table_name,
+            "keep": json.dumps([config["column_name"] for config in column_configs])
+        })
+    return upserts, prunes
+
+
 def save_table_config(db, tables, min_rows_dict=None, max_rows_dict=None, column_min_match_count_dict=None):
+    params = _table_config_params(
+        db, tables, min_rows_dict, max_rows_dict, column_min_match_count_dict)
+    if not params:
+        return
     with engine.begin() as conn:
-        for table in tables:
-            min_r = min_rows_dict.get(table) if min_rows_dict else None
-            max_r = max_rows_dict.get(table) if max_rows_dict else None
-            # Get the min match count for the current table, default to 1 if not provided
-            min_match_c = column_min_match_count_dict.get(
-                table, 1) if column_min_match_count_dict else 1
-
-            # Ensure min_match_c is an int, handle None or non-int values if necessary
-            if not isinstance(min_match_c, int):
-                try:
-                    min_match_c = int(
-                        min_match_c) if min_match_c is not None else 1
-                except ValueError:
-                    min_match_c = 1  # Default if conversion fails
+        conn.execute(text(_UPSERT_TABLE_CONFIG_SQL), params)
 
-            conn.execute(text("""
-            INSERT OR REPLACE INTO table_monitor_config 
-            (db_name, table_name, min_rows, max_rows, column_min_match_count)
-            VALUES (:db, :table, :min_r, :max_r, :min_match_c)
-            """), {
-                "db": db,
-                "table": table,
-                "min_r": min_r,
-                "max_r": max_r,
-                "min_match_c": min_match_c
-            })
+
+def save_table_and_column_configs(db, tables, column_configs_by_table, min_rows_dict=None,
+                                  max_rows_dict=None, column_min_match_count_dict=None):
+    """
+    Save table thresholds and the column configuration of those tables in one
+    transaction, so a failure cannot leave new thresholds next to stale column configs.
+
+    Parameters:
+    - db, tables, min_rows_dict, max_rows_dict, column_min_match_count_dict: as for save_table_config
+    - column_configs_by_table: as for save_column_configs
+    """
+    table_params = _table_config_params(
+        db, tables, min_rows_dict, max_rows_dict, column_min_match_count_dict)
+    upserts, prunes = _column_config_params(db, column_configs_by_table)
+    if not table_params and not prunes:
+        return
+    with engine.begin() as conn:
+        if table_params:
+            conn.execute(text(_UPSERT_TABLE_CONFIG_SQL), table_params)
+        if prunes:
+            conn.execute(text(_PRUNE_COLUMN_CONFIG_SQL), prunes)
+        if upserts:
+            conn.execute(text(_UPSERT_COLUMN_CONFIG_SQL), upserts)
 
 
 def load_saved_table_config():
     return pd.read_sql("SELECT db_name, table_name, min_rows, max_rows, column_min_match_count FROM table_monitor_config", con=engine)
 
 
-def log_table_check_result(db, table, count, status):
+def log_table_check_result(db, table, count, status, total_mb=None):
     with engine.begin() as conn:
         conn.execute(text("""
-        INSERT INTO table_check_log (db_name, table_name, check_time, row_count, status)
-        VALUES (:db, :table, datetime('now'), :count, :status)
-        """), {"db": db, "table": table, "count": count, "status": status})
+        INSERT INTO table_check_log (db_name, table_name, check_time, row_count, status, total_mb)
+        VALUES (:db, :table, datetime('now'), :count, :status, :total_mb)
+        """), {"db": db, "table": table, "count": count, "status": status, "total_mb": total_mb})
 
 
 def get_latest_log():
@@ -185,12 +470,70 @@ def get_latest_log():
 
 
 def save_job_config(jobs):
+    params = [{"job": job} for job in jobs]
+    if not params:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(_INSERT_JOB_CONFIG_SQL), params)
+
+
+def apply_config_bulk(tables=None, columns=None, jobs=None, replace=False):
+    """
+    Apply table, column and job monitoring configuration in a single transaction.
+
+    Parameters:
+    - tables: list of dicts with keys db_name, table_name, min_rows, max_rows, column_min_match_count
+    - columns: list of dicts with keys db_name, table_name, column_name, condition_type, condition_value
+    - jobs: list of job names
+    - replace: When True, configuration rows not present in the input are deleted,
+      so each config table ends up exactly matching the input
+    """
+    tables = tables or []
+    columns = columns or []
+    jobs = jobs or []
+
+    table_params = [{
+        "db": t["db_name"],
+        "table": t["table_name"],
+        "min_r": t.get("min_rows"),
+        "max_r": t.get("max_rows"),
+        "min_match_c": t.get("column_min_match_count", 1)
+    } for t in tables]
+    column_params = [{
+        "db": c["db_name"],
+        "table": c["table_name"],
+        "column": c["column_name"],
+        "cond_type": c["condition_type"],
+        "cond_value": c["condition_value"]
+    } for c in columns]
+    job_params = [{"job": job} for job in jobs]
+
     with engine.begin() as conn:
-        for job in jobs:
+        if replace:
+            conn.execute(text("""
+            DELETE FROM table_monitor_config
+            WHERE (db_name, table_name) NOT IN (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]')
+                FROM json_each(:keep))
+            """), {"keep": json.dumps([[t["db_name"], t["table_name"]] for t in tables])})
+            conn.execute(text("""
+            DELETE FROM column_monitor_config
+            WHERE (db_name, table_name, column_name) NOT IN (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'),
+                       json_extract(value, '$[2]')
+                FROM json_each(:keep))
+            """), {"keep": json.dumps([[c["db_name"], c["table_name"], c["column_name"]] for c in columns])})
             conn.execute(text("""
-            INSERT OR IGNORE INTO job_monitor_config (job_name)
-            VALUES (:job)
-            """), {"job": job})
+            DELETE FROM job_monitor_config
+            WHERE job_name NOT IN (SELECT value FROM json_each(:keep))
+            """), {"keep": json.dumps(list(jobs))})
+
+        if table_params:
+            conn.execute(text(_UPSERT_TABLE_CONFIG_SQL), table_params)
+        if column_params:
+            conn.execute(text(_UPSERT_COLUMN_CONFIG_SQL), column_params)
+        if job_params:
+            conn.execute(text(_INSERT_JOB_CONFIG_SQL), job_params)
 
 
 def load_saved_job_config():
@@ -253,11 +596,8 @@ def log_alert(alert_type, source_type, source_name, status, message=None, detail
         })
 
 
-def get_alerts(limit=100, alert_type=None, source_type=None, status=None, hours_back=None):
-    """
-    Retrieve alerts from the alert_log table with optional filtering
-    """
-    query = "SELECT * FROM alert_log"
+def _alert_filters(alert_type=None, source_type=None, status=None, hours_back=None, source_prefix=None):
+    """Build the WHERE clauses and parameters shared by the alert queries"""
     wheres = []
     params = {}
 
@@ -277,6 +617,22 @@ def get_alerts(limit=100, alert_type=None, source_type=None, status=None, hours_
         wheres.append("alert_time > datetime('now', :time_back)")
         params["time_back"] = f'-{hours_back} hours'
 
+    if source_prefix:
+        # Range instead of LIKE so the comparison stays case-sensitive and indexable
+        wheres.append("source_name >= :source_prefix AND source_name < :source_prefix_end")
+        params["source_prefix"] = source_prefix
+        params["source_prefix_end"] = source_prefix + "\U0010ffff"
+
+    return wheres, params
+
+
+def get_alerts(limit=100, alert_type=None, source_type=None, status=None, hours_back=None):
+    """
+    Retrieve alerts from the alert_log table with optional filtering
+    """
+    query = "SELECT * FROM alert_log"
+    wheres, params = _alert_filters(alert_type, source_type, status, hours_back)
+
     if wheres:
         query += " WHERE " + " AND ".join(wheres)
 
@@ -286,31 +642,148 @@ def get_alerts(limit=100, alert_type=None, source_type=None, status=None, hours_
     return pd.read_sql(query, con=engine, params=params)
 
 
+def get_alerts_page(page_size=50, cursor=None, alert_type=None, source_type=None, status=None,
+                    hours_back=None, source_prefix=None):
+    """
+    Retrieve one page of alerts, newest first, using keyset pagination on (alert_time, id).
+
+    Parameters:
+    - page_size: Number of alerts per page
+    - cursor: (alert_time, id) of the last alert on the previous page, or None for the first page
+    - alert_type, source_type, status, hours_back: Same filters as get_alerts
+    - source_prefix: Only return alerts whose source_name starts with this string
+
+    Returns a (DataFrame, next_cursor) tuple; next_cursor is None on the last page.
+    """
+    query = "SELECT * FROM alert_log"
+    wheres, params = _alert_filters(
+        alert_type, source_type, status, hours_back, source_prefix)
+
+    if cursor:
+        wheres.append("(alert_time, id) < (:cursor_time, :cursor_id)")
+        params["cursor_time"], params["cursor_id"] = cursor
+
+    if wheres:
+        query += " WHERE " + " AND ".join(wheres)
+
+    # Fetch one extra row to know whether another page exists
+    query += " ORDER BY alert_time DESC, id DESC LIMIT :limit"
+    params["limit"] = page_size + 1
+
+    page = pd.read_sql(query, con=engine, params=params)
+    next_cursor = None
+    if len(page) > page_size:
+        page = page.iloc[:page_size]
+        last = page.iloc[-1]
+        next_cursor = (last["alert_time"], int(last["id"]))
+
+    return page, next_cursor
+
+
+def _fts_match_query(search_text):
+    """Turn free text into a safe FTS5 query: every word must match, as a prefix"""
+    terms = re.findall(r"\w+", search_text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_alerts(search_text, page_size=50, cursor=None, alert_type=None, source_type=None,
+                  status=None, hours_back=None, source_prefix=None):
+    """
+    Full-text search over alert messages and details, best matches first, using keyset
+    pagination on (rank, id) like get_alerts_page.
+
+    Parameters:
+    - search_text: Words to look for; each word is matched as a prefix
+    - page_size: Number of hits per page
+    - cursor: next_cursor returned for the previous page, or None for the first page
+    - alert_type, source_type, status, hours_back, source_prefix: Same filters as get_alerts_page
+
+    Returns a (DataFrame, next_cursor) tuple; next_cursor is None on the last page. The
+    DataFrame holds the alert_log columns plus a 'snippet' column with the matching
+    text highlighted. Without the full-text index, hits are newest first and the
+    cursor is (alert_time, id).
+    """
+    match_query = _fts_match_query(search_text)
+    if not match_query:
+        return pd.DataFrame(), None
+
+    wheres, params = _alert_filters(
+        alert_type, source_type, status, hours_back, source_prefix)
+    # Fetch one extra row to know whether another page exists
+    params["limit"] = page_size + 1
+
+    with engine.connect() as conn:
+        has_fts = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='alert_log_fts'")).scalar()
+
+    if has_fts:
+        wheres.insert(0, "alert_log_fts MATCH :match")
+        params["match"] = match_query
+        if cursor:
+            # Lower bm25 ranks are better matches
+            wheres.append("(alert_log_fts.rank, alert_log.id) > (:cursor_rank, :cursor_id)")
+            params["cursor_rank"], params["cursor_id"] = cursor
+        query = f"""
+        SELECT alert_log.*,
+               CASE WHEN instr(snippet(alert_log_fts, 1, '**', '**', '…', 16), '**') > 0
+                    THEN snippet(alert_log_fts, 1, '**', '**', '…', 16)
+                    ELSE snippet(alert_log_fts, 0, '**', '**', '…', 16)
+               END AS snippet,
+               alert_log_fts.rank AS search_rank
+        FROM alert_log_fts
+        JOIN alert_log ON alert_log.id = alert_log_fts.rowid
+        WHERE {" AND ".join(wheres)}
+        ORDER BY alert_log_fts.rank, alert_log.id
+        LIMIT :limit
+        """
+    else:
+        for i, term in enumerate(re.findall(r"\w+", search_text)):
+            wheres.append(
+                f"(message LIKE :term{i} OR details LIKE :term{i})")
+            params[f"term{i}"] = f"%{term}%"
+        if cursor:
+            wheres.append("(alert_time, id) < (:cursor_time, :cursor_id)")
+            params["cursor_time"], params["cursor_id"] = cursor
+        query = f"""
+        SELECT alert_log.*, message AS snippet
+        FROM alert_log
+        WHERE {" AND ".join(wheres)}
+        ORDER BY alert_time DESC, id DESC
+        LIMIT :limit
+        """
+
+    hits = pd.read_sql(query, con=engine, params=params)
+    next_cursor = None
+    if len(hits) > page_size:
+        hits = hits.iloc[:page_size]
+        last = hits.iloc[-1]
+        next_cursor = (float(last["search_rank"]) if has_fts else last["alert_time"],
+                       int(last["id"]))
+    return hits.drop(columns=["search_rank"], errors="ignore"), next_cursor
+
+
 def save_column_config(db_name, table_name, column_configs):
     """
     Save column monitoring configuration
     column_configs: list of dicts with keys: column_name, condition_type, condition_value
     """
-    with engine.begin() as conn:
-        # First delete existing config for this table
-        conn.execute(text("""
-        DELETE FROM column_monitor_config
-        WHERE db_name = :db AND table_name = :table
-        """), {"db": db_name, "table": table_name})
+    save_column_configs(db_name, {table_name: column_configs})
 
-        # Insert new configurations
-        for config in column_configs:
-            conn.execute(text("""
-            INSERT INTO column_monitor_config 
-            (db_name, table_name, column_name, condition_type, condition_value)
-            VALUES (:db, :table, :column, :cond_type, :cond_value)
-            """), {
-                "db": db_name,
-                "table": table_name,
-                "column": config["column_name"],
-                "cond_type": config["condition_type"],
-                "cond_value": config["condition_value"]
-            })
+
+def save_column_configs(db_name, column_configs_by_table):
+    """
+    Save column monitoring configuration for several tables in one transaction.
+    column_configs_by_table: dict of table name -> list of dicts with keys
+    column_name, condition_type, condition_value. Columns of those tables that are
+    not listed are removed; an empty list clears the table's configuration.
+    """
+    upserts, prunes = _column_config_params(db_name, column_configs_by_table)
+    if not prunes:
+        return
+    with engine.begin() as conn:
+        conn.execute(text(_PRUNE_COLUMN_CONFIG_SQL), prunes)
+        if upserts:
+            conn.execute(text(_UPSERT_COLUMN_CONFIG_SQL), upserts)
 
 
 def load_column_config(db_name=None, table_name=None):
@@ -330,3 +803,382 @@ def load_column_config(db_name=None, table_name=None):
         query += " WHERE " + " AND ".join(wheres)
 
     return pd.read_sql(query, con=engine, params=params)
+
+
+def _rollup_table_checks(conn, source, target, bucket_format, cutoff):
+    """Fold table check rows older than cutoff from source into target buckets."""
+    if source == "table_check_log":
+        # Raw rows: one sample each, status counted by its severity
+        src = f"""
+        SELECT id, db_name, table_name, check_time,
+               strftime('{bucket_format}', check_time) AS bucket,
+               1 AS sample_count,
+               row_count AS min_row_count, row_count AS max_row_count,
+               row_count AS last_row_count, total_mb AS last_total_mb,
+               check_time AS last_check_time,
+               sev = 0 AS ok_count, sev = 1 AS warn_count,
+               sev = 2 AS empty_count, sev = 3 AS error_count,
+               sev AS worst_severity, status AS worst_status
+        FROM (SELECT *, {_STATUS_SEVERITY_SQL} AS sev FROM table_check_log)
+        WHERE check_time < :cutoff
+        """
+    else:
+        src = f"""
+        SELECT id, db_name, table_name, last_check_time AS check_time,
+               strftime('{bucket_format}', bucket) AS bucket,
+               sample_count, min_row_count, max_row_count, last_row_count,
+               last_total_mb, last_check_time, ok_count, warn_count, empty_count, error_count,
+               worst_severity, worst_status
+        FROM {source}
+        WHERE bucket < :cutoff
+        """
+
+    conn.execute(text(f"""
+    INSERT INTO {target}
+    (db_name, table_name, bucket, sample_count, min_row_count, max_row_count,
+     last_row_count, last_total_mb, last_check_time, ok_count, warn_count,
+     empty_count, error_count, worst_severity, worst_status)
+    WITH src AS ({src}),
+    ranked AS (
+        SELECT *,
+            ROW_NUMBER() OVER (
+                PARTITION BY db_name, table_name, bucket
+                ORDER BY check_time DESC, id DESC) AS recency,
+            FIRST_VALUE(worst_status) OVER (
+                PARTITION BY db_name, table_name, bucket
+                ORDER BY worst_severity DESC, check_time DESC, id DESC) AS bucket_worst_status
+        FROM src
+    )
+    SELECT db_name, table_name, bucket, SUM(sample_count),
+           MIN(min_row_count), MAX(max_row_count),
+           MAX(CASE WHEN recency = 1 THEN last_row_count END),
+           MAX(CASE WHEN recency = 1 THEN last_total_mb END),
+           MAX(last_check_time),
+           SUM(ok_count), SUM(warn_count), SUM(empty_count), SUM(error_count),
+           MAX(worst_severity), MAX(bucket_worst_status)
+    FROM ranked
+    WHERE true
+    GROUP BY db_name, table_name, bucket
+    ON CONFLICT(db_name, table_name, bucket) DO UPDATE SET
+        sample_count = sample_count + excluded.sample_count,
+        min_row_count = MIN(COALESCE(min_row_count, excluded.min_row_count),
+                            COALESCE(excluded.min_row_count, min_row_count)),
+        max_row_count = MAX(COALESCE(max_row_count, excluded.max_row_count),
+                            COALESCE(excluded.max_row_count, max_row_count)),
+        last_row_count = CASE WHEN excluded.last_check_time >= last_check_time
+                              THEN excluded.last_row_count ELSE last_row_count END,
+        last_total_mb = CASE WHEN excluded.last_check_time >= last_check_time
+                             THEN excluded.last_total_mb ELSE last_total_mb END,
+        last_check_time = MAX(last_check_time, excluded.last_check_time),
+        ok_count = ok_count + excluded.ok_count,
+        warn_count = warn_count + excluded.warn_count,
+        empty_count = empty_count + excluded.empty_count,
+        error_count = error_count + excluded.error_count,
+        worst_status = CASE WHEN excluded.worst_severity > worst_severity
+                            THEN excluded.worst_status ELSE worst_status END,
+        worst_severity = MAX(worst_severity, excluded.worst_severity)
+    """), {"cutoff": cutoff})
+
+    time_column = "check_time" if source == "table_check_log" else "bucket"
+    result = conn.execute(text(f"DELETE FROM {source} WHERE {time_column} < :cutoff"),
+                          {"cutoff": cutoff})
+    return result.rowcount
+
+
+def _rollup_job_checks(conn, source, target, bucket_format, cutoff):
+    """Fold job check rows older than cutoff from source into target buckets."""
+    if source == "job_monitor_log":
+        src = f"""
+        SELECT id, job_name, check_time,
+               strftime('{bucket_format}', check_time) AS bucket,
+               1 AS sample_count, status AS last_status, last_run,
+               check_time AS last_check_time,
+               sev = 0 AS ok_count, sev IN (1, 2) AS warn_count,
+               sev = 3 AS error_count,
+               sev AS worst_severity, status AS worst_status
+        FROM (SELECT *, {_STATUS_SEVERITY_SQL} AS sev FROM job_monitor_log)
+        WHERE check_time < :cutoff
+        """
+    else:
+        src = f"""
+        SELECT id, job_name, last_check_time AS check_time,
+               strftime('{bucket_format}', bucket) AS bucket,
+               sample_count, last_status, last_run, last_check_time,
+               ok_count, warn_count, error_count, worst_severity, worst_status
+        FROM {source}
+        WHERE bucket < :cutoff
+        """
+
+    conn.execute(text(f"""
+    INSERT INTO {target}
+    (job_name, bucket, sample_count, last_status, last_run, last_check_time,
+     ok_count, warn_count, error_count, worst_severity, worst_status)
+    WITH src AS ({src}),
+    ranked AS (
+        SELECT *,
+            ROW_NUMBER() OVER (
+                PARTITION BY job_name, bucket
+                ORDER BY check_time DESC, id DESC) AS recency,
+            FIRST_VALUE(worst_status) OVER (
+                PARTITION BY job_name, bucket
+                ORDER BY worst_severity DESC, check_time DESC, id DESC) AS bucket_worst_status
+        FROM src
+    )
+    SELECT job_name, bucket, SUM(sample_count),
+           MAX(CASE WHEN recency = 1 THEN last_status END),
+           MAX(CASE WHEN recency = 1 THEN last_run END),
+           MAX(last_check_time),
+           SUM(ok_count), SUM(warn_count), SUM(error_count),
+           MAX(worst_severity), MAX(bucket_worst_status)
+    FROM ranked
+    WHERE true
+    GROUP BY job_name, bucket
+    ON CONFLICT(job_name, bucket) DO UPDATE SET
+        sample_count = sample_count + excluded.sample_count,
+        last_status = CASE WHEN excluded.last_check_time >= last_check_time
+                           THEN excluded.last_status ELSE last_status END,
+        last_run = CASE WHEN excluded.last_check_time >= last_check_time
+                        THEN excluded.last_run ELSE last_run END,
+        last_check_time = MAX(last_check_time, excluded.last_check_time),
+        ok_count = ok_count + excluded.ok_count,
+        warn_count = warn_count + excluded.warn_count,
+        error_count = error_count + excluded.error_count,
+        worst_status = CASE WHEN excluded.worst_severity > worst_severity
+                            THEN excluded.worst_status ELSE worst_status END,
+        worst_severity = MAX(worst_severity, excluded.worst_severity)
+    """), {"cutoff": cutoff})
+
+    time_column = "check_time" if source == "job_monitor_log" else "bucket"
+    result = conn.execute(text(f"DELETE FROM {source} WHERE {time_column} < :cutoff"),
+                          {"cutoff": cutoff})
+    return result.rowcount
+
+
+def compact_check_history(raw_retention_days=RAW_CHECK_RETENTION_DAYS,
+                          hourly_retention_days=HOURLY_ROLLUP_RETENTION_DAYS):
+    """
+    Downsample old check history into hourly and daily rollup tables.
+
+    Raw table_check_log / job_monitor_log rows older than raw_retention_days are
+    folded into the *_rollup_hourly tables and deleted. Hourly buckets older than
+    hourly_retention_days are then folded into the *_rollup_daily tables and
+    deleted. Cutoffs are aligned to bucket boundaries so only complete buckets
+    are rolled up, and re-running merges into existing buckets. Sampled query_log
+    timings older than QUERY_LOG_RETENTION_DAYS are deleted.
+
+    Returns a dict with the number of rows removed from each source table.
+    """
+    hour_format = '%Y-%m-%d %H:00:00'
+    day_format = '%Y-%m-%d 00:00:00'
+
+    with engine.begin() as conn:
+        # Fix the cutoffs once so the insert and delete of each step agree
+        raw_cutoff = conn.execute(text(f"SELECT strftime('{hour_format}', 'now', :age)"),
+                                  {"age": f"-{int(raw_retention_days)} days"}).scalar()
+        hourly_cutoff = conn.execute(text(f"SELECT strftime('{day_format}', 'now', :age)"),
+                                     {"age": f"-{int(hourly_retention_days)} days"}).scalar()
+
+        return {
+            "table_check_log": _rollup_table_checks(
+                conn, "table_check_log", "table_check_rollup_hourly", hour_format, raw_cutoff),
+            "job_monitor_log": _rollup_job_checks(
+                conn, "job_monitor_log", "job_check_rollup_hourly", hour_format, raw_cutoff),
+            "table_check_rollup_hourly": _rollup_table_checks(
+                conn, "table_check_rollup_hourly", "table_check_rollup_daily", day_format, hourly_cutoff),
+            "job_check_rollup_hourly": _rollup_job_checks(
+                conn, "job_check_rollup_hourly", "job_check_rollup_daily", day_format, hourly_cutoff),
+            "query_log": conn.execute(text(
+                "DELETE FROM query_log WHERE logged_at < datetime('now', :age)"),
+                {"age": f"-{QUERY_LOG_RETENTION_DAYS} days"}).rowcount,
+        }
+
+
+def log_query_samples(samples):
+    """
+    Write sampled SQL Server call timings to query_log in one transaction.
+
+    Parameters:
+    - samples: dicts with function, operation, db_name, table_name, duration_ms,
+      rows, bytes and error keys (see components/telemetry.py)
+    """
+    if not samples:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("""
+        INSERT INTO query_log (logged_at, function, operation, db_name, table_name,
+                               duration_ms, rows, bytes, error)
+        VALUES (datetime('now'), :function, :operation, :db_name, :table_name,
+                :duration_ms, :rows, :bytes, :error)
+        """), samples)
+
+
+def get_slow_queries(hours_back=24, limit=20):
+    """Slowest sampled SQL Server calls of the last hours_back hours, slowest first"""
+    return pd.read_sql(text("""
+    SELECT logged_at, function, operation, db_name, table_name, duration_ms, rows, error
+    FROM query_log
+    WHERE logged_at >= datetime('now', :age)
+    ORDER BY duration_ms DESC
+    LIMIT :limit
+    """), con=engine, params={"age": f"-{int(hours_back)} hours", "limit": int(limit)})
+
+
+def save_profile_run(view, total_ms, phases, hotspots, profile, keep=MAX_PROFILE_RUNS):
+    """
+    Store one profiled rerun, keeping only the newest keep runs.
+
+    Parameters:
+    - view: view that was rendered (e.g. '📺 Dashboard View')
+    - total_ms: wall time of the whole rerun
+    - phases: {phase name: milliseconds}
+    - hotspots: list of per-function dicts (see components/profiling.py)
+    - profile: compressed raw profile
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+        INSERT INTO profile_runs (profiled_at, view, total_ms, phases, hotspots, profile)
+        VALUES (datetime('now'), :view, :total_ms, :phases, :hotspots, :profile)
+        """), {"view": view, "total_ms": total_ms, "phases": json.dumps(phases),
+               "hotspots": json.dumps(hotspots), "profile": profile})
+        conn.execute(text("""
+        DELETE FROM profile_runs
+        WHERE id <= (SELECT MAX(id) FROM profile_runs) - :keep
+        """), {"keep": int(keep)})
+
+
+def get_profile_runs():
+    """Stored profiled reruns, newest first, with their phase timings (ms) as columns"""
+    runs = pd.read_sql(
+        "SELECT id, profiled_at, view, total_ms, phases FROM profile_runs ORDER BY id DESC",
+        con=engine)
+    phases = pd.DataFrame([json.loads(p) for p in runs["phases"]], index=runs.index)
+    return pd.concat([runs.drop(columns=["phases"]), phases], axis=1)
+
+
+def get_profile_run(run_id):
+    """Hotspots (DataFrame) and compressed raw profile of one stored run, or (None, None)"""
+    with engine.begin() as conn:
+        row = conn.execute(text("SELECT hotspots, profile FROM profile_runs WHERE id = :id"),
+                           {"id": int(run_id)}).fetchone()
+    if row is None:
+        return None, None
+    return pd.DataFrame(json.loads(row[0])), row[1]
+
+
+def get_table_trend(db_name, table_name, hours_back=24):
+    """
+    Row count and size history of one table over the last hours_back hours, oldest first.
+
+    Recent history comes from raw table_check_log rows, older history from the hourly and
+    daily rollups (one point per bucket, its last sample), so every range reads a bounded
+    number of rows. Returns a DataFrame with check_time, row_count and total_mb columns.
+    """
+    query = text("""
+    SELECT check_time, row_count, total_mb
+    FROM (
+        SELECT check_time, row_count, total_mb
+        FROM table_check_log
+        WHERE db_name = :db_name AND table_name = :table_name AND check_time >= :since
+        UNION ALL
+        SELECT last_check_time, last_row_count, last_total_mb
+        FROM table_check_rollup_hourly
+        WHERE db_name = :db_name AND table_name = :table_name AND bucket >= :since_bucket
+        UNION ALL
+        SELECT last_check_time, last_row_count, last_total_mb
+        FROM table_check_rollup_daily
+        WHERE db_name = :db_name AND table_name = :table_name AND bucket >= :since_bucket
+    )
+    ORDER BY check_time
+    """)
+    with engine.begin() as conn:
+        since = conn.execute(text("SELECT datetime('now', :age)"),
+                             {"age": f"-{int(hours_back)} hours"}).scalar()
+        # Include the partially covered bucket the range starts in
+        since_bucket = since[:10] + " 00:00:00"
+        df = pd.read_sql(query, con=conn, params={
+            "db_name": db_name, "table_name": table_name,
+            "since": since, "since_bucket": since_bucket})
+    df["check_time"] = pd.to_datetime(df["check_time"])
+    return df
+
+
+def maybe_compact_check_history(min_interval_seconds=COMPACTION_INTERVAL_SECONDS):
+    """Run compact_check_history at most once per min_interval_seconds in this process."""
+    global _last_compaction
+    now = time.monotonic()
+    if _last_compaction and now - _last_compaction < min_interval_seconds:
+        return None
+    _last_compaction = now
+    try:
+        return compact_check_history()
+    except Exception as e:
+        print(f"Error compacting check history: {str(e)}")
+        return None
+
+
+def _json_default(value):
+    """Serialize numpy scalars and timestamps found in result records"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def save_dashboard_snapshot(table_results, job_results, collected_at):
+    """
+    Persist the latest dashboard collection (table and job results) as one
+    zlib-compressed JSON row, replacing the previous one.
+    """
+    payload = zlib.compress(json.dumps(
+        {"table_results": table_results, "job_results": job_results},
+        default=_json_default, separators=(",", ":")).encode("utf-8"))
+    with engine.begin() as conn:
+        conn.execute(text("""
+        INSERT INTO dashboard_snapshot (id, collected_at, payload, version)
+        VALUES (1, :collected_at, :payload, 1)
+        ON CONFLICT(id) DO UPDATE SET
+            collected_at = excluded.collected_at,
+            payload = excluded.payload,
+            version = version + 1
+        """), {"collected_at": collected_at, "payload": payload})
+
+
+def load_dashboard_snapshot():
+    """
+    The last persisted dashboard collection as {'table_results': [...],
+    'job_results': [...], 'collected_at': str, 'version': int}, or None.
+    """
+    try:
+        with engine.begin() as conn:
+            row = conn.execute(text(
+                "SELECT collected_at, payload, version FROM dashboard_snapshot WHERE id = 1")).fetchone()
+        if row is None:
+            return None
+        snapshot = json.loads(zlib.decompress(row[1]).decode("utf-8"))
+        snapshot["collected_at"] = row[0]
+        snapshot["version"] = row[2]
+        return snapshot
+    except Exception as e:
+        print(f"Error loading dashboard snapshot: {str(e)}")
+        return None
+
+
+def get_store_versions():
+    """
+    Cheap change markers of the local store, for conditional HTTP responses:
+    - snapshot: version of the persisted dashboard snapshot (0 if none yet)
+    - alerts: highest alert_log id
+    - checks: lowest and highest table_check_log id (compaction moves the lowest)
+    Each is read from the rowid b-tree ends, so the cost does not grow with the tables.
+    """
+    with engine.begin() as conn:
+        row = conn.execute(text("""
+        SELECT (SELECT version FROM dashboard_snapshot WHERE id = 1),
+               (SELECT MAX(id) FROM alert_log),
+               (SELECT MIN(id) FROM table_check_log),
+               (SELECT MAX(id) FROM table_check_log)
+        """)).fetchone()
+    return {
+        "snapshot": row[0] or 0,
+        "alerts": row[1] or 0,
+        "checks": f"{row[2] or 0}-{row[3] or 0}",
+    }
@@ -0,0 +1,440 @@
+"""
+In-process stand-in for the SQL Server instance the monitor queries, for benchmarks
+and offline runs without 10.1.1.88.
+
+FakeSqlServer generates a catalog (databases, tables with row counts, sizes and
+columns) and msdb job tables (jobs, run history, running jobs, steps), and answers
+the statements components/sql.py sends: sys.databases, INFORMATION_SCHEMA, USE,
+sp_spaceused, COUNT(*) with or without column conditions, key lookup, DISTINCT and
+paged reads, and the msdb job queries. Every statement and connection sleeps for a
+configurable latency and is counted, so benchmarks can measure query counts and
+connections opened as well as wall time.
+
+    from components.fake_sqlserver import FakeSqlServer
+    server = FakeSqlServer(databases=4, tables_per_db=50, jobs=40, latency_ms=2)
+    server.install()   # components.sql now connects to the fake server
+    ...
+    server.uninstall()
+
+Statements it does not recognise raise Error, which derives from pyodbc.Error like
+the real driver's errors (from Exception where pyodbc cannot be loaded).
+
+Of a WHERE clause only the `[column] IN (?, ...)` / `[column] IS NULL` filters of
+drill-down pages and distinct values, and keyset seeks on Id, are applied; other
+predicates (e.g. column conditions) are ignored, and COUNT(*) ... WHERE returns a
+fixed share of the rows.
+"""
+import itertools
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from components.sql import set_sql_driver
+
+try:
+    from pyodbc import Error as _DriverError
+except ImportError:
+    # No ODBC driver manager here (libodbc); the fake server does not need one
+    _DriverError = Exception
+
+JOB_STATUS_CODES = {"Failed": 0, "Succeeded": 1, "Retry": 2, "Canceled": 3}
+
+# Columns of every generated table: (name, data type)
+TABLE_COLUMNS = [("Id", "int"), ("CreatedAt", "datetime"), ("Status", "varchar"),
+                 ("Processed", "bit"), ("Amount", "decimal")]
+STATUS_VALUES = ["New", "Queued", "Done", "Failed"]
+# Rows a filtered read looks at before giving up, like a timeout on a huge table
+FILTER_SCAN_ROWS = 100_000
+
+
+class Error(_DriverError):
+    pass
+
+
+def _hhmmss(seconds):
+    """msdb's integer HHMMSS encoding of a time of day or a duration"""
+    seconds = int(seconds)
+    return (seconds // 3600) * 10000 + (seconds // 60 % 60) * 100 + seconds % 60
+
+
+class FakeSqlServer:
+    """
+    Synthetic SQL Server with configurable volumes and latency.
+
+    Parameters:
+    - databases, tables_per_db: catalog size (databases are FakeDB00, FakeDB01, ...)
+    - jobs: number of SQL Agent jobs (FakeJob000, ...), running_jobs of them running now
+    - runs_per_day, history_days: job run history volume
+    - max_rows: upper bound of generated table row counts (about 5% of tables are empty)
+    - failure_rate: share of job runs that failed
+    - latency_ms: round trip of every statement; row_latency_ms is added per row returned
+    - connect_ms: time to open a connection
+    - seed: generated data depends only on the parameters and the seed
+    """
+
+    Error = Error
+
+    def __init__(self, databases=2, tables_per_db=10, jobs=10, running_jobs=2, runs_per_day=24,
+                 history_days=14, max_rows=1_000_000, failure_rate=0.05, latency_ms=1.0,
+                 row_latency_ms=0.0, connect_ms=5.0, seed=0):
+        self.latency_ms = latency_ms
+        self.row_latency_ms = row_latency_ms
+        self.connect_ms = connect_ms
+        self.now = datetime.now().replace(microsecond=0)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+        rng = random.Random(seed)
+        self.catalog = {}
+        for d in range(databases):
+            tables = {}
+            for t in range(tables_per_db):
+                rows = 0 if rng.random() < 0.05 else rng.randint(1, max_rows)
+                row_bytes = rng.randint(40, 400)
+                tables[f"Table{t:03d}"] = {
+                    "rows": rows,
+                    "data_kb": rows * row_bytes // 1024,
+                    "index_kb": rows * row_bytes // 8192,
+                    "match_fraction": rng.random(),
+                }
+            self.catalog[f"FakeDB{d:02d}"] = tables
+
+        self.jobs = {}
+        self.history = []  # (job, run datetime, duration seconds, status, instance id)
+        interval = timedelta(days=1) / max(1, runs_per_day)
+        instance = 0
+        for j in range(jobs):
+            name = f"FakeJob{j:03d}"
+            base_duration = rng.randint(5, 1800)
+            self.jobs[name] = {
+                "created": self.now - timedelta(days=365),
+                "enabled": 1,
+                "running_since": (self.now - timedelta(minutes=7 * (j + 1))
+                                  if j < running_jobs else None),
+                "steps": [(s + 1, f"Step {s + 1}", rng.choice(["TSQL", "SSIS", "CmdExec"]))
+                          for s in range(rng.randint(1, 4))],
+            }
+            run_at = self.now - timedelta(days=history_days) + interval * rng.random()
+            while run_at < self.now:
+                instance += 1
+                status = "Failed" if rng.random() < failure_rate else "Succeeded"
+                # Occasional outliers so duration anomaly detection has work to do
+                factor = rng.choice([0.2, 3.0]) if rng.random() < 0.03 else rng.gauss(1, 0.1)
+                self.history.append((name, run_at, max(1, int(base_duration * factor)),
+                                     status, instance))
+                run_at += interval
+        self.history.sort(key=lambda run: run[1], reverse=True)
+
+    # --- driver interface -------------------------------------------------
+
+    def connect(self, conn_str, **kwargs):
+        """pyodbc.connect equivalent; the DATABASE= part of conn_str selects the database"""
+        match = re.search(r"DATABASE=([^;]+);", conn_str)
+        self._sleep(self.connect_ms)
+        with self._lock:
+            self.connections += 1
+        return FakeConnection(self, match.group(1) if match else "master")
+
+    def install(self):
+        """Make components.sql connect to this server"""
+        set_sql_driver(self)
+        return self
+
+    def uninstall(self):
+        set_sql_driver(None)
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.queries = Counter()
+            self.rows_returned = 0
+
+    def counters(self):
+        """Connections opened, statements run (total and per kind) and rows returned"""
+        with self._lock:
+            return {"connections": self.connections,
+                    "queries": sum(self.queries.values()),
+                    "queries_by_kind": dict(self.queries),
+                    "rows_returned": self.rows_returned}
+
+    def _sleep(self, ms):
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    # --- statements -------------------------------------------------------
+
+    def execute(self, connection, sql, params):
+        """Run one statement; returns (column names, rows)"""
+        kind, columns, rows = self._route(connection, sql, params)
+        with self._lock:
+            self.queries[kind] += 1
+            self.rows_returned += len(rows)
+        self._sleep(self.latency_ms + self.row_latency_ms * len(rows))
+        return columns, rows
+
+    def _table(self, db, sql):
+        match = re.search(r"FROM\s+(?:\[[^\]]+\]\.\[dbo\]\.)?\[([^\]]+)\]", sql)
+        tables = self.catalog.get(db, {})
+        if not match or match.group(1) not in tables:
+            raise Error(f"Invalid object name '{match.group(1) if match else sql.strip()[:40]}'")
+        return match.group(1), tables[match.group(1)]
+
+    def _route(self, connection, sql, params):
+        db = connection.db
+        text = " ".join(sql.split())
+
+        if text == "SELECT 1":
+            return "ping", [""], [(1,)]
+        if "sys.databases" in text:
+            return "databases", ["name"], [(name,) for name in self.catalog]
+        if "INFORMATION_SCHEMA.TABLES" in text:
+            return "tables", ["TABLE_NAME"], [(t,) for t in self.catalog.get(db, {})]
+        if "INFORMATION_SCHEMA.COLUMNS" in text:
+            if "TABLE_NAME = ?" in text:
+                if params[0] not in self.catalog.get(db, {}):
+                    return "columns", ["COLUMN_NAME", "DATA_TYPE"], []
+                return "columns", ["COLUMN_NAME", "DATA_TYPE"], list(TABLE_COLUMNS)
+            return "columns", ["TABLE_NAME", "COLUMN_NAME", "DATA_TYPE"], [
+                (t, c, kind) for t in self.catalog.get(db, {}) for c, kind in TABLE_COLUMNS]
+        match = re.match(r"USE \[?(\w+)\]?;?$", text)
+        if match:
+            if match.group(1) not in self.catalog and match.group(1) != "msdb":
+                raise Error(f"Database '{match.group(1)}' does not exist")
+            connection.db = match.group(1)
+            return "use", [], []
+        match = re.search(r"sp_spaceused N'([^']+)'", text)
+        if match:
+            table = self.catalog.get(db, {}).get(match.group(1))
+            if table is None:
+                raise Error(f"The object '{match.group(1)}' does not exist in database '{db}'")
+            return "spaceused", ["name", "rows", "reserved", "data", "index_size", "unused"], [(
+                match.group(1), str(table["rows"]),
+                f"{table['data_kb'] + table['index_kb']} KB", f"{table['data_kb']} KB",
+                f"{table['index_kb']} KB", "0 KB")]
+        if "sys.index_columns" in text:
+            # Every generated table has a clustered primary key on Id
+            return "key_columns", ["index_id", "type", "is_unique", "is_primary_key",
+                                   "name", "is_nullable"], [(1, 1, True, True, "Id", False)]
+        if "COUNT(*)" in text:
+            _, table = self._table(db, text)
+            if " WHERE " in text:
+                return "count_where", [""], [(int(table["rows"] * table["match_fraction"]),)]
+            return "count", [""], [(table["rows"],)]
+        if "sysjobhistory" in text or "sysjobactivity" in text:
+            return self._route_msdb(text, params)
+        match = re.match(r"SELECT DISTINCT TOP \((\d+)\) \[([^\]]+)\]", text)
+        if match:
+            name, table = self._table(db, text)
+            predicates = self._in_predicates(text, params)
+            column = self._column_index(match.group(2))
+            values = sorted({self._row(name, i)[column]
+                             for i in self._matching_ids(name, table, 1, predicates, scan=1000)},
+                            key=str)
+            return "distinct", [match.group(2)], [(v,) for v in values[:int(match.group(1))]]
+        if text.startswith("SELECT"):
+            return self._route_page(db, text, params)
+        raise Error(f"Fake SQL Server does not understand: {text[:80]}")
+
+    def _route_msdb(self, text, params):
+        if "DATEDIFF(HOUR" in text:
+            excluded, hours_back = set(params[:-1]), params[-1]
+            since = self.now - timedelta(hours=hours_back)
+            return "job_history", ["job_name", "run_date", "run_time", "run_duration",
+                                   "status", "message"], [
+                (job, int(at.strftime("%Y%m%d")), _hhmmss(at.hour * 3600 + at.minute * 60 + at.second),
+                 _hhmmss(duration), status,
+                 "The job failed." if status == "Failed" else "The job succeeded.")
+                for job, at, duration, status, _ in self.history
+                if at >= since and job not in excluded]
+        if "run_status = 1" in text and "TOP" in text:
+            sample_size = int(re.search(r"TOP (\d+)", text).group(1))
+            durations = [(_hhmmss(duration),) for job, _, duration, status, _ in self.history
+                         if job == params[0] and status == "Succeeded"]
+            return "job_duration_stats", ["run_duration"], durations[:sample_size]
+        if "DATEDIFF(MINUTE" in text:
+            rows = []
+            for name, job in self.jobs.items():
+                if job["running_since"] is not None and name not in params:
+                    step_id, step_name, _ = job["steps"][0]
+                    rows.append((name, job["running_since"],
+                                 int((self.now - job["running_since"]).total_seconds() // 60),
+                                 step_id, step_name))
+            rows.sort(key=lambda row: row[1], reverse=True)
+            return "active_jobs", ["job_name", "start_execution_date", "duration_minutes",
+                                   "current_step", "step_name"], rows
+        if "next_run_date" in text:
+            last_runs = {}
+            for run in self.history:
+                last_runs.setdefault(run[0], run)
+            rows = []
+            for name in sorted(self.jobs):
+                if name in params:
+                    continue
+                job, last = self.jobs[name], last_runs.get(name)
+                rows.append((
+                    name, "sa",
+                    "Running" if job["running_since"] else "Enabled",
+                    last[1].strftime("%Y%m%d") if last else None,
+                    last[3] if last else None,
+                    (self.now + timedelta(hours=1)).strftime("%Y%m%d")))
+            return "all_jobs", ["job_name", "job_owner", "current_status", "last_run",
+                                "last_status", "next_run"], rows
+        if "sysjobsteps" in text and "WHERE j.name = ?" in text:
+            job = self.jobs.get(params[0])
+            if job is None:
+                return "job_steps", [], []
+            return "job_steps", ["step_id", "step_name", "subsystem", "last_run_status",
+                                 "last_run_time", "duration_seconds"], [
+                (step_id, step_name, subsystem, "Succeeded",
+                 self.now.strftime("%Y-%m-%d %H:%M:%S"), 30)
+                for step_id, step_name, subsystem in job["steps"]]
+        if "SUSER_SNAME" in text and "WHERE j.name = ?" in text:
+            job = self.jobs.get(params[0])
+            if job is None:
+                return "job_details", [], []
+            return "job_details", ["job_name", "job_owner", "description", "enabled",
+                                   "date_created", "date_modified", "current_status"], [(
+                params[0], "sa", "Synthetic job", job["enabled"], job["created"],
+                job["created"], "Running" if job["running_since"] else "Enabled")]
+        raise Error(f"Fake SQL Server does not understand: {text[:80]}")
+
+    def _column_index(self, column):
+        for i, (name, _) in enumerate(TABLE_COLUMNS):
+            if name == column:
+                return i
+        raise Error(f"Invalid column name '{column}'")
+
+    def _row(self, table, row_id):
+        """Deterministic contents of row row_id of a generated table"""
+        return (row_id, self.now - timedelta(minutes=row_id), STATUS_VALUES[row_id % 4],
+                row_id % 3 == 0, round(row_id * 1.25, 2))
+
+    def _in_predicates(self, text, params):
+        """
+        {column index: allowed values} from the `[column] IN (?, ...)` and
+        `[column] IS NULL` filters of a statement (see sql._filter_predicates)
+        """
+        predicates = {}
+        for match in re.finditer(r"\[([^\]]+)\] (?:IN \(([?,]+)\)|IS NULL)", text):
+            allowed = predicates.setdefault(self._column_index(match.group(1)), set())
+            if match.group(2):
+                first = text[:match.start()].count("?")
+                allowed.update(params[first:first + match.group(2).count("?")])
+            else:
+                allowed.add(None)
+        return predicates
+
+    def _matching_ids(self, name, table, start, predicates, scan=FILTER_SCAN_ROWS):
+        """Ids from start on of the rows passing predicates, looking at up to scan rows"""
+        for row_id in range(start, min(table["rows"] + 1, start + scan)):
+            if predicates:
+                row = self._row(name, row_id)
+                if not all(row[k] in allowed for k, allowed in predicates.items()):
+                    continue
+            yield row_id
+
+    def _route_page(self, db, text, params):
+        name, table = self._table(db, text)
+        match = re.match(r"SELECT (?:TOP \((\d+)\) )?(.+?) FROM", text)
+        limit = int(match.group(1)) if match.group(1) else None
+        fetch = re.search(r"FETCH NEXT (\d+) ROWS ONLY", text)
+        if fetch:
+            limit = int(fetch.group(1))
+        # Unbounded reads (e.g. pd.read_sql of today's rows) are capped like a filter would
+        limit = 1000 if limit is None else min(limit, 1000)
+        offset = re.search(r"OFFSET (\d+) ROWS", text)
+        skip = int(offset.group(1)) if offset else 0
+        start = int(params[-1]) + 1 if "[Id] > ?" in text else 1
+
+        if match.group(2).strip() == "*":
+            columns = [c for c, _ in TABLE_COLUMNS]
+        else:
+            columns = re.findall(r"\[([^\]]+)\]", match.group(2))
+        indexes = [self._column_index(c) for c in columns]
+        predicates = self._in_predicates(text, params)
+        if predicates:
+            ids = itertools.islice(
+                self._matching_ids(name, table, start, predicates), skip, skip + limit)
+        else:
+            ids = range(start + skip, min(table["rows"] + 1, start + skip + limit))
+        rows = [tuple(self._row(name, i)[k] for k in indexes) for i in ids]
+        return "page", columns, rows
+
+
+class FakeConnection:
+    def __init__(self, server, db):
+        self.server = server
+        self.db = db
+        self.closed = False
+
+    def cursor(self):
+        if self.closed:
+            raise Error("Attempt to use a closed connection.")
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+        self._position = 0
+
+    def execute(self, sql, *params):
+        # pyodbc accepts parameters either spread out or as one sequence
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        columns, rows = self.connection.server.execute(self.connection, sql, list(params))
+        self.description = [(c, None, None, None, None, None, True) for c in columns] or None
+        self.rowcount = len(rows)
+        self._rows = rows
+        self._position = 0
+        return self
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -0,0 +1,111 @@
+"""
+Import-time check of the modules that must load without Streamlit.
+
+components.checks and the command-line tools built on it (check runner, config
+import/export, JSON API, metrics exporter) are meant to start quickly and to load
+neither Streamlit nor the ODBC driver (pyodbc is imported on the first SQL Server
+connection). Each module is imported in a fresh interpreter under
+python -X importtime, --repeat times; the median wall time is checked against
+--budget. Run from the repository root:
+
+    python -m components.import_benchmark
+    python -m components.import_benchmark components.checks --budget 0.8 --repeat 5
+
+The exit code is 1 when a module exceeds the budget or loads a forbidden package.
+The packages contributing most to each import are listed, so a new heavy
+dependency shows up by name.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+import pandas as pd
+
+MODULES = ["components.checks", "components.check_runner", "components.config_io",
+           "components.api", "components.metrics"]
+FORBIDDEN = ["streamlit", "pyodbc"]
+
+# Run in the child: time the import and report which forbidden packages it loaded
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed,
+                  "forbidden": sorted({{m.split(".")[0] for m in sys.modules}} & set({forbidden!r}))}}))
+"""
+
+
+def _self_time_by_package(importtime_output):
+    """Microseconds of own import time per top-level package from -X importtime lines"""
+    totals = Counter()
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        totals[fields[2].strip().split(".")[0]] += int(fields[0])
+    return totals
+
+
+def measure(module, repeat=3):
+    """
+    Import module in repeat fresh interpreters. Returns a result dict with the median
+    import time, the forbidden packages loaded and the heaviest packages of the last run.
+    """
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c",
+             _CHILD.format(module=module, forbidden=FORBIDDEN)],
+            capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip()[-2000:]}")
+        runs.append((json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr))
+
+    result, importtime_output = runs[-1]
+    heaviest = _self_time_by_package(importtime_output).most_common(5)
+    return {
+        "module": module,
+        "seconds": round(statistics.median(run["seconds"] for run, _ in runs), 3),
+        "forbidden": result["forbidden"],
+        "heaviest": ", ".join(f"{name} {us / 1e6:.2f}s" for name, us in heaviest),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.import_benchmark",
+        description="Check that the UI-independent modules import quickly and without Streamlit.")
+    parser.add_argument("modules", nargs="*", default=MODULES,
+                        help="Modules to import (default: checks and the command-line tools)")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="Allowed median import time in seconds (default 1.0)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Fresh interpreters per module (default 3)")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results = [measure(module, repeat=args.repeat) for module in args.modules]
+    print(pd.DataFrame(results).to_string(index=False))
+
+    failed = False
+    for result in results:
+        if result["forbidden"]:
+            print(f"{result['module']} loads {', '.join(result['forbidden'])}", file=sys.stderr)
+            failed = True
+        if result["seconds"] > args.budget:
+            print(f"{result['module']} takes {result['seconds']:.3f}s to import "
+                  f"(budget {args.budget:.3f}s)", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Concurrent-viewer load test of the Streamlit app against the fake SQL Server.
+
+Simulates wall screens (sessions on the dashboard view) and engineers (sessions on
+the configuration view, moving to the next section on every rerun). Each session is
+a real Streamlit script session (streamlit.testing AppTest) running app.py in this
+process, so sessions share caches, the dashboard snapshot and the local store like
+sessions of one server do. Every session reruns at its refresh interval for the
+duration of the test. Reported:
+- rerun latency percentiles per view
+- SQL Server statements and connections per second (fake server counters)
+- local store statement times, writes separately (a write waits there for the
+  SQLite write lock), and "database is locked" errors
+- process memory (resident set size) at start, peak and end
+
+Run from the repository root:
+
+    python -m components.load_test --dashboards 20 --engineers 10 --duration 120
+
+The local store is a throwaway SQLite file; the fake server's objects are monitored.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
+from components import db
+from components.db import (
+    use_database, init_db, update_db_schema, save_table_config, save_job_config
+)
+from components.fake_sqlserver import FakeSqlServer
+from components.refresh_benchmark import quiet
+from components.ui import CONFIG_TABS
+
+DASHBOARD_VIEW = "📺 Dashboard View"
+CONFIG_VIEW = "⚙️ Configuration"
+MEMORY_SAMPLE_SECONDS = 0.5
+
+
+def rss_mb():
+    """Resident set size of this process in MB, or None where it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def latency_summary(seconds):
+    """Count and p50/p90/p99/max in milliseconds"""
+    if not seconds:
+        return {"count": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    ms = np.asarray(seconds) * 1000
+    return {"count": len(ms),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p90_ms": round(float(np.percentile(ms, 90)), 1),
+            "p99_ms": round(float(np.percentile(ms, 99)), 1),
+            "max_ms": round(float(ms.max()), 1)}
+
+
+class StoreMonitor:
+    """Times every statement the local store's engine runs and counts lock errors"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.reads = []
+        self.writes = []
+        self.lock_errors = 0
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("load_test_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["load_test_started"].pop()
+        is_write = statement.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE")
+        with self._lock:
+            (self.writes if is_write else self.reads).append(elapsed)
+
+    def _error(self, context):
+        if "database is locked" in str(context.original_exception):
+            with self._lock:
+                self.lock_errors += 1
+        started = context.connection.info.get("load_test_started") if context.connection else None
+        if started:
+            started.pop()
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        event.listen(self.engine, "handle_error", self._error)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+        event.remove(self.engine, "handle_error", self._error)
+        return False
+
+
+class MemorySampler(threading.Thread):
+    """Tracks the peak resident set size while the test runs"""
+
+    def __init__(self):
+        super().__init__(name="load-test-memory", daemon=True)
+        self.start_mb = rss_mb()
+        self.peak_mb = self.start_mb
+        self._finished = threading.Event()
+
+    def run(self):
+        while not self._finished.wait(MEMORY_SAMPLE_SECONDS):
+            current = rss_mb()
+            if current is not None:
+                self.peak_mb = max(self.peak_mb or 0, current)
+
+    def stop(self):
+        self._finished.set()
+        self.join()
+        end_mb = rss_mb()
+        return {name: round(value, 1) if value is not None else None
+                for name, value in (("start_mb", self.start_mb), ("peak_mb", self.peak_mb),
+                                    ("end_mb", end_mb))}
+
+
+def viewer_session(app, view, interval, deadline, stagger, timeout, results, errors, lock):
+    """One simulated browser session rerunning the app every interval seconds"""
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest resolves relative paths against the calling module, not the cwd
+    session = AppTest.from_file(os.path.abspath(app), default_timeout=timeout)
+    next_run = time.monotonic() + stagger
+    reruns = 0
+    while True:
+        now = time.monotonic()
+        if next_run >= deadline:
+            break
+        if next_run > now:
+            time.sleep(next_run - now)
+
+        if view == CONFIG_VIEW and reruns > 0:
+            if reruns == 1:
+                session.sidebar.radio[0].set_value(CONFIG_VIEW)
+            else:
+                session.radio(key="config_tab").set_value(
+                    CONFIG_TABS[(reruns - 1) % len(CONFIG_TABS)])
+
+        started = time.perf_counter()
+        try:
+            session.run()
+            failures = [str(e.value) for e in session.exception]
+        except Exception as e:  # a timed-out or crashed rerun
+            failures = [f"{type(e).__name__}: {e}"]
+        elapsed = time.perf_counter() - started
+        reruns += 1
+
+        with lock:
+            results[view].append(elapsed)
+            errors.extend(failures)
+        # A rerun slower than the interval delays the next tick, like st_autorefresh
+        next_run = max(next_run + interval, time.monotonic())
+
+
+def run_load_test(app="app.py", dashboards=20, engineers=10, dashboard_interval=30,
+                  engineer_interval=15, duration=120, timeout=300, server_options=None):
+    """
+    Run the load test and return its report dict (see the module docstring).
+
+    Parameters:
+    - app: Streamlit script to run (app.py of this repository)
+    - dashboards / engineers: number of dashboard and configuration sessions
+    - dashboard_interval / engineer_interval: seconds between reruns of each session
+    - duration: seconds new reruns are started for
+    - server_options: FakeSqlServer keyword arguments (catalog size, latency)
+    """
+    from streamlit.logger import set_log_level
+
+    # The app must not try to bind the metrics port once per simulated session
+    os.environ["SQLMON_METRICS_PORT"] = "0"
+    # Streamlit's deprecation warnings would otherwise repeat on every rerun
+    set_log_level("error")
+    results = {DASHBOARD_VIEW: [], CONFIG_VIEW: []}
+    errors = []
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory(prefix="sqlmon-load-") as store_dir:
+        use_database(os.path.join(store_dir, "job_monitor.db"))
+        server = FakeSqlServer(**(server_options or {})).install()
+        try:
+            with quiet():
+                init_db()
+                update_db_schema()
+                for db_name, tables in server.catalog.items():
+                    save_table_config(db_name, list(tables))
+                save_job_config(list(server.jobs))
+            server.reset_counters()
+
+            sessions = ([(DASHBOARD_VIEW, dashboard_interval)] * dashboards +
+                        [(CONFIG_VIEW, engineer_interval)] * engineers)
+            memory = MemorySampler()
+            memory.start()
+            started = time.monotonic()
+            deadline = started + duration
+            with StoreMonitor(db.engine) as store, quiet():
+                threads = [threading.Thread(
+                    target=viewer_session, name=f"viewer-{i}",
+                    args=(app, view, interval, deadline, random.uniform(0, interval),
+                          timeout, results, errors, lock))
+                    for i, (view, interval) in enumerate(sessions)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.monotonic() - started
+            memory_report = memory.stop()
+        finally:
+            server.uninstall()
+        counters = server.counters()
+
+    return {
+        "settings": {"dashboards": dashboards, "engineers": engineers,
+                     "dashboard_interval": dashboard_interval,
+                     "engineer_interval": engineer_interval, "duration": duration,
+                     "server": server_options or {}},
+        "elapsed_seconds": round(elapsed, 1),
+        "reruns": {view: latency_summary(seconds) for view, seconds in results.items()},
+        "rerun_errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "sql_server": {
+            "statements": counters["queries"],
+            "statements_per_second": round(counters["queries"] / elapsed, 1),
+            "connections": counters["connections"],
+            "connections_per_second": round(counters["connections"] / elapsed, 1),
+        },
+        "local_store": {
+            "reads": latency_summary(store.reads),
+            "writes": latency_summary(store.writes),
+            "lock_errors": store.lock_errors,
+        },
+        "memory": memory_report,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.load_test",
+        description="Simulate concurrent dashboard and configuration viewers against a fake SQL Server.")
+    parser.add_argument("--app", default="app.py", help="Streamlit script (default app.py)")
+    parser.add_argument("--dashboards", type=int, default=20,
+                        help="Dashboard (wall screen) sessions (default 20)")
+    parser.add_argument("--engineers", type=int, default=10,
+                        help="Configuration view sessions (default 10)")
+    parser.add_argument("--dashboard-interval", type=float, default=30,
+                        help="Seconds between dashboard reruns (default 30)")
+    parser.add_argument("--engineer-interval", type=float, default=15,
+                        help="Seconds between configuration view reruns (default 15)")
+    parser.add_argument("--duration", type=float, default=120,
+                        help="Seconds to keep starting reruns (default 120)")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Seconds before one rerun counts as failed (default 300)")
+    parser.add_argument("--databases", type=int, default=4)
+    parser.add_argument("--tables", type=int, default=25, help="Tables per database (default 25)")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=2.0,
+                        help="Fake round trip per statement (default 2.0)")
+    parser.add_argument("--output", help="Also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.app):
+        parser.error(f"{args.app} not found; run from the repository root or pass --app")
+
+    report = run_load_test(
+        app=args.app, dashboards=args.dashboards, engineers=args.engineers,
+        dashboard_interval=args.dashboard_interval, engineer_interval=args.engineer_interval,
+        duration=args.duration, timeout=args.timeout,
+        server_options={"databases": args.databases, "tables_per_db": args.tables,
+                        "jobs": args.jobs, "latency_ms": args.latency_ms})
+
+    print(pd.DataFrame(report["reruns"]).T.to_string())
+    print()
+    print(json.dumps({key: value for key, value in report.items()
+                      if key not in ("settings", "reruns")}, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["rerun_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Prometheus metrics for monitored tables and jobs, and for the monitor itself.
+
+The exposition text is rendered once per collection cycle (publish_metrics, called by
+collect_dashboard_snapshot) and served as-is, so a scrape costs the same however many
+objects are monitored. The Streamlit app starts the endpoint on first load
+(SQLMON_METRICS_PORT, default 9108; 0 disables it). Without the app, this module runs
+its own collection loop:
+
+    python -m components.metrics --interval 60 --host 0.0.0.0 --port 9108
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from components.refresh import refresh_governor
+from components.sql import get_active_jobs
+from components.snapshot import STATUS_CATEGORIES, status_category
+
+DEFAULT_METRICS_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# msdb sysjobhistory.run_status codes
+JOB_STATUS_CODES = {"Failed": 0, "Succeeded": 1,
+                    "Retry": 2, "Canceled": 3, "Running": 4}
+
+_exposition = b""
+_server = None
+_server_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Exposition:
+    """Collects samples grouped by metric family, in first-seen order"""
+
+    def __init__(self):
+        self.families = {}
+
+    def add(self, name, metric_type, help_text, value, **labels):
+        if value is None or value != value:  # skip missing and NaN samples
+            return
+        family = self.families.setdefault(name, (metric_type, help_text, []))
+        family[2].append(f"{name}{_labels(**labels) if labels else ''} {float(value):g}")
+
+    def render(self):
+        lines = []
+        for name, (metric_type, help_text, samples) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def render_metrics(snapshot, active_jobs=None, cycle_stats=None, cycle_cost=None):
+    """
+    Exposition text (bytes) for a DashboardSnapshot.
+
+    Parameters:
+    - snapshot: the DashboardSnapshot of the cycle that just finished
+    - active_jobs: get_active_jobs() DataFrame, for running-job elapsed time
+    - cycle_stats: refresh_governor.stats()
+    - cycle_cost: refresh_governor.recent_cost()
+    """
+    out = _Exposition()
+
+    for table in snapshot.tables.to_dict("records"):
+        db, name, status = table["Database"], table["Table"], str(table["Status"])
+        out.add("sqlmon_table_row_count", "gauge", "Row count at the last check.",
+                table.get("Row Count"), database=db, table=name)
+        for kind, column in (("data", "Data MB"), ("index", "Index MB"), ("total", "Total MB")):
+            out.add("sqlmon_table_size_megabytes", "gauge", "Table size at the last check.",
+                    table.get(column), database=db, table=name, kind=kind)
+        out.add("sqlmon_table_status_code", "gauge",
+                "Table health: " + ", ".join(f"{i} {c.lower()}" for i, c in enumerate(STATUS_CATEGORIES)) + ".",
+                STATUS_CATEGORIES.index(status_category(status)), database=db, table=name)
+
+    # Job records are newest first; the first one of each job is its last run
+    failures = {}
+    last_runs = {}
+    for job in snapshot.jobs.to_dict("records"):
+        name = job["Job Name"]
+        failures[name] = failures.get(name, 0) + (job["Status"] == "Failed")
+        last_runs.setdefault(name, job)
+    for name, job in last_runs.items():
+        out.add("sqlmon_job_last_run_status_code", "gauge",
+                "msdb run_status of the last run: 0 failed, 1 succeeded, 2 retry, 3 canceled, 4 running.",
+                JOB_STATUS_CODES.get(str(job["Status"])), job=name)
+        out.add("sqlmon_job_last_run_duration_seconds", "gauge",
+                "Duration of the last run.", job.get("Duration Seconds"), job=name)
+        out.add("sqlmon_job_last_run_duration_zscore", "gauge",
+                "Signed z-score of the last run's duration against recent successful runs.",
+                job.get("Duration Z Score"), job=name)
+        out.add("sqlmon_job_failed_runs_24h", "gauge",
+                "Failed runs in the last 24 hours.", failures[name], job=name)
+
+    if active_jobs is not None and not active_jobs.empty:
+        for job in active_jobs.to_dict("records"):
+            out.add("sqlmon_job_running_elapsed_seconds", "gauge",
+                    "Elapsed time of a job that is currently running.",
+                    (job.get("Duration (mins)") or 0) * 60, job=job["Job Name"])
+
+    out.add("sqlmon_snapshot_version", "gauge",
+            "Version of the snapshot these metrics come from.", snapshot.version)
+    collected_at = datetime.strptime(snapshot.collected_at, '%Y-%m-%d %H:%M:%S')
+    out.add("sqlmon_snapshot_timestamp_seconds", "gauge",
+            "Unix time the snapshot was collected.", collected_at.timestamp())
+    if cycle_stats:
+        out.add("sqlmon_collection_cycle_duration_seconds", "gauge",
+                "Duration of the last collection cycle.", cycle_stats["last_duration"])
+        out.add("sqlmon_collection_cycles_total", "counter",
+                "Collection cycles run by this process.", cycle_stats["cycles"])
+        out.add("sqlmon_collection_skipped_ticks_total", "counter",
+                "Refresh ticks that reused the previous snapshot because a cycle was running.",
+                cycle_stats["skipped_ticks"])
+    out.add("sqlmon_collection_cycle_p90_seconds", "gauge",
+            "90th percentile of recent collection cycle durations.", cycle_cost)
+
+    return out.render()
+
+
+def publish_metrics(snapshot):
+    """Render the exposition for a freshly collected snapshot; scrapes serve it until the next one"""
+    global _exposition
+    try:
+        active_jobs = get_active_jobs()
+    except Exception as e:
+        print(f"Error fetching running jobs for metrics: {str(e)}")
+        active_jobs = None
+    _exposition = render_metrics(snapshot, active_jobs,
+                                 refresh_governor.stats(), refresh_governor.recent_cost())
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = _exposition
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app's console
+        pass
+
+
+def start_metrics_server(host=None, port=None):
+    """
+    Serve /metrics from a daemon thread, once per process. Host and port default to
+    SQLMON_METRICS_HOST (127.0.0.1) and SQLMON_METRICS_PORT (9108); port 0 disables it.
+    """
+    global _server
+    host = host or os.getenv("SQLMON_METRICS_HOST", "127.0.0.1")
+    port = int(port if port is not None else os.getenv(
+        "SQLMON_METRICS_PORT", DEFAULT_METRICS_PORT))
+    with _server_lock:
+        if _server is not None or port == 0:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"WARNING: Metrics endpoint not started on {host}:{port}: {str(e)}")
+            return None
+        threading.Thread(target=_server.serve_forever,
+                         name="metrics-server", daemon=True).start()
+        print(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+        return _server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.metrics",
+        description="Collect checks on an interval and serve them as Prometheus metrics.")
+    parser.add_argument("--interval", type=int, default=60,
+                        help="Seconds between collection cycles (default 60)")
+    parser.add_argument("--host", default=None,
+                        help="Interface to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None,
+                        help=f"Port to listen on (default {DEFAULT_METRICS_PORT})")
+    args = parser.parse_args(argv)
+
+    from components.db import init_db, update_db_schema
+    # components.checks imports this module to publish each cycle
+    from components.checks import collect_dashboard_snapshot
+
+    init_db()
+    update_db_schema()
+    if start_metrics_server(args.host, args.port) is None:
+        return 1
+
+    while True:
+        started = time.monotonic()
+        try:
+            collect_dashboard_snapshot()
+        except Exception as e:
+            print(f"Error collecting checks: {str(e)}")
+        # Never start cycles faster than recent ones have been taking
+        interval = refresh_governor.effective_interval(args.interval)
+        time.sleep(max(0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        pass
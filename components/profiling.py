@@ -0,0 +1,129 @@
+"""
+Opt-in profiling of whole dashboard reruns.
+
+With profiling on (sidebar switch, or SQLMON_PROFILE=1 for every session), render_ui
+runs under cProfile inside profile_run. Code marks its phases with phase(name); the
+time of nested phases is not counted again in the enclosing one, and whatever no
+phase claims is reported as "rendering". Each run's phase breakdown, top hotspots and
+the raw profile (loadable with pstats or snakeviz) go to the profile_runs table, which
+only keeps the most recent runs.
+
+cProfile only sees the rerun's own thread: table checks running on worker threads
+show up as the time spent waiting for them.
+"""
+import contextlib
+import contextvars
+import cProfile
+import marshal
+import os
+import pstats
+import time
+import zlib
+
+from components.db import save_profile_run
+
+# Hotspots stored per run, by own (exclusive) time
+MAX_HOTSPOTS = 40
+
+_active = contextvars.ContextVar("profile_run", default=None)
+
+
+def profiling_enabled_by_env():
+    return os.getenv("SQLMON_PROFILE", "").lower() in ("1", "true", "yes", "on")
+
+
+class ProfileRun:
+    """Phase timings of one profiled rerun"""
+
+    def __init__(self, view):
+        self.view = view
+        self.phases = {}
+        self._stack = []
+
+    def _charge(self, now):
+        # The innermost open phase owns the time since it was last resumed
+        if self._stack:
+            name, resumed = self._stack[-1]
+            self.phases[name] = self.phases.get(name, 0.0) + now - resumed
+
+    def enter(self, name):
+        now = time.perf_counter()
+        self._charge(now)
+        self._stack.append((name, now))
+
+    def exit(self):
+        now = time.perf_counter()
+        self._charge(now)
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1] = (self._stack[-1][0], now)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Attribute the block's time to a phase of the current profiled run, if any"""
+    run = _active.get()
+    if run is None:
+        yield
+        return
+    run.enter(name)
+    try:
+        yield
+    finally:
+        run.exit()
+
+
+def hotspots(stats, limit=MAX_HOTSPOTS):
+    """Top functions of a pstats.Stats by own time, as dicts"""
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": function,
+            "location": f"{os.path.basename(filename)}:{line}" if line else filename,
+            "calls": calls,
+            "own_ms": round(own * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2),
+        })
+    rows.sort(key=lambda row: row["own_ms"], reverse=True)
+    return rows[:limit]
+
+
+@contextlib.contextmanager
+def profile_run(view, enabled):
+    """
+    Profile the block as one rerun of view when enabled and store the result.
+    Yields the ProfileRun, or None when profiling is off. Runs interrupted by an
+    exception (including Streamlit's rerun/stop) are not stored.
+    """
+    if not enabled:
+        yield None
+        return
+
+    run = ProfileRun(view)
+    token = _active.set(run)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield run
+    finally:
+        profiler.disable()
+        total = time.perf_counter() - started
+        _active.reset(token)
+    run.phases["rendering"] = max(0.0, total - sum(run.phases.values()))
+
+    try:
+        profiler.create_stats()
+        save_profile_run(
+            view=view,
+            total_ms=round(total * 1000, 1),
+            phases={name: round(seconds * 1000, 1) for name, seconds in run.phases.items()},
+            hotspots=hotspots(pstats.Stats(profiler)),
+            profile=zlib.compress(marshal.dumps(profiler.stats)))
+    except Exception as e:
+        print(f"Error saving profile: {str(e)}")
+
+
+def profile_file_bytes(profile):
+    """A stored profile blob as .prof file contents (what pstats.Stats.dump_stats writes)"""
+    return zlib.decompress(profile)
@@ -0,0 +1,92 @@
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Never refresh faster than this, however cheap cycles are
+MIN_REFRESH_SECONDS = 5
+# The minimum interval is this many times the recent (p90) cycle duration
+CYCLE_COST_FACTOR = 2.0
+# Number of recent cycles the minimum interval is derived from
+CYCLE_HISTORY = 20
+
+
+class RefreshGovernor:
+    """
+    Process-wide bookkeeping of collection cycles (table checks + job queries).
+
+    Records how long each cycle takes, reports whether one is still running so that
+    refresh ticks arriving meanwhile can be skipped, and derives the minimum refresh
+    interval from recent cycle costs so reruns cannot pile up.
+    """
+
+    def __init__(self, floor_seconds=MIN_REFRESH_SECONDS, cost_factor=CYCLE_COST_FACTOR,
+                 history=CYCLE_HISTORY):
+        self.floor_seconds = floor_seconds
+        self.cost_factor = cost_factor
+        self._lock = threading.Lock()
+        self._durations = deque(maxlen=history)
+        self._running_since = None
+        self.last_duration = None
+        self.last_finished = None
+        self.cycles = 0
+        self.skipped_ticks = 0
+
+    @contextmanager
+    def cycle(self):
+        """Time one collection cycle"""
+        with self._lock:
+            self._running_since = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.last_duration = time.monotonic() - self._running_since
+                self.last_finished = time.time()
+                self._durations.append(self.last_duration)
+                self._running_since = None
+                self.cycles += 1
+
+    def is_running(self):
+        with self._lock:
+            return self._running_since is not None
+
+    def skip_tick(self):
+        """Record a refresh tick that reused the previous snapshot because a cycle was running"""
+        with self._lock:
+            self.skipped_ticks += 1
+
+    def recent_cost(self):
+        """p90 of recent cycle durations in seconds (the max when there are few samples)"""
+        with self._lock:
+            durations = list(self._durations)
+        if not durations:
+            return None
+        if len(durations) < 5:
+            return max(durations)
+        return statistics.quantiles(durations, n=10)[-1]
+
+    def min_interval(self):
+        cost = self.recent_cost()
+        if cost is None:
+            return self.floor_seconds
+        return max(self.floor_seconds, int(cost * self.cost_factor + 0.999))
+
+    def effective_interval(self, requested_seconds):
+        return max(int(requested_seconds), self.min_interval())
+
+    def stats(self):
+        with self._lock:
+            running_for = None if self._running_since is None else time.monotonic() - \
+                self._running_since
+            return {
+                "last_duration": self.last_duration,
+                "last_finished": self.last_finished,
+                "running_for": running_for,
+                "cycles": self.cycles,
+                "skipped_ticks": self.skipped_ticks,
+            }
+
+
+refresh_governor = RefreshGovernor()
@@ -0,0 +1,210 @@
+"""
+Refresh-cycle benchmark against the fake SQL Server (components/fake_sqlserver.py).
+
+For every combination of database, table and job counts it monitors every generated
+table and job and times full collection cycles (collect_dashboard_snapshot): a cold
+cycle with every cache cleared and a warm one right after it. It also counts the
+statements run and connections opened per cycle. Each scenario uses a throwaway
+local store, so the real data/job_monitor.db is never touched. Run from the
+repository root:
+
+    python -m components.refresh_benchmark
+    python -m components.refresh_benchmark --databases 1,4 --tables 10,100 --jobs 20,200
+    python -m components.refresh_benchmark --compare data/benchmarks/refresh-baseline.json
+
+Results are saved as JSON (--output). With --compare, scenarios are matched by name
+against an earlier result file, and the exit code is 1 when a cycle got slower by
+more than --tolerance, or runs more statements or opens more connections.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from components import sql
+from components.db import (
+    use_database, init_db, update_db_schema, save_table_config, save_job_config
+)
+from components.checks import collect_dashboard_snapshot
+from components.fake_sqlserver import FakeSqlServer
+from components.snapshot import snapshot_cache
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def clear_caches():
+    """Forget every cached SQL Server result, as after a server restart"""
+    for func in vars(sql).values():
+        if callable(func) and callable(getattr(func, "clear", None)):
+            func.clear()
+    snapshot_cache.invalidate()
+
+
+def scenario_name(databases, tables, jobs):
+    return f"db{databases}-t{tables}-j{jobs}"
+
+
+@contextlib.contextmanager
+def quiet():
+    """Drop the check errors and warnings a cycle prints"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed_cycle(server):
+    """Run one collection cycle; returns its wall time and the server's counters"""
+    server.reset_counters()
+    started = time.perf_counter()
+    with quiet():
+        collect_dashboard_snapshot()
+    elapsed = time.perf_counter() - started
+    return elapsed, server.counters()
+
+
+def run_scenario(databases, tables, jobs, repeat=3, latency_ms=1.0, connect_ms=5.0, seed=0):
+    """
+    Benchmark one catalog size. Returns a result dict with the median cold and warm
+    cycle times and the statement / connection counts of the cold and warm cycles.
+    """
+    with tempfile.TemporaryDirectory(prefix="sqlmon-bench-") as store_dir:
+        use_database(os.path.join(store_dir, "job_monitor.db"))
+        with quiet():
+            init_db()
+            update_db_schema()
+        server = FakeSqlServer(databases=databases, tables_per_db=tables, jobs=jobs,
+                               latency_ms=latency_ms, connect_ms=connect_ms, seed=seed).install()
+        try:
+            for db_name, catalog in server.catalog.items():
+                save_table_config(db_name, list(catalog))
+            save_job_config(list(server.jobs))
+
+            cold, warm = [], []
+            for _ in range(repeat):
+                clear_caches()
+                cold_seconds, cold_counters = timed_cycle(server)
+                warm_seconds, warm_counters = timed_cycle(server)
+                cold.append(cold_seconds)
+                warm.append(warm_seconds)
+        finally:
+            server.uninstall()
+
+    return {
+        "name": scenario_name(databases, tables, jobs),
+        "databases": databases,
+        "tables_per_db": tables,
+        "jobs": jobs,
+        "monitored_tables": databases * tables,
+        "cold_seconds": round(statistics.median(cold), 4),
+        "warm_seconds": round(statistics.median(warm), 4),
+        "cold_queries": cold_counters["queries"],
+        "cold_connections": cold_counters["connections"],
+        "warm_queries": warm_counters["queries"],
+        "warm_connections": warm_counters["connections"],
+        "rows_returned": cold_counters["rows_returned"],
+        "queries_by_kind": cold_counters["queries_by_kind"],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Per-scenario comparison with a baseline result file. Returns (DataFrame,
+    regressed) where regressed is True if any scenario got slower by more than
+    tolerance or runs more statements / opens more connections.
+    """
+    previous = {s["name"]: s for s in baseline["scenarios"]}
+    rows = []
+    regressed = False
+    for current in results["scenarios"]:
+        before = previous.get(current["name"])
+        if before is None:
+            continue
+        row = {"scenario": current["name"]}
+        for metric in ("cold_seconds", "warm_seconds"):
+            ratio = current[metric] / before[metric] if before[metric] else float("nan")
+            row[f"{metric} ratio"] = round(ratio, 2)
+            regressed |= ratio > 1 + tolerance
+        for metric in ("cold_queries", "cold_connections", "warm_queries", "warm_connections"):
+            row[f"{metric} delta"] = current[metric] - before[metric]
+            regressed |= current[metric] > before[metric]
+        rows.append(row)
+    return pd.DataFrame(rows), regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.refresh_benchmark",
+        description="Time full collection cycles against a fake SQL Server of growing size.")
+    parser.add_argument("--databases", type=_int_list, default=[1, 4],
+                        help="Comma-separated database counts (default 1,4)")
+    parser.add_argument("--tables", type=_int_list, default=[10, 50, 200],
+                        help="Comma-separated monitored tables per database (default 10,50,200)")
+    parser.add_argument("--jobs", type=_int_list, default=[20, 100],
+                        help="Comma-separated monitored job counts (default 20,100)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Cold/warm cycle pairs per scenario; medians are reported (default 3)")
+    parser.add_argument("--latency-ms", type=float, default=1.0,
+                        help="Fake round trip per statement (default 1.0)")
+    parser.add_argument("--connect-ms", type=float, default=5.0,
+                        help="Fake time to open a connection (default 5.0)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="Result file (default data/benchmarks/refresh-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown ratio before --compare fails (default 0.2)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"repeat": args.repeat, "latency_ms": args.latency_ms,
+                     "connect_ms": args.connect_ms, "seed": args.seed},
+        "scenarios": [],
+    }
+    for databases, tables, jobs in itertools.product(args.databases, args.tables, args.jobs):
+        result = run_scenario(databases, tables, jobs, repeat=args.repeat,
+                              latency_ms=args.latency_ms, connect_ms=args.connect_ms,
+                              seed=args.seed)
+        results["scenarios"].append(result)
+        print(f"{result['name']}: cold {result['cold_seconds']:.3f}s "
+              f"({result['cold_queries']} queries, {result['cold_connections']} connections), "
+              f"warm {result['warm_seconds']:.3f}s", file=sys.stderr)
+
+    summary = pd.DataFrame(results["scenarios"]).drop(columns=["queries_by_kind"])
+    print(summary.to_string(index=False))
+
+    output = args.output or os.path.join(
+        "data", "benchmarks", f"refresh-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison, regressed = compare(results, baseline, args.tolerance)
+        print()
+        print(comparison.to_string(index=False) if not comparison.empty
+              else "No scenarios in common with the baseline")
+        if regressed:
+            print("Regression against the baseline", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+"""
+Record a real collection cycle and replay it offline.
+
+`record` runs one collection cycle (collect_dashboard_snapshot) against SQL Server
+through a recording driver. Every connection and statement is saved with its
+parameters, result set and timing. The file also holds the monitoring configuration
+and the cycle's outcome: table and job statuses and the alerts raised. `replay`
+re-runs the cycle on a machine without SQL Server. A replay driver serves the
+recorded results, by default after the recorded delays. It then checks that the
+outcome is identical and compares wall times.
+
+    python -m components.replay record --output cycle.sqlrec
+    python -m components.replay replay cycle.sqlrec --repeat 3
+    python -m components.replay replay cycle.sqlrec --no-timing   # CPU cost only
+
+Both use a throwaway local store; record copies the configuration from the real one
+(or uses the fake server's objects with --fake). replay exits with 1 if the outcome
+differs from the recorded one, 2 if the cycle ran a statement that was not recorded.
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+
+from components.db import use_database, init_db, update_db_schema, get_alerts
+from components.config_io import export_config, import_config
+from components.checks import collect_dashboard_snapshot
+from components.sql import set_sql_driver
+from components.fake_sqlserver import FakeSqlServer
+from components.refresh_benchmark import clear_caches, quiet
+
+try:
+    from pyodbc import Error as _DriverError
+except ImportError:
+    # No ODBC driver manager here (libodbc); only `record` without --fake needs one
+    _DriverError = Exception
+
+FORMAT_VERSION = 1
+
+
+class Error(_DriverError):
+    pass
+
+
+class UnrecordedStatement(Error):
+    """The replayed cycle ran a statement the recording has no result for"""
+
+
+def _encode(value):
+    """JSON-safe form of a SQL Server value; see _decode"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, time_of_day):
+        return {"$t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$b": base64.b64encode(value).decode("ascii")}
+    return value
+
+
+_DECODERS = {
+    "$dt": datetime.fromisoformat,
+    "$d": date.fromisoformat,
+    "$t": time_of_day.fromisoformat,
+    "$dec": Decimal,
+    "$b": base64.b64decode,
+}
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        if key in _DECODERS:
+            return _DECODERS[key](value)
+    return obj
+
+
+def _db_of(conn_str):
+    match = re.search(r"DATABASE=([^;]+);", conn_str)
+    return match.group(1) if match else None
+
+
+def statement_key(db, sql, params):
+    """Identity of a statement: connection database, whitespace-normalized SQL, parameters"""
+    return json.dumps([db, " ".join(sql.split()), [_encode(p) for p in params]],
+                      default=str, separators=(",", ":"))
+
+
+def _flatten(params):
+    # pyodbc accepts parameters either spread out or as one sequence
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return list(params[0])
+    return list(params)
+
+
+# --- recording ------------------------------------------------------------
+
+class RecordingDriver:
+    """DB-API driver wrapper saving every connection and statement made through it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.Error = driver.Error
+        self.connections = []
+        self.statements = []
+        self._lock = threading.Lock()
+
+    def connect(self, conn_str, **kwargs):
+        started = time.perf_counter()
+        event = {"db": _db_of(conn_str)}
+        try:
+            return RecordingConnection(self, self.driver.connect(conn_str, **kwargs), event["db"])
+        except Exception as e:
+            event["error"] = str(e)
+            raise
+        finally:
+            event["ms"] = round((time.perf_counter() - started) * 1000, 3)
+            with self._lock:
+                self.connections.append(event)
+
+    def add(self, statement):
+        with self._lock:
+            self.statements.append(statement)
+
+
+class RecordingConnection:
+    def __init__(self, recorder, connection, db):
+        self._recorder = recorder
+        self._connection = connection
+        self.db = db
+
+    def cursor(self):
+        return RecordingCursor(self, self._connection.cursor())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class RecordingCursor:
+    """
+    Runs each statement and fetches its whole result at once so it can be saved; the
+    recorded time covers execute and fetch, like a caller reading every row.
+    """
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+        self.description = None
+        self.rowcount = -1
+        self._rows = []
+        self._position = 0
+
+    def execute(self, sql, *params):
+        params = _flatten(params)
+        statement = {"db": self._connection.db, "sql": sql, "params": params}
+        started = time.perf_counter()
+        try:
+            if params:
+                self._cursor.execute(sql, params)
+            else:
+                self._cursor.execute(sql)
+            self.description = self._cursor.description
+            rows = [tuple(row) for row in self._cursor.fetchall()] if self.description else []
+        except Exception as e:
+            statement.update(ms=round((time.perf_counter() - started) * 1000, 3), error=str(e))
+            self._connection._recorder.add(statement)
+            raise
+        statement.update(ms=round((time.perf_counter() - started) * 1000, 3),
+                         columns=[d[0] for d in self.description] if self.description else None,
+                         rows=rows)
+        self._connection._recorder.add(statement)
+        self.rowcount = len(rows)
+        self._rows = rows
+        self._position = 0
+        return self
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+# --- replay ---------------------------------------------------------------
+
+class ReplayDriver:
+    """
+    DB-API driver answering from a recording. A statement run several times is served
+    its recorded results in order, the last one repeating. With timing, connections
+    and statements take as long as they did when recorded.
+    """
+
+    Error = Error
+
+    def __init__(self, recording, timing=True):
+        self.timing = timing
+        self._lock = threading.Lock()
+        self._statements = defaultdict(deque)
+        for statement in recording["statements"]:
+            self._statements[statement_key(
+                statement["db"], statement["sql"], statement["params"])].append(statement)
+        self._connections = defaultdict(deque)
+        for event in recording["connections"]:
+            self._connections[event["db"]].append(event)
+        self.unrecorded = []
+
+    def _next(self, queues, key):
+        with self._lock:
+            queue = queues.get(key)
+            if not queue:
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _sleep(self, ms):
+        if self.timing and ms:
+            time.sleep(ms / 1000)
+
+    def connect(self, conn_str, **kwargs):
+        db = _db_of(conn_str)
+        event = self._next(self._connections, db) or {"ms": 0}
+        self._sleep(event["ms"])
+        if event.get("error"):
+            raise Error(event["error"])
+        return ReplayConnection(self, db)
+
+    def execute(self, db, sql, params):
+        statement = self._next(self._statements, statement_key(db, sql, params))
+        if statement is None:
+            with self._lock:
+                self.unrecorded.append(" ".join(sql.split())[:120])
+            raise UnrecordedStatement(f"Statement not in recording: {' '.join(sql.split())[:80]}")
+        self._sleep(statement["ms"])
+        if statement.get("error"):
+            raise Error(statement["error"])
+        return statement["columns"], [tuple(row) for row in statement["rows"]]
+
+
+class ReplayConnection:
+    def __init__(self, driver, db):
+        self.driver = driver
+        self.db = db
+
+    def cursor(self):
+        return ReplayCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class ReplayCursor(RecordingCursor):
+    def __init__(self, connection):
+        super().__init__(connection, None)
+
+    def execute(self, sql, *params):
+        columns, rows = self._connection.driver.execute(
+            self._connection.db, sql, _flatten(params))
+        self.description = [(c, None, None, None, None, None, True) for c in columns] if columns else None
+        self.rowcount = len(rows)
+        self._rows = rows
+        self._position = 0
+        return self
+
+    def close(self):
+        self._rows = []
+
+
+# --- cycles ---------------------------------------------------------------
+
+def cycle_outcome(snapshot, alerts):
+    """
+    What a cycle decided, independent of when it ran: table statuses and row counts,
+    job run statuses and the alerts raised (with how many of each).
+    """
+    table_results, job_results = snapshot.records()
+    return {
+        "tables": sorted([str(t["Database"]), str(t["Table"]), str(t["Status"]), int(t["Row Count"])]
+                         for t in table_results),
+        "jobs": sorted([str(j["Job Name"]), str(j["Run Date"]), str(j["Run Time"]),
+                        str(j["Status"]), str(j.get("Duration Status"))]
+                       for j in job_results),
+        "alerts": sorted([*key, count] for key, count in Counter(
+            (a["alert_type"], a["source_type"], a["source_name"], a["status"])
+            for a in alerts.to_dict("records")).items()),
+    }
+
+
+def run_cycle(store_dir, config, driver):
+    """
+    One cold collection cycle with driver on a fresh local store holding config.
+    Returns (wall seconds, outcome).
+    """
+    use_database(os.path.join(store_dir, f"cycle-{time.monotonic_ns()}.db"))
+    with quiet():
+        init_db()
+        update_db_schema()
+        import_config(config)
+    set_sql_driver(driver)
+    try:
+        clear_caches()
+        started = time.perf_counter()
+        with quiet():
+            snapshot = collect_dashboard_snapshot()
+        elapsed = time.perf_counter() - started
+    finally:
+        set_sql_driver(None)
+    return elapsed, cycle_outcome(snapshot, get_alerts(limit=1_000_000))
+
+
+def save_recording(recording, path):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(recording, f, default=_encode, separators=(",", ":"))
+
+
+def load_recording(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        recording = json.load(f, object_hook=_decode)
+    if recording.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a format {FORMAT_VERSION} recording")
+    return recording
+
+
+def record(output, fake=False):
+    if fake:
+        server = FakeSqlServer(databases=2, tables_per_db=10, jobs=20, latency_ms=2)
+        driver = server
+        config = {
+            "tables": [{"db_name": db, "table_name": t, "min_rows": None, "max_rows": None,
+                        "column_min_match_count": 1}
+                       for db, tables in server.catalog.items() for t in tables],
+            "columns": [],
+            "jobs": list(server.jobs),
+        }
+    else:
+        try:
+            import pyodbc
+        except ImportError as e:
+            print(f"Recording from SQL Server needs pyodbc ({e}); use --fake without it",
+                  file=sys.stderr)
+            return 1
+        driver = pyodbc
+        with quiet():
+            init_db()
+            update_db_schema()
+        config = export_config()
+
+    recorder = RecordingDriver(driver)
+    with tempfile.TemporaryDirectory(prefix="sqlmon-record-") as store_dir:
+        elapsed, outcome = run_cycle(store_dir, config, recorder)
+
+    recording = {
+        "format": FORMAT_VERSION,
+        "recorded_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "wall_seconds": round(elapsed, 4),
+        "config": config,
+        "connections": recorder.connections,
+        "statements": recorder.statements,
+        "outcome": outcome,
+    }
+    save_recording(recording, output)
+    print(f"Recorded {len(recorder.statements)} statements on {len(recorder.connections)} "
+          f"connections in {elapsed:.3f}s to {output} ({os.path.getsize(output)} bytes)",
+          file=sys.stderr)
+    return 0
+
+
+def _diff(recorded, replayed):
+    """Lines describing outcome differences, per section"""
+    lines = []
+    for section in ("tables", "jobs", "alerts"):
+        before = {json.dumps(item) for item in recorded[section]}
+        after = {json.dumps(item) for item in replayed[section]}
+        lines += [f"{section}: - {item}" for item in sorted(before - after)]
+        lines += [f"{section}: + {item}" for item in sorted(after - before)]
+    return lines
+
+
+def replay(path, timing=True, repeat=1):
+    recording = load_recording(path)
+    wall_times = []
+    mismatches = []
+    with tempfile.TemporaryDirectory(prefix="sqlmon-replay-") as store_dir:
+        for _ in range(repeat):
+            driver = ReplayDriver(recording, timing=timing)
+            elapsed, outcome = run_cycle(store_dir, recording["config"], driver)
+            wall_times.append(elapsed)
+            if driver.unrecorded:
+                print("Statements not in the recording:", file=sys.stderr)
+                for sql in sorted(set(driver.unrecorded)):
+                    print(f"  {sql}", file=sys.stderr)
+                return 2
+            mismatches = _diff(recording["outcome"], outcome)
+            if mismatches:
+                break
+
+    print(json.dumps({
+        "recording": path,
+        "recorded_at": recording["recorded_at"],
+        "timing": timing,
+        "recorded_seconds": recording["wall_seconds"],
+        "replayed_seconds": [round(t, 4) for t in wall_times],
+        "median_seconds": round(statistics.median(wall_times), 4),
+        "speedup": round(recording["wall_seconds"] / statistics.median(wall_times), 2),
+        "outcome_identical": not mismatches,
+    }, indent=2))
+    if mismatches:
+        print("Outcome differs from the recording:", file=sys.stderr)
+        for line in mismatches:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.replay",
+        description="Record a collection cycle against SQL Server and replay it offline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record one collection cycle")
+    record_parser.add_argument("--output", required=True, help="Recording file to write")
+    record_parser.add_argument("--fake", action="store_true",
+                               help="Record against the fake SQL Server instead of the real one")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a recorded cycle")
+    replay_parser.add_argument("recording", help="Recording file")
+    replay_parser.add_argument("--no-timing", action="store_true",
+                               help="Answer instantly instead of after the recorded delays")
+    replay_parser.add_argument("--repeat", type=int, default=1,
+                               help="Number of replays; the median time is reported (default 1)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        return record(args.output, fake=args.fake)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return replay(args.recording, timing=not args.no_timing, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+import functools
+import itertools
+import math
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "version", "refreshing", "error", "duration")
+
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None  # time.monotonic() of the last successful load
+        self.version = 0
+        self.refreshing = None  # threading.Event while a load is in flight
+        self.error = None
+        self.duration = None  # seconds the last successful load took
+
+
+class SnapshotCache:
+    """
+    In-process cache shared by every Streamlit session (and thread) of this server.
+
+    Each key is loaded by at most one caller at a time (single-flight):
+    - younger than ttl: the cached value is returned
+    - older than ttl but younger than ttl + stale_ttl: the stale value is returned
+      immediately and one background refresh is started (stale-while-revalidate)
+    - missing or older than that: one caller loads it, concurrent callers wait for
+      that load instead of issuing their own
+
+    Values are shared between sessions, so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, loader, ttl, stale_ttl=0):
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            age = None if entry.loaded_at is None else time.monotonic() - entry.loaded_at
+
+            if age is not None and age < ttl:
+                return entry.value
+
+            if age is not None and age < ttl + stale_ttl:
+                if entry.refreshing is None:
+                    entry.refreshing = threading.Event()
+                    threading.Thread(
+                        target=self._load, args=(key, entry, loader),
+                        name=f"snapshot-refresh-{key}", daemon=True).start()
+                return entry.value
+
+            if entry.refreshing is None:
+                entry.refreshing = threading.Event()
+                is_loader = True
+            else:
+                is_loader = False
+            in_flight = entry.refreshing
+
+        if is_loader:
+            self._load(key, entry, loader)
+        else:
+            in_flight.wait()
+
+        with self._lock:
+            if entry.loaded_at is None and entry.error is not None:
+                raise entry.error
+            return entry.value
+
+    def _load(self, key, entry, loader):
+        started = time.monotonic()
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"Error refreshing snapshot {key}: {str(e)}")
+            with self._lock:
+                # Keep serving the previous value if there is one
+                entry.error = e
+                entry.refreshing.set()
+                entry.refreshing = None
+            return
+
+        with self._lock:
+            entry.value = value
+            entry.loaded_at = time.monotonic()
+            entry.duration = entry.loaded_at - started
+            entry.version += 1
+            entry.error = None
+            entry.refreshing.set()
+            entry.refreshing = None
+
+    def prime(self, key, value, loader):
+        """
+        Serve value for a key that has never been loaded while loader fetches the real
+        one in the background. Does nothing if the key is already loaded or loading.
+        Primed values keep version 0 until the first real load replaces them.
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            if entry.loaded_at is not None or entry.refreshing is not None:
+                return False
+            entry.value = value
+            entry.loaded_at = time.monotonic()
+            entry.refreshing = threading.Event()
+            threading.Thread(
+                target=self._load, args=(key, entry, loader),
+                name=f"snapshot-refresh-{key}", daemon=True).start()
+            return True
+
+    def peek(self, key):
+        """The last loaded value of key, without loading or refreshing; None if never loaded"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None or entry.loaded_at is None else entry.value
+
+    def info(self, key):
+        """Age, version, load duration and refresh state of a key, or None if never loaded"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.loaded_at is None:
+                return None
+            return {
+                "age_seconds": time.monotonic() - entry.loaded_at,
+                "version": entry.version,
+                "duration_seconds": entry.duration,
+                "refreshing": entry.refreshing is not None,
+                "error": str(entry.error) if entry.error else None,
+            }
+
+    def invalidate(self, key=None):
+        """
+        Force the next get of key (or of every key) to load fresh data. The old value
+        stays available to peek, e.g. for callers that must not wait for that load.
+        """
+        with self._lock:
+            for k, entry in self._entries.items():
+                if key is None or k == key:
+                    if entry.loaded_at is not None:
+                        entry.loaded_at = float("-inf")
+
+
+snapshot_cache = SnapshotCache()
+
+
+def shared_snapshot(ttl, stale_ttl=0):
+    """
+    Decorator caching a function's result in the process-wide snapshot_cache,
+    keyed on the function and its (hashable) arguments.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, args,
+                   tuple(sorted(kwargs.items())))
+            return snapshot_cache.get(key, lambda: func(*args, **kwargs), ttl, stale_ttl)
+
+        wrapper.cache_key = lambda *args, **kwargs: (
+            func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return wrapper
+    return decorator
+
+
+# Low-cardinality columns stored as categoricals: one copy of each distinct string per
+# snapshot instead of one per row
+_CATEGORY_COLUMNS = ("Database", "Status", "Duration Status")
+# Identifier columns whose strings are interned so every snapshot shares them
+_INTERNED_COLUMNS = ("Table", "Job Name")
+
+_versions = itertools.count(1)
+
+# Statuses counted as healthy on the dashboard
+OK_STATUSES = ['OK', 'OK-ColumnConditionMet']
+# Keywords to identify warning/empty statuses
+WARNING_KEYWORDS = ['Warn', 'Empty']
+
+STATUS_CATEGORIES = ["Healthy", "Warning", "Error", "Other"]
+# Sidebar notification groups, in display order
+ISSUE_GROUPS = ["Empty Tables", "Error Tables", "Low Row Count",
+                "High Row Count", "Column Condition Issues"]
+
+
+def status_category(status):
+    """Dashboard health bucket of one table status"""
+    if status in OK_STATUSES:
+        return "Healthy"
+    if status.startswith("Error"):
+        return "Error"
+    if any(keyword in status for keyword in WARNING_KEYWORDS):
+        return "Warning"
+    return "Other"
+
+
+def issue_group(status):
+    """Sidebar notification group of one table status, or None if it is not an issue"""
+    if status == "Empty":
+        return "Empty Tables"
+    if status.startswith("Error"):
+        return "Error Tables"
+    if status == "Warn-LowCount":
+        return "Low Row Count"
+    if status == "Warn-HighCount":
+        return "High Row Count"
+    # Column condition issues that are explicitly warnings or combined with other warnings
+    if "ColumnConditionNotMet" in status and ("Warn" in status or ";ColCondNotMet" in status):
+        return "Column Condition Issues"
+    return None
+
+
+def classify_statuses(statuses, classify, categories):
+    """
+    Map a status Series through classify, calling it once per distinct status rather
+    than once per row, and return the labels as a categorical Series.
+    """
+    statuses = statuses.astype("category")
+    labels = {status: classify(str(status))
+              for status in statuses.cat.categories}
+    return statuses.map(labels).astype(pd.CategoricalDtype(categories))
+
+
+def json_safe(value):
+    """
+    Copy of value, walking nested dicts and lists, with pandas' missing values (NaN,
+    infinities, NaT, NA) replaced by None, which strict JSON encoders accept
+    """
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+
+def compact_frame(records):
+    """Build a compact DataFrame from a list of result dicts"""
+    frame = pd.DataFrame(records)
+    for column in _INTERNED_COLUMNS:
+        if column in frame:
+            frame[column] = [sys.intern(v) if isinstance(v, str) else v
+                             for v in frame[column]]
+    for column in _CATEGORY_COLUMNS:
+        if column in frame:
+            frame[column] = frame[column].astype("category")
+    return frame
+
+
+class DashboardSnapshot:
+    """
+    One dashboard collection, built once and shared read-only by every session.
+
+    Sessions keep a reference and compare version to tell whether anything changed;
+    they must never modify tables or jobs in place.
+    """
+    __slots__ = ("version", "collected_at", "restored", "tables", "jobs")
+
+    def __init__(self, table_results, job_results, collected_at, restored=False):
+        jobs = compact_frame(job_results)
+        if "Message" in jobs and "Status" in jobs:
+            # Only failed runs show their agent message; drop the rest
+            jobs["Message"] = jobs["Message"].where(jobs["Status"] == "Failed")
+        tables = compact_frame(table_results)
+        if "Status" in tables:
+            # Classified once per collection; counts, filters and notifications reuse it
+            tables["Status Category"] = classify_statuses(
+                tables["Status"], status_category, STATUS_CATEGORIES)
+            tables["Issue Group"] = classify_statuses(
+                tables["Status"], issue_group, ISSUE_GROUPS)
+        values = {
+            # A restored snapshot is older than anything collected in this process
+            "version": 0 if restored else next(_versions),
+            "collected_at": collected_at,
+            "restored": restored,
+            "tables": tables,
+            "jobs": jobs,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DashboardSnapshot is immutable")
+
+    def records(self):
+        """(table_results, job_results) as lists of dicts, e.g. for persisting"""
+        tables = self.tables.drop(
+            columns=["Status Category", "Issue Group"], errors="ignore")
+        # Missing values (e.g. the Message of runs that did not fail) become None
+        return json_safe(tables.to_dict("records")), json_safe(self.jobs.to_dict("records"))
@@ -1,9 +1,47 @@
-import streamlit as st
-import pyodbc
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import time
 from components.db import load_column_config
+from components.snapshot import shared_snapshot
+from components.caching import cache_data
+from components.telemetry import traced_connection, connection_failed
+
+
+# DB-API module connections are opened with; benchmarks swap in a fake SQL Server
+# (see set_sql_driver and components/fake_sqlserver.py). pyodbc is only imported on
+# the first connection, so this module loads without an ODBC driver manager.
+_driver = None
+
+
+def set_sql_driver(driver=None):
+    """
+    Open SQL Server connections with driver.connect(conn_str) instead of pyodbc.connect.
+    The driver's errors must derive from its Error attribute. None restores pyodbc.
+    """
+    global _driver
+    _driver = driver
+
+
+def _sql_driver():
+    """The installed driver, importing pyodbc when none is"""
+    global _driver
+    if _driver is None:
+        import pyodbc
+        _driver = pyodbc
+    return _driver
+
+
+def driver_error():
+    """
+    Exception class SQL Server calls raise: the driver's Error (pyodbc.Error unless a
+    fake driver is installed), or ImportError when pyodbc cannot be loaded.
+    """
+    try:
+        return _sql_driver().Error
+    except ImportError:
+        return ImportError
 
 
 def get_windows_user():
@@ -14,6 +52,7 @@ def get_windows_user():
 def get_connection(db=None):
     """Get a database connection. Each call returns a new connection to avoid sharing cached closed connections."""
     conn = None  # Initialize conn
+    started = time.perf_counter()
     try:
         # Simplified connection string for diagnostics
         conn_str = (
@@ -27,49 +66,27 @@ def get_connection(db=None):
         if db:
             conn_str += f"DATABASE={db};"
 
-        # DEBUG
-        print(
-            f"DEBUG: Attempting to connect with simplified string: {conn_str}")
-        conn = pyodbc.connect(conn_str)
-        # DEBUG
-        print(f"DEBUG: Connected with simplified string. conn object: {conn}")
+        conn = _sql_driver().connect(conn_str)
 
         # Test the newly created connection
-        try:
-            print(f"DEBUG: Testing connection {conn}")  # DEBUG
-            with conn.cursor() as test_cursor:
-                test_cursor.execute("SELECT 1")
-            print(f"DEBUG: Connection test PASSED for {conn}")  # DEBUG
-        except pyodbc.Error as test_e:
-            # DEBUG
-            print(
-                f"DEBUG: Connection test FAILED for {conn} (simplified string): {test_e}")
-            if conn:
-                try:
-                    conn.close()
-                except pyodbc.Error:
-                    pass
-            raise  # Re-raise the error from the connection test
-
-        # DEBUG
-        print(f"DEBUG: Returning OPEN connection from get_connection: {conn}")
-        return conn  # Return the tested, open connection
-
-    except pyodbc.Error as e:
-        # DEBUG
-        print(
-            f"DEBUG: Connection Error in get_connection (simplified string) for DB '{db if db else 'default'}': {str(e)}")
+        with conn.cursor() as test_cursor:
+            test_cursor.execute("SELECT 1")
+
+        # Calls on the connection are timed and tagged with our caller (see telemetry.py)
+        return traced_connection(conn, db, (time.perf_counter() - started) * 1000)
+
+    except driver_error() as e:
         if conn:  # If connection object exists, try to close it
             try:
                 conn.close()
-            except pyodbc.Error as close_e:
-                # DEBUG
-                print(
-                    f"DEBUG: Error closing connection in except block: {close_e}")
+            except driver_error():
+                pass
+        # Records the error and the time spent (see telemetry.py)
+        connection_failed(db, (time.perf_counter() - started) * 1000, e)
         raise
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_databases():
     conn = None
     cursor = None
@@ -83,16 +100,16 @@ def get_databases():
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_tables(db):
     conn = None
     cursor = None
@@ -107,12 +124,12 @@ def get_tables(db):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 # Removed @st.cache_data decorator to prevent caching of database connections
@@ -219,7 +236,7 @@ def check_selected_tables(db, tables, min_rows_dict=None, max_rows_dict=None, co
     return pd.DataFrame(results)
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_table_size_info(db, table_name):
     conn = None
     cursor = None
@@ -245,7 +262,7 @@ def get_table_size_info(db, table_name):
                 ' ')[0]) if index_size_str else 0
             return {"data_kb": data_kb, "index_kb": index_kb}
         return {"data_kb": 0, "index_kb": 0}
-    except pyodbc.Error as e:
+    except driver_error() as e:
         # Handle cases where the table might not exist or other SQL errors
         print(f"Error getting size for table {db}.{table_name}: {str(e)}")
         return {"data_kb": 0, "index_kb": 0}  # Return default/error state
@@ -253,16 +270,17 @@ def get_table_size_info(db, table_name):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=1)  # Cache for just 1 second to ensure fresh data
+# Shared by all sessions: fresh for 5s, then served stale for up to 60s while one refresh runs
+@shared_snapshot(ttl=5, stale_ttl=60)
 def get_job_history(hours_back=24, detect_anomalies=True):
     conn = None
     cursor = None
@@ -335,6 +353,7 @@ def get_job_history(hours_back=24, detect_anomalies=True):
 
             # Calculate duration anomaly status
             duration_status = 'Normal'
+            duration_z_score = None
             # Only check anomalies for successful jobs
             if detect_anomalies and row[4] == 'Succeeded':
                 if job_name not in job_stats and job_name not in processed_jobs:
@@ -346,8 +365,10 @@ def get_job_history(hours_back=24, detect_anomalies=True):
                     stats = job_stats[job_name]
                     # Check if duration is an outlier (> 2 std deviations from mean)
                     if stats['std_seconds'] > 0:  # Avoid division by zero
-                        z_score = abs(
+                        signed_z_score = (
                             duration_seconds - stats['avg_seconds']) / stats['std_seconds']
+                        duration_z_score = round(float(signed_z_score), 2)
+                        z_score = abs(signed_z_score)
                         if z_score > 2:
                             if duration_seconds > stats['avg_seconds']:
                                 duration_status = 'Slow'
@@ -361,6 +382,7 @@ def get_job_history(hours_back=24, detect_anomalies=True):
                 'Duration': duration_str,
                 'Duration Seconds': duration_seconds,
                 'Duration Status': duration_status,
+                'Duration Z Score': duration_z_score,
                 'Status': row[4],
                 'Message': row[5] or ''
             })
@@ -370,16 +392,16 @@ def get_job_history(hours_back=24, detect_anomalies=True):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_job_details(job_name):
     conn = None
     cursor = None
@@ -423,16 +445,16 @@ def get_job_details(job_name):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_job_steps(job_name):
     conn = None
     cursor = None
@@ -504,12 +526,12 @@ def get_job_steps(job_name):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
@@ -530,7 +552,8 @@ def get_excluded_jobs():
     ]
 
 
-@st.cache_data(ttl=1)  # Cache for just 1 second to ensure fresh data
+# Shared by all sessions: fresh for 5s, then served stale for up to 60s while one refresh runs
+@shared_snapshot(ttl=5, stale_ttl=60)
 def get_all_jobs():
     conn = None
     cursor = None
@@ -602,16 +625,17 @@ def get_all_jobs():
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=1)  # Cache for just 1 second to ensure fresh data
+# Shared by all sessions: fresh for 5s, then served stale for up to 60s while one refresh runs
+@shared_snapshot(ttl=5, stale_ttl=60)
 def get_active_jobs():
     conn = None
     cursor = None
@@ -662,16 +686,16 @@ def get_active_jobs():
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_job_duration_stats(job_name, sample_size=10):
     conn = None
     cursor = None
@@ -702,7 +726,6 @@ def get_job_duration_stats(job_name, sample_size=10):
             durations.append(total_seconds)
 
         if durations:
-            import numpy as np
             return {
                 'avg_seconds': np.mean(durations),
                 'std_seconds': np.std(durations),
@@ -723,16 +746,16 @@ def get_job_duration_stats(job_name, sample_size=10):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@cache_data(ttl=300)  # Cache for 5 minutes
 def get_table_columns(db, table):
     conn = None
     cursor = None
@@ -749,15 +772,292 @@ def get_table_columns(db, table):
         if cursor:
             try:
                 cursor.close()
-            except pyodbc.Error:
+            except driver_error():
+                pass
+        if conn:
+            try:
+                conn.close()
+            except driver_error():
+                pass
+
+
+@cache_data(ttl=300)  # Cache for 5 minutes
+def get_all_table_columns(db):
+    """Columns of every table in db in one round trip: {table: [{"name", "type"}, ...]}"""
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection(db)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE
+            FROM INFORMATION_SCHEMA.COLUMNS
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+        columns_by_table = {}
+        for row in cursor.fetchall():
+            columns_by_table.setdefault(row[0], []).append(
+                {"name": row[1], "type": row[2]})
+        return columns_by_table
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except driver_error():
+                pass
+        if conn:
+            try:
+                conn.close()
+            except driver_error():
+                pass
+
+
+def quote_name(name):
+    """Quote a SQL Server identifier with brackets"""
+    return "[" + str(name).replace("]", "]]") + "]"
+
+
+@cache_data(ttl=300)  # Cache for 5 minutes
+def get_table_indexes(db, table):
+    """
+    The clustered, primary key and unique indexes of a table (unfiltered ones only),
+    as {index_id: {"clustered", "unique", "primary_key", "nullable", "columns"}} with
+    the key columns in key order. Heaps without unique indexes give {}.
+    """
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection(db)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT i.index_id, i.type, i.is_unique, i.is_primary_key, c.name, c.is_nullable
+            FROM sys.indexes i
+            INNER JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            INNER JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID(?)
+            AND (i.type = 1 OR i.is_unique = 1 OR i.is_primary_key = 1)
+            AND i.has_filter = 0
+            AND ic.key_ordinal > 0
+            ORDER BY i.index_id, ic.key_ordinal
+        """, [f"dbo.{quote_name(table)}"])
+        indexes = {}
+        for index_id, index_type, is_unique, is_primary_key, column, is_nullable in cursor.fetchall():
+            index = indexes.setdefault(index_id, {
+                "clustered": index_type == 1, "unique": bool(is_unique),
+                "primary_key": bool(is_primary_key), "nullable": False, "columns": []})
+            index["columns"].append(column)
+            index["nullable"] = index["nullable"] or bool(is_nullable)
+        return indexes
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except driver_error():
                 pass
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
 
 
+def _keyset_columns(indexes):
+    """
+    Columns that identify a row uniquely and are never NULL, for keyset paging, led by
+    the clustered index key so the seek follows it; [] if the table has no such key.
+    A non-unique clustered key gets the primary key (or a unique index) appended.
+    """
+    clustered = next((i for i in indexes.values() if i["clustered"]), None)
+    # Nullable columns cannot be compared with > / =, so they never make a usable key
+    unique = sorted((i for i in indexes.values() if i["unique"] and not i["nullable"]),
+                    key=lambda i: (not i["clustered"], not i["primary_key"], len(i["columns"])))
+    if not unique:
+        return []
+    if unique[0]["clustered"] or clustered is None or clustered["nullable"]:
+        return list(unique[0]["columns"])
+    return clustered["columns"] + [c for c in unique[0]["columns"] if c not in clustered["columns"]]
+
+
+# Types SQL Server cannot ORDER BY (nor DISTINCT or compare with IN)
+_UNSORTABLE_TYPES = {"text", "ntext", "image", "xml", "geography", "geometry"}
+
+
+def get_filterable_columns(db, table):
+    """Names of the columns of a table that get_distinct_values and filters can use"""
+    return [c["name"] for c in get_table_columns(db, table)
+            if c["type"].lower() not in _UNSORTABLE_TYPES]
+
+
+def _filter_predicates(db, table, filters):
+    """
+    Translate {column: [values]} selections into parameterized SQL predicates.
+    Column names are checked against the table's filterable columns before being quoted.
+    """
+    if not filters:
+        return [], []
+    known_columns = set(get_filterable_columns(db, table))
+    wheres = []
+    params = []
+    for column, values in filters.items():
+        if column not in known_columns:
+            raise ValueError(f"Unknown or unsortable column {column} for table {db}.{table}")
+        if not values:
+            continue
+        non_null = [v for v in values if v is not None]
+        terms = []
+        if non_null:
+            terms.append(
+                f"{quote_name(column)} IN ({','.join('?' * len(non_null))})")
+            params.extend(non_null)
+        if len(non_null) < len(values):
+            terms.append(f"{quote_name(column)} IS NULL")
+        wheres.append("(" + " OR ".join(terms) + ")")
+    return wheres, params
+
+
+@cache_data(ttl=60)  # Cache for 1 minute
+def get_distinct_values(db, table, column, limit=200, filters=None, where_sql=None, where_params=None):
+    """
+    Up to limit distinct values of one column, computed by SQL Server.
+
+    filters/where_sql narrow the rows the same way as fetch_table_page, so the choices
+    offered for one column reflect the selections already made on the others.
+    Returns a (values, truncated) tuple.
+    """
+    if column not in get_filterable_columns(db, table):
+        raise ValueError(f"Unknown or unsortable column {column} for table {db}.{table}")
+
+    wheres, params = _filter_predicates(db, table, filters)
+    if where_sql:
+        wheres.insert(0, f"({where_sql})")
+        params = list(where_params or []) + params
+    where_clause = f"WHERE {' AND '.join(wheres)}" if wheres else ""
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection(db)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT DISTINCT TOP ({int(limit) + 1}) {quote_name(column)}
+            FROM {quote_name(db)}.[dbo].{quote_name(table)}
+            {where_clause}
+            ORDER BY {quote_name(column)}
+        """, params)
+        values = [row[0] for row in cursor.fetchmany(int(limit) + 1)]
+        return values[:limit], len(values) > limit
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except driver_error():
+                pass
+        if conn:
+            try:
+                conn.close()
+            except driver_error():
+                pass
+
+
+def fetch_table_page(db, table, page_size=100, after_key=None, offset=0, columns=None,
+                     where_sql=None, where_params=None, filters=None, fetch_chunk=500):
+    """
+    Fetch one bounded page of rows from db.dbo.table.
+
+    Tables with a unique, non-nullable key (see _keyset_columns) are paged by keyset on
+    that key: pass the next_key returned for the previous page as after_key. Other
+    tables fall back to OFFSET/FETCH with offset, ordered by the clustered key, or in
+    no particular order on a heap: there, and among rows with equal non-unique clustered
+    keys, pages are not guaranteed to be stable between calls. Rows are streamed with
+    fetchmany, so no more than page_size + 1 rows are ever held, whatever the table size.
+
+    Parameters:
+    - columns: Column names to select (default all); key columns are added when missing
+    - where_sql: Extra trusted predicate (with ? placeholders) applied before paging
+    - where_params: Parameters for where_sql
+    - filters: {column: [values]} selections, applied server-side as IN predicates
+
+    Returns a (DataFrame, next_key, has_more) tuple; next_key is None for offset paging
+    and on the last page.
+    """
+    indexes = get_table_indexes(db, table)
+    key_columns = _keyset_columns(indexes)
+    select_columns = "*"
+    if columns:
+        wanted = list(columns) + [k for k in key_columns if k not in columns]
+        select_columns = ", ".join(quote_name(c) for c in wanted)
+
+    wheres = []
+    params = []
+    if where_sql:
+        wheres.append(f"({where_sql})")
+        params.extend(where_params or [])
+    filter_wheres, filter_params = _filter_predicates(db, table, filters)
+    wheres.extend(filter_wheres)
+    params.extend(filter_params)
+
+    source = f"{quote_name(db)}.[dbo].{quote_name(table)}"
+    if key_columns:
+        if after_key is not None:
+            # (k1 > ?) OR (k1 = ? AND k2 > ?) OR ... : rows strictly after the last key seen
+            alternatives = []
+            for i, key in enumerate(key_columns):
+                terms = [f"{quote_name(k)} = ?" for k in key_columns[:i]]
+                terms.append(f"{quote_name(key)} > ?")
+                alternatives.append("(" + " AND ".join(terms) + ")")
+                params.extend(list(after_key[:i]) + [after_key[i]])
+            wheres.append("(" + " OR ".join(alternatives) + ")")
+        where_clause = f"WHERE {' AND '.join(wheres)}" if wheres else ""
+        order_by = ", ".join(quote_name(k) for k in key_columns)
+        query = f"SELECT TOP ({int(page_size) + 1}) {select_columns} FROM {source} {where_clause} ORDER BY {order_by}"
+    else:
+        where_clause = f"WHERE {' AND '.join(wheres)}" if wheres else ""
+        # Following the clustered index keeps each page a range read; sorting a heap
+        # would mean sorting the whole table for every page
+        clustered = next((i["columns"] for i in indexes.values() if i["clustered"]), [])
+        order_by = ", ".join(quote_name(c) for c in clustered) or "(SELECT NULL)"
+        if int(offset) == 0:
+            query = f"SELECT TOP ({int(page_size) + 1}) {select_columns} FROM {source} {where_clause} ORDER BY {order_by}"
+        else:
+            query = (f"SELECT {select_columns} FROM {source} {where_clause} ORDER BY {order_by} "
+                     f"OFFSET {int(offset)} ROWS FETCH NEXT {int(page_size) + 1} ROWS ONLY")
+
+    conn = None
+    cursor = None
+    try:
+        conn = get_connection(db)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        column_names = [d[0] for d in cursor.description]
+        rows = []
+        while len(rows) <= page_size:
+            chunk = cursor.fetchmany(min(fetch_chunk, page_size + 1 - len(rows)))
+            if not chunk:
+                break
+            rows.extend(tuple(row) for row in chunk)
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except driver_error():
+                pass
+        if conn:
+            try:
+                conn.close()
+            except driver_error():
+                pass
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    page = pd.DataFrame.from_records(rows, columns=column_names)
+
+    next_key = None
+    if key_columns and has_more and rows:
+        last = dict(zip(column_names, rows[-1]))
+        next_key = tuple(last[k] for k in key_columns)
+    return page, next_key, has_more
+
+
 def check_column_conditions(db, table, column_configs, min_match_count=1):
     """
     Check if table data meets the column conditions.
@@ -910,7 +1210,7 @@ def get_rows_for_processed_today(db, table_name, date_column_name, processed_col
         # Assumes names are simple identifiers, possibly with underscores.
         # SQL Server specific quoting with [] handles spaces or keywords if names are passed correctly.
         if not all(name.replace('_', '').replace('[', '').replace(']', '').isalnum() for name in [table_name, date_column_name, processed_column_name]):
-            st.error(
+            print(
                 f"Invalid table or column name format provided: {table_name}, {date_column_name}, {processed_column_name}")
             return pd.DataFrame([])
 
@@ -922,16 +1222,16 @@ def get_rows_for_processed_today(db, table_name, date_column_name, processed_col
         """
         df = pd.read_sql(query, conn)
         return df
-    except pyodbc.Error as e:
-        st.error(f"SQL Error fetching rows for {db}.{table_name}: {str(e)}")
+    except driver_error() as e:
+        print(f"SQL Error fetching rows for {db}.{table_name}: {str(e)}")
         return pd.DataFrame([])
     except Exception as e:
-        st.error(f"An unexpected error occurred while fetching rows: {str(e)}")
+        print(f"An unexpected error occurred while fetching rows: {str(e)}")
         return pd.DataFrame([])
     finally:
         # pd.read_sql usually handles connection closing, but explicit close is safer
         if conn:
             try:
                 conn.close()
-            except pyodbc.Error:
+            except driver_error():
                 pass
@@ -0,0 +1,439 @@
+"""
+Large-volume benchmark of the local store (components/db.py).
+
+Fills alert_log, table_check_log and job_monitor_log of a throwaway SQLite store
+with synthetic rows (tens of millions by default), spread evenly over the last
+--days days in insertion order like real checks. Then:
+- times every read in db.py: get_alerts with each filter combination, alert
+  paging and search, get_latest_log, the trend query and the config loaders,
+  and records the SQLite query plan of each, so an index change shows up as
+  both a time and a plan change
+- measures write throughput of log_alert / log_table_check_result with 1, 4 and
+  16 concurrent writer threads
+
+Run from the repository root:
+
+    python -m components.store_benchmark
+    python -m components.store_benchmark --alerts 100000 --table-checks 400000 --job-checks 100000
+    python -m components.store_benchmark --store /tmp/big.db --compare data/benchmarks/store-baseline.json
+
+Filling the default volume takes a while; with --store the filled file is kept and
+reused by later runs (an existing file is not filled again). Results are saved as
+JSON (--output). With --compare, the exit code is 1 when a query got slower or
+write throughput dropped by more than --tolerance against an earlier result file.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import event
+
+from components import db
+from components.db import (
+    use_database, init_db, update_db_schema, save_table_config, save_job_config,
+    save_column_configs, log_alert, log_table_check_result, get_alerts, get_alerts_page,
+    search_alerts, get_latest_log, load_saved_table_config, load_saved_job_config,
+    load_column_config, get_table_trend, get_store_versions, get_slow_queries,
+    load_dashboard_snapshot
+)
+
+FILL_CHUNK_ROWS = 500_000
+
+# (alert_type, source_type, status) as logged by components/checks.py
+ALERT_KINDS = [
+    ("Table", "Empty Table", "Empty"),
+    ("Table", "Low Row Count", "Warn-LowCount"),
+    ("Table", "High Row Count", "Warn-HighCount"),
+    ("Table", "Table Error", "Error"),
+    ("Table", "Unprocessed Records", "Warn-UnprocessedRecords"),
+    ("Job", "Failed Job", "Failed"),
+    ("Job", "Duration Anomaly", "Slow"),
+    ("Job", "Duration Anomaly", "Fast"),
+]
+
+# Rows n = :offset .. :offset + :count - 1 of a fill, :step seconds apart from :start
+_SEQUENCE_CTE = """
+WITH RECURSIVE seq(n) AS (
+    SELECT :offset UNION ALL SELECT n + 1 FROM seq WHERE n < :offset + :count - 1
+)"""
+
+_FILL_TABLE_CHECKS_SQL = _SEQUENCE_CTE + """
+INSERT INTO table_check_log (db_name, table_name, check_time, row_count, status, total_mb)
+SELECT printf('FakeDB%02d', n % :databases),
+       printf('Table%03d', (n / :databases) % :tables),
+       datetime(:start + CAST(n * :step AS INTEGER), 'unixepoch'),
+       abs(random()) % 1000000,
+       CASE WHEN abs(random()) % 100 < 94 THEN 'OK'
+            WHEN abs(random()) % 3 = 0 THEN 'Empty'
+            WHEN abs(random()) % 2 = 0 THEN 'Warn-LowCount'
+            ELSE 'Error: Timeout expired' END,
+       round((abs(random()) % 100000) / 10.0, 1)
+FROM seq
+"""
+
+_FILL_JOB_CHECKS_SQL = _SEQUENCE_CTE + """
+INSERT INTO job_monitor_log (job_name, check_time, status, last_run, next_run, message)
+SELECT printf('FakeJob%03d', n % :jobs),
+       datetime(:start + CAST(n * :step AS INTEGER), 'unixepoch'),
+       CASE WHEN abs(random()) % 100 < 95 THEN 'Succeeded' ELSE 'Failed' END,
+       datetime(:start + CAST(n * :step AS INTEGER) - 600, 'unixepoch'),
+       datetime(:start + CAST(n * :step AS INTEGER) + 3000, 'unixepoch'),
+       'The job succeeded. The Job was invoked by Schedule ' || (n % :jobs)
+FROM seq
+"""
+
+_FILL_ALERTS_SQL = _SEQUENCE_CTE + """
+INSERT INTO alert_log (alert_time, alert_type, source_type, source_name, status, message, details)
+SELECT alert_time, alert_type, source_type, source_name, status,
+       CASE WHEN alert_type = 'Table'
+            THEN 'Table ' || source_name || ' has ' || status || ' status'
+            ELSE 'Job ' || source_name || ' failed at ' || alert_time END,
+       CASE WHEN alert_type = 'Table'
+            THEN 'Database: ' || substr(source_name, 1, 8) || char(10) ||
+                 'Row Count: ' || (abs(random()) % 1000) || char(10)
+            ELSE 'Job Name: ' || source_name || char(10) ||
+                 'Duration: ' || (abs(random()) % 3600) || char(10) END
+FROM (
+    SELECT datetime(:start + CAST(n * :step AS INTEGER), 'unixepoch') AS alert_time,
+           kinds.alert_type, kinds.source_type, kinds.status,
+           CASE WHEN kinds.alert_type = 'Table'
+                THEN printf('FakeDB%02d.Table%03d', n % :databases, (n / :databases) % :tables)
+                ELSE printf('FakeJob%03d', n % :jobs) END AS source_name
+    FROM seq
+    JOIN bench_alert_kinds AS kinds ON kinds.k = (n * 2654435761 % 4294967296) % :kinds
+)
+"""
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _fill(conn, sql, rows, span_seconds, params, label):
+    """Insert rows synthetic rows with sql in chunks, reporting progress on stderr"""
+    start = int(time.time()) - span_seconds
+    step = span_seconds / max(rows, 1)
+    started = time.perf_counter()
+    for offset in range(0, rows, FILL_CHUNK_ROWS):
+        count = min(FILL_CHUNK_ROWS, rows - offset)
+        conn.execute(sql, {**params, "offset": offset, "count": count,
+                           "start": start, "step": step})
+        conn.commit()
+        print(f"\r{label}: {offset + count:,} / {rows:,} rows", end="", file=sys.stderr)
+    print(f" ({time.perf_counter() - started:.0f}s)", file=sys.stderr)
+
+
+def fill_store(db_file, alerts, table_checks, job_checks, days=30,
+               databases=4, tables=50, jobs=100):
+    """
+    Create the store at db_file and fill its log tables with synthetic rows.
+
+    Parameters:
+    - alerts / table_checks / job_checks: rows for alert_log, table_check_log and job_monitor_log
+    - days: the rows are spread evenly over the last days days
+    - databases / tables / jobs: number of distinct sources the rows are logged for
+    """
+    use_database(db_file)
+    init_db()
+
+    span = int(days * 86400)
+    names = {"databases": databases, "tables": tables, "jobs": jobs}
+    conn = sqlite3.connect(db_file)
+    try:
+        # Throwaway file: a crash mid-fill only loses the benchmark store
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TEMP TABLE bench_alert_kinds (k INTEGER PRIMARY KEY, "
+                     "alert_type TEXT, source_type TEXT, status TEXT)")
+        conn.executemany("INSERT INTO bench_alert_kinds VALUES (?, ?, ?, ?)",
+                         [(k,) + kind for k, kind in enumerate(ALERT_KINDS)])
+        _fill(conn, _FILL_TABLE_CHECKS_SQL, table_checks, span, names, "table_check_log")
+        _fill(conn, _FILL_JOB_CHECKS_SQL, job_checks, span, names, "job_monitor_log")
+        _fill(conn, _FILL_ALERTS_SQL, alerts, span, {**names, "kinds": len(ALERT_KINDS)},
+              "alert_log")
+    finally:
+        conn.close()
+
+    # Builds the alert_log indexes and the full-text index over the filled rows
+    started = time.perf_counter()
+    update_db_schema()
+    print(f"alert_log indexes: {time.perf_counter() - started:.0f}s", file=sys.stderr)
+
+    for d in range(databases):
+        save_table_config(f"FakeDB{d:02d}", [f"Table{t:03d}" for t in range(tables)])
+    save_job_config([f"FakeJob{j:03d}" for j in range(jobs)])
+    save_column_configs("FakeDB00", {
+        f"Table{t:03d}": [{"column_name": "Processed", "condition_type": "equals",
+                           "condition_value": "0"}]
+        for t in range(tables)})
+
+
+def query_cases():
+    """(name, callable) for every read the benchmark times"""
+    cases = []
+    for alert_type, source_type, status, hours_back in itertools.product(
+            (None, "Table"), (None, "Empty Table"), (None, "Empty"), (None, 24)):
+        filters = {"alert_type": alert_type, "source_type": source_type,
+                   "status": status, "hours_back": hours_back}
+        used = ", ".join(name for name, value in filters.items() if value)
+        cases.append((f"get_alerts({used})",
+                      lambda filters=filters: get_alerts(limit=100, **filters)))
+
+    def deep_page():
+        # Cursor from the middle of the log, as after paging back through weeks
+        with db.engine.connect() as conn:
+            row = conn.exec_driver_sql(
+                "SELECT alert_time, id FROM alert_log WHERE id >= "
+                "(SELECT (MIN(id) + MAX(id)) / 2 FROM alert_log) ORDER BY id LIMIT 1").fetchone()
+        return get_alerts_page(page_size=50, cursor=tuple(row) if row else None)
+
+    cases += [
+        ("get_alerts_page()", lambda: get_alerts_page(page_size=50)),
+        ("get_alerts_page(cursor mid-log)", deep_page),
+        ("get_alerts_page(status)", lambda: get_alerts_page(page_size=50, status="Failed")),
+        ("get_alerts_page(source_prefix)",
+         lambda: get_alerts_page(page_size=50, source_prefix="FakeDB01.")),
+        ("search_alerts('empty')", lambda: search_alerts("empty")),
+        ("search_alerts('FakeJob007 failed')", lambda: search_alerts("FakeJob007 failed")),
+        ("get_latest_log()", get_latest_log),
+        ("get_table_trend(24 hours)", lambda: get_table_trend("FakeDB00", "Table000", 24)),
+        ("get_table_trend(30 days)", lambda: get_table_trend("FakeDB00", "Table000", 720)),
+        ("load_saved_table_config()", load_saved_table_config),
+        ("load_saved_job_config()", load_saved_job_config),
+        ("load_column_config()", load_column_config),
+        ("load_column_config(db, table)", lambda: load_column_config("FakeDB00", "Table000")),
+        ("get_store_versions()", get_store_versions),
+        ("get_slow_queries()", get_slow_queries),
+        ("load_dashboard_snapshot()", load_dashboard_snapshot),
+    ]
+    return cases
+
+
+class StatementRecorder:
+    """Collects the statements db.engine runs, to explain the last SELECT"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def query_plan(self):
+        selects = [(s, p) for s, p in self.statements
+                   if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+        if not selects:
+            return ""
+        statement, parameters = selects[-1]
+        with db.engine.connect() as conn:
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        return "; ".join(row[-1] for row in plan)
+
+
+def time_queries(repeat=5):
+    """Median/min/max time, rows returned and query plan of every query case"""
+    results = []
+    for name, func in query_cases():
+        recorder = StatementRecorder()
+        event.listen(db.engine, "before_cursor_execute", recorder)
+        try:
+            result = func()  # warm-up run; also captures the statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", recorder)
+        plan = recorder.query_plan()
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+
+        frame = result[0] if isinstance(result, tuple) else result
+        results.append({
+            "name": name,
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "min_ms": round(min(timings) * 1000, 2),
+            "max_ms": round(max(timings) * 1000, 2),
+            "rows": len(frame) if isinstance(frame, (pd.DataFrame, list)) else None,
+            "plan": plan,
+        })
+        print(f"{name}: {results[-1]['median_ms']} ms", file=sys.stderr)
+    return results
+
+
+def measure_writes(writers, seconds=10.0):
+    """
+    Throughput of writer threads alternating log_alert and log_table_check_result
+    for seconds. Returns ops, ops per second, latency percentiles and errors.
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def writer(index):
+        mine, failures, i = [], [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                if i % 2:
+                    log_table_check_result(f"FakeDB{index % 4:02d}", f"Table{i % 50:03d}",
+                                           i, "OK", total_mb=1.5)
+                else:
+                    log_alert("Table", "Empty Table", f"FakeDB{index % 4:02d}.Table{i % 50:03d}",
+                              "Empty", message=f"Table FakeDB{index % 4:02d}.Table{i % 50:03d} "
+                                               "has Empty status", details="Row Count: 0\n")
+            except Exception as e:
+                failures.append(str(e))
+            mine.append(time.perf_counter() - started)
+            i += 1
+        with lock:
+            latencies.extend(mine)
+            errors.extend(failures)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=writer, args=(i,), name=f"writer-{i}")
+               for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    ms = np.asarray(latencies or [0.0]) * 1000
+    return {
+        "writers": writers,
+        "ops": len(latencies),
+        "ops_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "errors": len(errors),
+        "lock_errors": sum("database is locked" in e for e in errors),
+    }
+
+
+def store_stats(db_file):
+    with db.engine.connect() as conn:
+        counts = {table: conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar()
+                  for table in ("alert_log", "table_check_log", "job_monitor_log")}
+    return {"file_mb": round(os.path.getsize(db_file) / 2**20, 1), "rows": counts}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Comparison with a baseline result file. Returns (DataFrame, regressed) where
+    regressed is True if a query's median got slower, or write throughput dropped,
+    by more than tolerance.
+    """
+    rows = []
+    regressed = False
+    before_queries = {q["name"]: q for q in baseline["queries"]}
+    for current in results["queries"]:
+        before = before_queries.get(current["name"])
+        if before is None:
+            continue
+        ratio = current["median_ms"] / before["median_ms"] if before["median_ms"] else float("nan")
+        rows.append({"measure": current["name"], "ratio": round(ratio, 2),
+                     "plan changed": current["plan"] != before["plan"]})
+        regressed |= ratio > 1 + tolerance
+    before_writes = {w["writers"]: w for w in baseline["writes"]}
+    for current in results["writes"]:
+        before = before_writes.get(current["writers"])
+        if before is None:
+            continue
+        ratio = current["ops_per_second"] / before["ops_per_second"] if before["ops_per_second"] else float("nan")
+        rows.append({"measure": f"writes x{current['writers']} (throughput)",
+                     "ratio": round(ratio, 2), "plan changed": False})
+        regressed |= ratio < 1 - tolerance
+    return pd.DataFrame(rows), regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m components.store_benchmark",
+        description="Time the local store's queries and writes on a large synthetic store.")
+    parser.add_argument("--alerts", type=int, default=5_000_000,
+                        help="alert_log rows (default 5,000,000)")
+    parser.add_argument("--table-checks", type=int, default=20_000_000,
+                        help="table_check_log rows (default 20,000,000)")
+    parser.add_argument("--job-checks", type=int, default=5_000_000,
+                        help="job_monitor_log rows (default 5,000,000)")
+    parser.add_argument("--days", type=float, default=30,
+                        help="Days the rows are spread over (default 30)")
+    parser.add_argument("--store", help="SQLite file to fill and keep; reused if it exists "
+                                        "(default: a temporary file)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per query; the median is reported (default 5)")
+    parser.add_argument("--writers", type=_int_list, default=[1, 4, 16],
+                        help="Comma-separated concurrent writer counts (default 1,4,16)")
+    parser.add_argument("--write-seconds", type=float, default=10,
+                        help="Seconds each writer count runs (default 10)")
+    parser.add_argument("--output", default=None,
+                        help="Result file (default data/benchmarks/store-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown ratio before --compare fails (default 0.2)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="sqlmon-store-") as store_dir:
+        db_file = os.path.abspath(args.store or os.path.join(store_dir, "job_monitor.db"))
+        if os.path.exists(db_file):
+            print(f"Reusing {db_file}", file=sys.stderr)
+            use_database(db_file)
+        else:
+            fill_store(db_file, args.alerts, args.table_checks, args.job_checks, days=args.days)
+
+        results = {
+            "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "settings": {"repeat": args.repeat, "write_seconds": args.write_seconds,
+                         "days": args.days},
+            "store": store_stats(db_file),
+            "queries": time_queries(repeat=args.repeat),
+            "writes": [],
+        }
+        for writers in args.writers:
+            results["writes"].append(measure_writes(writers, seconds=args.write_seconds))
+            print(f"{writers} writers: {results['writes'][-1]['ops_per_second']} ops/s",
+                  file=sys.stderr)
+        db.engine.dispose()
+
+    print(pd.DataFrame(results["queries"]).drop(columns=["plan"]).to_string(index=False))
+    print()
+    print(pd.DataFrame(results["writes"]).to_string(index=False))
+
+    output = args.output or os.path.join(
+        "data", "benchmarks", f"store-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison, regressed = compare(results, baseline, args.tolerance)
+        print()
+        print(comparison.to_string(index=False) if not comparison.empty
+              else "No measures in common with the baseline")
+        if regressed:
+            print("Regression against the baseline", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
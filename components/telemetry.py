@@ -0,0 +1,333 @@
+"""
+Timing of every SQL Server call made through get_connection.
+
+get_connection returns a TracedConnection, whose cursors time each execute together
+with the fetches that follow it, and count the rows and (approximate) bytes returned.
+Each call is tagged with the components.sql function that opened the connection and
+with the monitored object it was made for (see query_target), then:
+- added to in-memory per-function latency histograms and per-object totals, which
+  the dashboard's "Slowest checks" panel reads, and
+- sampled into the local query_log table (errors and slow calls always), written in
+  batches by flush_query_log at the end of each collection cycle.
+
+SQLMON_QUERY_LOG_SAMPLE sets the fraction of ordinary calls logged (default 0.1).
+"""
+import contextlib
+import contextvars
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from components.db import log_query_samples
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500,
+                      1000, 2500, 5000, 10000, 30000)
+# Calls at least this slow are always written to query_log
+SLOW_QUERY_MS = 1000
+# Pending query_log rows that trigger a write before the cycle ends
+MAX_PENDING_SAMPLES = 500
+
+# Fraction of ordinary calls written to query_log unless SQLMON_QUERY_LOG_SAMPLE says otherwise
+DEFAULT_QUERY_LOG_SAMPLE_RATE = 0.1
+
+
+def _sample_rate_from_env():
+    """SQLMON_QUERY_LOG_SAMPLE clamped to [0, 1]; the default when unset or malformed"""
+    value = os.getenv("SQLMON_QUERY_LOG_SAMPLE", "").strip()
+    if not value:
+        return DEFAULT_QUERY_LOG_SAMPLE_RATE
+    try:
+        rate = float(value)
+    except ValueError:
+        rate = math.nan
+    if math.isnan(rate):
+        print(f"WARNING: Ignoring SQLMON_QUERY_LOG_SAMPLE={value!r}; "
+              f"using {DEFAULT_QUERY_LOG_SAMPLE_RATE}")
+        return DEFAULT_QUERY_LOG_SAMPLE_RATE
+    return min(max(rate, 0.0), 1.0)
+
+
+QUERY_LOG_SAMPLE_RATE = _sample_rate_from_env()
+
+_target = contextvars.ContextVar("query_target", default=(None, None))
+_lock = threading.Lock()
+_function_stats = {}
+_object_stats = {}
+_pending = []
+_started = time.time()
+
+
+@contextlib.contextmanager
+def query_target(db, table=None):
+    """Tag SQL Server calls made in this block (in this thread) with a monitored object"""
+    token = _target.set((db, table))
+    try:
+        yield
+    finally:
+        _target.reset(token)
+
+
+def _new_stats():
+    return {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "bytes": 0}
+
+
+def _add(stats, duration_ms, rows, nbytes, error):
+    stats["calls"] += 1
+    stats["errors"] += error is not None
+    stats["total_ms"] += duration_ms
+    stats["max_ms"] = max(stats["max_ms"], duration_ms)
+    stats["rows"] += rows
+    stats["bytes"] += nbytes
+
+
+def record_call(function, operation, db, table, duration_ms, rows=0, nbytes=0, error=None):
+    """
+    Add one SQL Server call to the in-memory statistics and maybe to the query_log sample.
+
+    Parameters:
+    - function: name of the function that made the call (e.g. 'get_job_history')
+    - operation: 'connect', or the first keyword of the statement (SELECT, EXEC, ...)
+    - db, table: monitored object the call was made for (table may be None)
+    - duration_ms: execute plus fetch time, or connection acquire time for 'connect'
+    - rows, nbytes: rows fetched and their approximate size
+    - error: error message if the call raised, else None
+    """
+    with _lock:
+        stats = _function_stats.get(function)
+        if stats is None:
+            stats = _function_stats[function] = dict(
+                _new_stats(), buckets=[0] * (len(LATENCY_BUCKETS_MS) + 1))
+        _add(stats, duration_ms, rows, nbytes, error)
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS_MS) and duration_ms > LATENCY_BUCKETS_MS[bucket]:
+            bucket += 1
+        stats["buckets"][bucket] += 1
+
+        if db is not None:
+            key = (db, table or "")
+            _add(_object_stats.setdefault(key, _new_stats()),
+                 duration_ms, rows, nbytes, error)
+
+        if error is not None or duration_ms >= SLOW_QUERY_MS or random.random() < QUERY_LOG_SAMPLE_RATE:
+            _pending.append({
+                "function": function, "operation": operation, "db_name": db,
+                "table_name": table, "duration_ms": round(duration_ms, 3), "rows": rows,
+                "bytes": nbytes, "error": error})
+        flush = len(_pending) >= MAX_PENDING_SAMPLES
+    if flush:
+        flush_query_log()
+
+
+def flush_query_log():
+    """Write pending query_log samples; returns how many were written"""
+    global _pending
+    with _lock:
+        samples, _pending = _pending, []
+    if not samples:
+        return 0
+    try:
+        log_query_samples(samples)
+    except Exception as e:
+        print(f"Error writing query log: {str(e)}")
+        return 0
+    return len(samples)
+
+
+def _percentile(buckets, calls, q):
+    """Upper bound of the histogram bucket holding the q-th quantile (None if unbounded)"""
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS + (None,), buckets):
+        seen += count
+        if seen >= q * calls:
+            return bound
+    return None
+
+
+def function_costs():
+    """Per-function call statistics since startup (or the last reset), slowest total first"""
+    with _lock:
+        items = [(name, dict(stats, buckets=list(stats["buckets"])))
+                 for name, stats in _function_stats.items()]
+    rows = [{
+        "Function": name,
+        "Calls": s["calls"],
+        "Errors": s["errors"],
+        "Total s": round(s["total_ms"] / 1000, 2),
+        "Avg ms": round(s["total_ms"] / s["calls"], 1),
+        "p50 ms ≤": _percentile(s["buckets"], s["calls"], 0.5),
+        "p95 ms ≤": _percentile(s["buckets"], s["calls"], 0.95),
+        "Max ms": round(s["max_ms"], 1),
+        "Rows": s["rows"],
+        "KB": round(s["bytes"] / 1024, 1),
+    } for name, s in items]
+    if not rows:
+        return pd.DataFrame(columns=["Function", "Calls", "Errors", "Total s", "Avg ms",
+                                     "p50 ms ≤", "p95 ms ≤", "Max ms", "Rows", "KB"])
+    return pd.DataFrame(rows).sort_values("Total s", ascending=False, ignore_index=True)
+
+
+def object_costs(limit=None):
+    """
+    Per monitored object SQL Server time since startup (or the last reset), slowest
+    first, with each object's share of the time spent on all objects.
+    """
+    with _lock:
+        items = [(key, dict(stats)) for key, stats in _object_stats.items()]
+    total_ms = sum(s["total_ms"] for _, s in items) or 1.0
+    rows = [{
+        "Database": db,
+        "Table": table,
+        "Calls": s["calls"],
+        "Errors": s["errors"],
+        "Total s": round(s["total_ms"] / 1000, 2),
+        "Share %": round(100 * s["total_ms"] / total_ms, 1),
+        "Avg ms": round(s["total_ms"] / s["calls"], 1),
+        "Max ms": round(s["max_ms"], 1),
+        "Rows": s["rows"],
+    } for (db, table), s in items]
+    if not rows:
+        return pd.DataFrame(columns=["Database", "Table", "Calls", "Errors", "Total s",
+                                     "Share %", "Avg ms", "Max ms", "Rows"])
+    df = pd.DataFrame(rows).sort_values("Total s", ascending=False, ignore_index=True)
+    return df.head(limit) if limit else df
+
+
+def telemetry_since():
+    """Unix time the in-memory statistics started accumulating"""
+    return _started
+
+
+def reset_telemetry():
+    """Clear the in-memory statistics (query_log is kept)"""
+    global _started
+    with _lock:
+        _function_stats.clear()
+        _object_stats.clear()
+        _started = time.time()
+
+
+def _row_bytes(rows):
+    """Approximate payload size of fetched rows: text/binary length, 8 bytes otherwise"""
+    size = 0
+    for row in rows:
+        for value in row:
+            size += len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+    return size
+
+
+class TracedCursor:
+    """
+    pyodbc cursor wrapper timing each execute and the fetches that follow it as one call.
+    The call is recorded at the next execute or when the cursor is closed.
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._call = None
+
+    def _finish(self):
+        call, self._call = self._call, None
+        if call is not None:
+            record_call(self._connection.function, call["operation"], call["db"],
+                        call["table"], call["ms"], call["rows"], call["bytes"], call["error"])
+
+    def execute(self, sql, *params):
+        self._finish()
+        db, table = _target.get()
+        self._call = {"operation": (sql.split(None, 1) or ["?"])[0].upper(),
+                      "db": db or self._connection.db, "table": table,
+                      "ms": 0.0, "rows": 0, "bytes": 0, "error": None}
+        started = time.perf_counter()
+        try:
+            self._cursor.execute(sql, *params)
+        except Exception as e:
+            self._call["error"] = str(e)
+            raise
+        finally:
+            self._call["ms"] += (time.perf_counter() - started) * 1000
+        return self
+
+    def _fetched(self, started, rows):
+        if self._call is not None:
+            self._call["ms"] += (time.perf_counter() - started) * 1000
+            self._call["rows"] += len(rows)
+            self._call["bytes"] += _row_bytes(rows)
+        return rows
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, [row] if row is not None else [])
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        return self._fetched(started, rows)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        return self._fetched(started, self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._finish()
+        return self._cursor.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TracedConnection:
+    """pyodbc connection wrapper handing out TracedCursors, tagged with its caller and db"""
+
+    def __init__(self, connection, function, db):
+        self._connection = connection
+        self.function = function
+        self.db = db
+
+    def cursor(self):
+        return TracedCursor(self._connection.cursor(), self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._connection.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def traced_connection(connection, db, acquire_ms, depth=2):
+    """
+    Wrap a freshly opened connection and record how long acquiring it took.
+    The calling function is taken from the stack, depth frames up from here.
+    """
+    function = sys._getframe(depth).f_code.co_name
+    target_db, table = _target.get()
+    record_call(function, "connect", target_db or db, table, acquire_ms)
+    return TracedConnection(connection, function, db)
+
+
+def connection_failed(db, acquire_ms, error, depth=2):
+    """Record a connection attempt that raised, tagged like traced_connection"""
+    target_db, table = _target.get()
+    record_call(sys._getframe(depth).f_code.co_name, "connect", target_db or db, table,
+                acquire_ms, error=str(error))
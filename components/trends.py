@@ -0,0 +1,84 @@
+"""
+Row count and size trends of monitored tables, downsampled for charting.
+"""
+import numpy as np
+import pandas as pd
+
+from components.db import get_table_trend
+
+# Points per series sent to the browser, whatever the range
+MAX_TREND_POINTS = 500
+
+TREND_RANGES = {
+    "Last 24 hours": 24,
+    "Last 7 days": 24 * 7,
+    "Last 30 days": 24 * 30,
+    "Last 90 days": 24 * 90,
+    "Last year": 24 * 365,
+}
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Parameters:
+    - x: increasing numeric x values (e.g. epoch seconds)
+    - y: numeric y values, same length as x
+    - threshold: number of points to keep (at least 3)
+
+    The first and last points are always kept. The rest is split into threshold - 2
+    buckets, and from each bucket the point forming the largest triangle with the
+    previously kept point and the average of the next bucket is kept, which preserves
+    peaks and dips that plain averaging would flatten.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        # Twice the triangle areas; the constant factor does not change the argmax
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample(df, time_column, value_column, max_points=MAX_TREND_POINTS):
+    """Drop missing values of value_column and LTTB-downsample what is left"""
+    series = df[[time_column, value_column]].dropna()
+    if len(series) <= max_points:
+        return series.reset_index(drop=True)
+    x = (series[time_column] - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+    keep = lttb_indices(x, series[value_column].to_numpy(), max_points)
+    return series.iloc[keep].reset_index(drop=True)
+
+
+def get_table_trends(db_name, table_name, hours_back=24, max_points=MAX_TREND_POINTS):
+    """
+    Downsampled trend series of one table.
+
+    Returns (row_counts, sizes): DataFrames of check_time/row_count and
+    check_time/total_mb with at most max_points rows each.
+    """
+    history = get_table_trend(db_name, table_name, hours_back)
+    if history.empty:
+        empty = pd.DataFrame(columns=["check_time"])
+        return empty.assign(row_count=[]), empty.assign(total_mb=[])
+    return (downsample(history, "check_time", "row_count", max_points),
+            downsample(history, "check_time", "total_mb", max_points))
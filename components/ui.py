@@ -6,16 +6,30 @@ from datetime import datetime, timedelta
 from components.sql import (
     get_databases, get_tables, check_selected_tables, get_table_size_info,
     get_job_history, get_job_details, get_job_steps, get_all_jobs, get_active_jobs, get_table_columns,
-    get_rows_for_processed_today, get_connection  # Added get_connection
+    get_rows_for_processed_today, get_connection,  # Added get_connection
+    fetch_table_page, get_distinct_values, get_filterable_columns, driver_error
 )
 from components.db import (
-    save_table_config, load_saved_table_config, log_table_check_result, get_latest_log,
-    save_job_config, load_saved_job_config, log_job_check_result, delete_table_config,
-    # Added imports
-    delete_job_config, log_alert, get_alerts, save_column_config, load_column_config
+    save_table_and_column_configs, load_saved_table_config, save_job_config,
+    load_saved_job_config, delete_table_config, delete_job_config, get_alerts_page,
+    search_alerts, save_column_config, load_column_config, get_slow_queries,
+    get_profile_runs, get_profile_run, get_store_versions
 )
+from components.config_io import (
+    export_config, dump_config, parse_config, format_for_path, validate_config,
+    diff_config, format_diff, import_config
+)
+from components.trends import get_table_trends, TREND_RANGES
+from components.refresh import refresh_governor
+from components.checks import get_dashboard_snapshot, invalidate_dashboard_snapshot
+from components.telemetry import object_costs, function_costs, telemetry_since, reset_telemetry
+from components.profiling import phase, profile_run, profiling_enabled_by_env, profile_file_bytes
+from components.caching import use_streamlit_cache
 from streamlit_autorefresh import st_autorefresh
 
+# Data functions in components.sql cache through st.cache_data inside the app
+use_streamlit_cache()
+
 
 def get_windows_user():
     try:
@@ -29,70 +43,59 @@ def get_windows_user():
             return "Unknown User"
 
 
+STATUS_COLORS = {
+    'Running': 'blue',
+    'Succeeded': 'green',
+    'Failed': 'red',
+    'Disabled': 'gray',
+    'Enabled': 'green',
+    'Canceled': 'orange',
+    'Retry': 'yellow',
+    'In Progress': 'blue',
+    'OK': 'green',
+    'Empty': 'yellow',
+    'Warn-LowCount': 'orange',
+    'Warn-HighCount': 'purple',
+    'Slow': 'orange',
+    'Fast': 'purple',
+    'Normal': 'green'
+}
+
+
 def apply_status_colors(df, status_column):
-    def color_status(val):
-        colors = {
-            'Running': 'blue',
-            'Succeeded': 'green',
-            'Failed': 'red',
-            'Disabled': 'gray',
-            'Enabled': 'green',
-            'Canceled': 'orange',
-            'Retry': 'yellow',
-            'In Progress': 'blue',
-            'OK': 'green',
-            'Empty': 'yellow',
-            'Warn-LowCount': 'orange',
-            'Warn-HighCount': 'purple',
-            'Slow': 'orange',
-            'Fast': 'purple',
-            'Normal': 'green'
-        }
-        return f'color: {colors.get(val, "black")}'
-
-    return df.style.apply(
-        lambda x: [color_status(val) if col == status_column else ''
-                   for col, val in x.items()], axis=1
-    )
+    # One vectorized lookup for the whole status column instead of a callback per cell
+    def color_column(statuses):
+        colors = statuses.astype(object).map(STATUS_COLORS).fillna('black')
+        return 'color: ' + colors
+
+    return df.style.apply(color_column, subset=[status_column])
 
 
 def show_notifications(table_results, job_results):
-    # Check for tables with issues
-    table_issues = []
-
-    if table_results:  # table_results is a list of dicts
-        for table_data in table_results:  # Renamed to avoid conflict
-            status = table_data['Status']
-            is_issue = False
-            if status == 'Empty':
-                is_issue = True
-            elif status.startswith('Error'):
-                is_issue = True
-            elif status == 'Warn-LowCount':  # Exact match for simple low count
-                is_issue = True
-            elif status == 'Warn-HighCount':  # Exact match for simple high count
-                is_issue = True
-            # Catch column condition issues that are explicitly warnings or combined with other warnings
-            elif 'ColumnConditionNotMet' in status and ('Warn' in status or ';ColCondNotMet' in status):
-                is_issue = True
-
-            if is_issue:
-                table_issues.append(table_data)
+    """table_results and job_results are the DataFrames of a DashboardSnapshot"""
+    # Tables with issues, grouped by the Issue Group classified at check time
+    table_issues = {}
+
+    if not table_results.empty:
+        issues = table_results[table_results['Issue Group'].notna()]
+        table_issues = {group: rows.to_dict('records')
+                        for group, rows in issues.groupby('Issue Group', observed=True)}
 
     # Check for failed jobs and duration anomalies
     failed_jobs = []
     slow_jobs = []
     fast_jobs = []
 
-    if job_results:
-        failed_jobs = [r for r in job_results if r['Status'] == 'Failed']
+    if not job_results.empty:
+        failed_jobs = job_results[job_results['Status']
+                                  == 'Failed'].to_dict('records')
 
         # Look for duration anomalies if available
-        if 'Duration Status' in job_results[0] if job_results else {}:
-            slow_jobs = [r for r in job_results if r.get(
-                'Duration Status') == 'Slow']
-            fast_jobs = [r for r in job_results if r.get(
-                'Duration Status') == 'Fast']
+        if 'Duration Status' in job_results:
+            slow_jobs = job_results[job_results['Duration Status']
+                                    == 'Slow'].to_dict('records')
+            fast_jobs = job_results[job_results['Duration Status']
+                                    == 'Fast'].to_dict('records')
 
     if table_issues or failed_jobs or slow_jobs or fast_jobs:
         with st.sidebar:
@@ -101,27 +104,21 @@ def show_notifications(table_results, job_results):
             if table_issues:
                 st.subheader("Table Issues")
 
-                # Handle Empty Tables
-                current_display_list = [
-                    t for t in table_issues if t['Status'] == 'Empty']
+                current_display_list = table_issues.get("Empty Tables", [])
                 if current_display_list:
                     st.markdown("#### Empty Tables")
                     for table_item in current_display_list:
                         st.warning(
                             f"⚠️ Empty Table: {table_item['Database']}.{table_item['Table']}")
 
-                # Handle Error Tables
-                current_display_list = [
-                    t for t in table_issues if t['Status'].startswith('Error')]
+                current_display_list = table_issues.get("Error Tables", [])
                 if current_display_list:
                     st.markdown("#### Error Tables")
                     for table_item in current_display_list:
                         st.error(
                             f"❌ Table Error: {table_item['Database']}.{table_item['Table']} - {table_item['Status']}")
 
-                # Handle Low Row Count (exact status match)
-                current_display_list = [
-                    t for t in table_issues if t['Status'] == 'Warn-LowCount']
+                current_display_list = table_issues.get("Low Row Count", [])
                 if current_display_list:
                     st.markdown("#### Low Row Count")
                     for table_item in current_display_list:
@@ -129,9 +126,7 @@ def show_notifications(table_results, job_results):
                         st.warning(
                             f"⚠️ Low Row Count: {table_item['Database']}.{table_item['Table']} - Count: {table_item.get('Row Count', 'N/A')}, Min: {min_rows}")
 
-                # Handle High Row Count (exact status match)
-                current_display_list = [
-                    t for t in table_issues if t['Status'] == 'Warn-HighCount']
+                current_display_list = table_issues.get("High Row Count", [])
                 if current_display_list:
                     st.markdown("#### High Row Count")
                     for table_item in current_display_list:
@@ -139,11 +134,10 @@ def show_notifications(table_results, job_results):
                         st.warning(
                             f"⚠️ High Row Count: {table_item['Database']}.{table_item['Table']} - Count: {table_item.get('Row Count', 'N/A')}, Max: {max_rows}")
 
-                # Handle Column Condition Issues
-                # This will catch statuses like 'Warn-ColumnConditionNotMet'
-                # or combined statuses like 'Warn-LowCount;ColCondNotMet'
-                current_display_list = [t for t in table_issues if 'ColumnConditionNotMet' in t['Status'] and (
-                    'Warn' in t['Status'] or ';ColCondNotMet' in t['Status'])]
+                # Statuses like 'Warn-ColumnConditionNotMet' or combined
+                # statuses like 'Warn-LowCount;ColCondNotMet'
+                current_display_list = table_issues.get(
+                    "Column Condition Issues", [])
                 if current_display_list:
                     st.markdown("#### Column Condition Issues")
                     for table_item in current_display_list:
@@ -155,7 +149,7 @@ def show_notifications(table_results, job_results):
                 for job in failed_jobs:
                     st.error(
                         f"❌ Job Failed: {job['Job Name']} at {job['Run Date']} {job['Run Time']}")
-                    if job.get('Message'):
+                    if pd.notna(job.get('Message')) and job.get('Message'):
                         with st.expander("Error Details"):
                             st.text(job['Message'])
 
@@ -413,10 +407,18 @@ def render_table_monitor():
                                 save_column_config(selected_db, table, [])
 
             if st.button("Save Selected Tables", key="save_tables"):
+                save_min_rows = {}
+                save_max_rows = {}
+                save_min_match_counts = {}
+                save_column_configs_by_table = {}
                 for table_to_save in selected_tables_val:  # Iterate over the tables actually selected in the UI
                     # Row count thresholds
                     min_r = min_rows_dict.get(table_to_save)
                     max_r = max_rows_dict.get(table_to_save)
+                    if min_r is not None:
+                        save_min_rows[table_to_save] = min_r
+                    if max_r is not None:
+                        save_max_rows[table_to_save] = max_r
 
                     # Column min match count
                     # Retrieve from the number_input's current value via session_state
@@ -424,32 +426,26 @@ def render_table_monitor():
                         f"min_match_count_cols_{selected_db}_{table_to_save}", 1)
                     if col_min_match_c is None:  # Ensure it has a default if somehow not set
                         col_min_match_c = 1  # Default to 1 if not found
+                    save_min_match_counts[table_to_save] = col_min_match_c
 
                     # Column configs
                     enable_column_monitoring_for_save = st.session_state.get(
                         f"enable_columns_{table_to_save}", False)  # Get current state of checkbox
 
-                    current_column_configs_for_table = []
                     if enable_column_monitoring_for_save:
-                        # Reconstruct column_configs for THIS table based on session_state values of widgets
-                        # This is complex because threshold_settings[table]["column_configs"] was built during render
-                        # It's safer to rebuild from st.session_state if possible, or ensure threshold_settings is accurate.
-                        # For simplicity, we'll rely on threshold_settings which should be up-to-date from the render pass.
+                        # Rely on threshold_settings which is up-to-date from the render pass
                         current_column_configs_for_table = threshold_settings.get(
                             table_to_save, {}).get("column_configs", [])
+                        if current_column_configs_for_table:
+                            save_column_configs_by_table[table_to_save] = current_column_configs_for_table
+                    else:  # If checkbox is off, clear existing
+                        save_column_configs_by_table[table_to_save] = []
 
-                    save_table_config(selected_db, [table_to_save],
-                                      {table_to_save: min_r} if min_r is not None else {},
-                                      {table_to_save: max_r} if max_r is not None else {},
-                                      # Pass the new dict here
-                                      {table_to_save: col_min_match_c}
-                                      )
-
-                    if enable_column_monitoring_for_save and current_column_configs_for_table:
-                        save_column_config(
-                            selected_db, table_to_save, current_column_configs_for_table)
-                    elif not enable_column_monitoring_for_save:  # If checkbox is off, clear existing
-                        save_column_config(selected_db, table_to_save, [])
+                # One upsert batch per config table, all in a single transaction
+                save_table_and_column_configs(
+                    selected_db, selected_tables_val, save_column_configs_by_table,
+                    save_min_rows, save_max_rows, save_min_match_counts)
+                invalidate_dashboard_snapshot()
 
                 st.success("Configuration saved.")
                 # Reset edit state after save
@@ -457,6 +453,7 @@ def render_table_monitor():
                 st.session_state.edit_selected_tables = []
                 # Should already be false, but good to be sure
                 st.session_state.edit_trigger = False
+                clear_tab_cache()
                 st.experimental_rerun()  # Rerun to reflect saved changes and clear selections if needed
 
     results = []
@@ -488,8 +485,13 @@ def render_table_monitor():
                             row['table_name']: table_col_min_match
                         }
 
-                        check_result_df = check_selected_tables(
-                            row["db_name"], [row["table_name"]], table_min_dict, table_max_dict, table_col_min_match_dict)
+                        # Reused while the user stays on this tab; the key includes the
+                        # thresholds so edited settings are re-checked
+                        check_result_df = tab_cached(
+                            ("check", row["db_name"], row["table_name"],
+                             table_min, table_max, table_col_min_match),
+                            lambda: check_selected_tables(
+                                row["db_name"], [row["table_name"]], table_min_dict, table_max_dict, table_col_min_match_dict))
                         count = 0
                         status = "Error"
                         if not check_result_df.empty:
@@ -500,8 +502,10 @@ def render_table_monitor():
                             else:
                                 status = check_result_df.iloc[0]["Status"]
 
-                        size_info = get_table_size_info(
-                            row["db_name"], row["table_name"])
+                        size_info = tab_cached(
+                            ("size", row["db_name"], row["table_name"]),
+                            lambda: get_table_size_info(row["db_name"], row["table_name"]),
+                            ttl=300)
                         data_mb = size_info['data_kb'] / 1024
                         index_mb = size_info['index_kb'] / 1024
                         total_mb = data_mb + index_mb
@@ -533,13 +537,16 @@ def render_table_monitor():
                             st.session_state.edit_selected_tables = [
                                 row['table_name']]
                             st.session_state.edit_trigger = True  # Signal to set defaults in config section
+                            clear_tab_cache()
                             st.experimental_rerun()  # Rerun to repopulate config with selected table
                     with delete_col:
                         if st.button("🗑️", key=f"delete_table_{idx}", help="Delete table configuration", use_container_width=True):
                             delete_table_config(
                                 row['db_name'], row['table_name'])
+                            invalidate_dashboard_snapshot()
                             st.success(
                                 f"Configuration for {row['db_name']}.{row['table_name']} deleted.")
+                            clear_tab_cache()
                             st.experimental_rerun()
 
                     # After the buttons, check if details should be shown for this table
@@ -659,7 +666,7 @@ def render_job_monitor():
 
         with col1:
             st.subheader("Select Jobs to Monitor")
-            all_jobs = get_all_jobs()
+            all_jobs = tab_cached("all_jobs", get_all_jobs, ttl=5)
             saved_jobs = load_saved_job_config()
             saved_job_names = saved_jobs['job_name'].tolist(
             ) if not saved_jobs.empty else []
@@ -670,6 +677,7 @@ def render_job_monitor():
 
             if st.button("Save Selected Jobs", key="save_jobs"):
                 save_job_config(selected_jobs)
+                invalidate_dashboard_snapshot()
                 st.success("Job configuration saved.")
 
         with col2:
@@ -726,6 +734,8 @@ def render_job_monitor():
                         with delete_col:
                             if st.button("🗑️", key=f"remove_job_{idx}", help="Remove job from monitoring", use_container_width=True):
                                 delete_job_config(job_name_display)
+                                invalidate_dashboard_snapshot()
+                                clear_tab_cache()
                                 st.experimental_rerun()
 
                 # After the buttons, check if details should be shown for this job
@@ -741,6 +751,7 @@ def render_job_monitor():
                         render_job_details(row.get('Job Name'))
                         if st.button("Close Details", key=f"close_details_job_{idx}"):
                             st.session_state[current_job_session_key_for_expander] = False
+                            clear_tab_cache()
                             st.experimental_rerun()
 
                 # The "Detailed Status" DataFrame for jobs was here, inside col2. It will be moved.
@@ -767,7 +778,7 @@ def render_job_monitor():
 
     with tab2:
         st.subheader("Currently Running Jobs")
-        active_jobs = get_active_jobs()
+        active_jobs = tab_cached("active_jobs", get_active_jobs, ttl=5)
         if not active_jobs.empty:
             st.dataframe(active_jobs, use_container_width=True)
 
@@ -788,8 +799,9 @@ def render_job_monitor():
                 hours = st.slider("Time Range (hours)", 1, 72, 24)
                 show_anomalies = st.checkbox(
                     "Detect Duration Anomalies", value=True)
-                job_history = get_job_history(
-                    hours, detect_anomalies=show_anomalies)
+                job_history = tab_cached(
+                    ("job_history", hours, show_anomalies),
+                    lambda: get_job_history(hours, detect_anomalies=show_anomalies), ttl=5)
                 filtered_history = job_history[job_history['Job Name'].isin(
                     saved_jobs['job_name'])]
                 job_results = filtered_history.to_dict('records')
@@ -886,73 +898,163 @@ def render_job_monitor():
     return job_results
 
 
-def render_dashboard_view():
-    # --- Auto-refresh interval configuration ---
-    if 'refresh_interval' not in st.session_state:
-        st.session_state.refresh_interval = 30  # default 5 seconds
-    col_refresh, _, _ = st.columns([1, 1, 8])
-    with col_refresh:
-        refresh_interval = st.number_input(
-            "Auto-refresh interval (seconds)",
-            min_value=1,
-            max_value=3600,
-            value=st.session_state.refresh_interval,
-            step=1,
-            key="refresh_interval_input"
+def render_column_filters(db, table, key_prefix, where_sql=None, where_params=None):
+    """
+    Column filter widgets whose choices come from bounded SELECT DISTINCT queries.
+    Returns {column: [selected values]} for fetch_table_page to apply server-side.
+    """
+    filters = {}
+    col_filters = st.expander("Column Filters", expanded=False)
+    with col_filters:
+        filter_cols = st.multiselect(
+            "Filter by columns",
+            # text, xml, spatial and similar columns cannot be listed or compared
+            options=get_filterable_columns(db, table),
+            default=[],
+            key=f"{key_prefix}_filter_cols"
         )
-        st.session_state.refresh_interval = refresh_interval
-
-    st_autorefresh(interval=st.session_state.refresh_interval *
-                   1000, key="dashboard_autorefresh")
 
-    # --- Professional Last Updated Display ---
-    last_updated_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    st.markdown(f"""
-        <div style='display: flex; align-items: center; margin-bottom: 0.5rem;'>
-            <span style='font-size: 1.2rem; color: #888; font-weight: 500; margin-right: 0.5rem;'>🕒 Last updated:</span>
-            <span style='font-size: 1.3rem; color: #2b9348; font-weight: bold;'>{last_updated_time}</span>
-        </div>
-    """, unsafe_allow_html=True)
+        for col in filter_cols:
+            try:
+                # Choices reflect the filters already chosen on earlier columns
+                unique_vals, truncated = get_distinct_values(
+                    db, table, col, filters=dict(filters) or None,
+                    where_sql=where_sql, where_params=where_params)
+            except Exception as e:
+                st.error(f"Could not load values for {col}: {str(e)}")
+                continue
 
-    # --- Removed countdown and auto-refresh info for silent refresh ---
-    # Keep the rest of the dashboard as is
+            selected_vals = st.multiselect(
+                f"Select {col} values" +
+                (f" (first {len(unique_vals)} shown)" if truncated else ""),
+                options=unique_vals,
+                default=[],
+                format_func=lambda val: "NULL" if val is None else str(val),
+                key=f"{key_prefix}_filter_{col}"
+            )
+            if selected_vals:
+                filters[col] = selected_vals
+
+    return filters
+
+
+def render_table_drilldown(db, table, key_prefix, columns=None, where_sql=None, where_params=None):
+    """
+    Show one bounded page of a table's rows with Previous/Next paging.
+    Pages are fetched server-side by fetch_table_page, so memory and latency do not
+    depend on the table size.
+    """
+    # Each entry is where a visited page starts: a unique key for keyset
+    # paging, or a row offset for tables without one
+    pages_key = f"{key_prefix}_pages"
+    next_key = f"{key_prefix}_next"
+    if pages_key not in st.session_state:
+        st.session_state[pages_key] = [None]
+        st.session_state[next_key] = None
+
+    page_size = st.selectbox(
+        "Rows per page", [50, 100, 500, 1000], index=1, key=f"{key_prefix}_page_size",
+        on_change=lambda: st.session_state.update({pages_key: [None]}))
+
+    filters = render_column_filters(
+        db, table, key_prefix, where_sql=where_sql, where_params=where_params)
+    # Different filters select different rows, so paging starts over
+    filters_key = f"{key_prefix}_filters"
+    if st.session_state.get(filters_key) != filters:
+        st.session_state[filters_key] = filters
+        st.session_state[pages_key] = [None]
+
+    page_start = st.session_state[pages_key][-1]
+    try:
+        if isinstance(page_start, int):
+            df, after_key, has_more = fetch_table_page(
+                db, table, page_size=page_size, offset=page_start, columns=columns,
+                where_sql=where_sql, where_params=where_params, filters=filters)
+        else:
+            df, after_key, has_more = fetch_table_page(
+                db, table, page_size=page_size, after_key=page_start, columns=columns,
+                where_sql=where_sql, where_params=where_params, filters=filters)
+    except Exception as e:
+        st.error(f"Could not fetch rows for {db}.{table}: {str(e)}")
+        return
+
+    # Without a unique key to continue from, the next page starts at a row offset
+    if has_more:
+        st.session_state[next_key] = after_key if after_key is not None else \
+            (page_start or 0) + page_size
+    else:
+        st.session_state[next_key] = None
+
+    if df.empty:
+        st.info("No rows to display.")
+        return
+
+    st.dataframe(df, use_container_width=True)
+
+    def go_to_next_page():
+        if st.session_state[next_key] is not None:
+            st.session_state[pages_key].append(st.session_state[next_key])
+
+    def go_to_previous_page():
+        if len(st.session_state[pages_key]) > 1:
+            st.session_state[pages_key].pop()
+
+    page_number = len(st.session_state[pages_key])
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("⬅️ Previous", key=f"{key_prefix}_prev", on_click=go_to_previous_page,
+                  disabled=page_number == 1, use_container_width=True)
+    with page_col:
+        st.markdown(f"Page {page_number} ({len(df)} rows)")
+    with next_col:
+        st.button("Next ➡️", key=f"{key_prefix}_next_page", on_click=go_to_next_page,
+                  disabled=not has_more, use_container_width=True)
+
+
+# Default refresh intervals (seconds) of the independently refreshing dashboard panels
+DEFAULT_PANEL_INTERVALS = {
+    'metrics': 30,
+    'running_jobs': 5,
+    'failures': 30,
+}
+
+
+def fragment(run_every=None):
+    """
+    Decorator that turns a render function into a Streamlit fragment rerunning on its own
+    every run_every seconds. Falls back to a plain function on Streamlit versions without
+    fragments, where the panel then only refreshes with the whole page.
+    """
+    fragment_api = getattr(st, "fragment", None) or getattr(
+        st, "experimental_fragment", None)
+    if fragment_api is None:
+        return lambda func: func
+    return fragment_api(run_every=f"{run_every}s" if run_every else None)
+
+
+def get_monitored_job_names():
+    with phase("config load"):
+        saved_jobs = load_saved_job_config()
+    return saved_jobs['job_name'].tolist() if not saved_jobs.empty else []
 
-    st.markdown("""
-        <style>
-            .stMetricValue {
-                font-size: 4rem !important;
-            }
-            .stMetricLabel {
-                font-size: 1.2rem !important;
-            }
-            section[data-testid="stSidebar"] {
-                width: 350px !important;
-            }
-            .reportview-container .main .block-container {
-                padding-top: 0rem;
-                padding-bottom: 0rem;
-                max-width: 95%;
-            }
-        </style>
-    """, unsafe_allow_html=True)
 
-    # Get all monitored data
-    saved_tables = load_saved_table_config()
-    saved_jobs = load_saved_job_config()
-    all_jobs = get_all_jobs()
-    active_jobs = get_active_jobs()
-    job_history = get_job_history(24)  # Last 24 hours
+def render_job_metrics_panel():
+    monitored_job_names = get_monitored_job_names()
+    with phase("job queries"):
+        all_jobs = get_all_jobs()
+        active_jobs = get_active_jobs()
+        job_history = get_job_history(24)  # Last 24 hours
 
     # Job Statistics - Updated to only count monitored jobs
     monitored_jobs = all_jobs[all_jobs['Job Name'].isin(
-        saved_jobs['job_name'])] if not saved_jobs.empty else pd.DataFrame()
+        monitored_job_names)] if monitored_job_names else pd.DataFrame()
     running_jobs = len(active_jobs[active_jobs['Job Name'].isin(
-        saved_jobs['job_name'])]) if not active_jobs.empty else 0
+        monitored_job_names)]) if not active_jobs.empty else 0
 
-    if not job_history.empty and not saved_jobs.empty:
+    if not job_history.empty and monitored_job_names:
         # Filter job history to only include monitored jobs
         monitored_history = job_history[job_history['Job Name'].isin(
-            saved_jobs['job_name'])]
+            monitored_job_names)]
         recent_failed = len(
             monitored_history[monitored_history['Status'] == 'Failed'])
         recent_succeeded = len(
@@ -961,78 +1063,6 @@ def render_dashboard_view():
         recent_failed = 0
         recent_succeeded = 0
 
-    # Table Statistics
-    table_results_for_stats = []
-    if not saved_tables.empty:
-        for _, row in saved_tables.iterrows():
-            result_df = check_selected_tables(
-                row["db_name"], [row["table_name"]])
-            count = 0
-            status = "Error"
-            if not result_df.empty:
-                count = int(
-                    result_df.iloc[0]["Rows"]) if result_df.iloc[0]["Rows"].isdigit() else 0
-                if count == 0:  # Explicitly check for empty tables first
-                    status = "Empty"
-                else:
-                    status = result_df.iloc[0]["Status"]
-
-            size_info = get_table_size_info(row["db_name"], row["table_name"])
-            data_mb = size_info['data_kb'] / 1024
-            index_mb = size_info['index_kb'] / 1024
-            total_mb = data_mb + index_mb
-
-            table_results_for_stats.append({
-                'Database': row["db_name"],
-                'Table': row["table_name"],
-                'Row Count': count,
-                'Status': status,
-                'Data MB': round(data_mb, 2),
-                'Index MB': round(index_mb, 2),
-                'Total MB': round(total_mb, 2)
-            })
-
-    table_stats = pd.DataFrame(
-        table_results_for_stats) if table_results_for_stats else pd.DataFrame()
-
-    # Define status categories
-    ok_statuses = ['OK', 'OK-ColumnConditionMet']
-    # Keywords to identify warning/empty statuses
-    warning_keywords = ['Warn', 'Empty']
-
-    healthy_tables_count = 0
-    warning_tables_count = 0
-    error_tables_count = 0
-
-    if not table_stats.empty:
-        healthy_tables_count = len(
-            table_stats[table_stats['Status'].isin(ok_statuses)])
-
-        # Count warning tables: contains a warning keyword, is not an error, and is not healthy
-        warning_tables_count = len(table_stats[
-            table_stats['Status'].apply(lambda x: isinstance(x, str) and any(keyword in x for keyword in warning_keywords)) &
-            ~table_stats['Status'].str.startswith('Error', na=False) &
-            ~table_stats['Status'].isin(ok_statuses)
-        ])
-        # Ensure 'Empty' tables that are not also 'Error' or 'OK' are counted as warnings if not already.
-        # The above logic should catch 'Empty' if it's not an error or OK.
-        # If an 'Empty' table could also be 'OK' or 'Error' by some logic, this might need refinement.
-        # For now, assuming 'Empty' is a type of warning if not an error.
-
-        error_tables_count = len(
-            table_stats[table_stats['Status'].str.startswith('Error', na=False)])
-
-        # Adjust healthy_tables_count if a table is counted in multiple categories (e.g. an empty table that is not an error or warning otherwise)
-        # The current logic tries to make categories exclusive.
-        # Total monitored tables
-        total_monitored_tables = len(table_stats)
-        # Sanity check: healthy + warning + error should ideally be <= total_monitored_tables
-        # If a table is e.g. 'Empty' and also 'Warn-ColumnConditionNotMet', it's one warning.
-        # The current warning_tables_count logic should handle this by checking for keywords.
-
-    # Dashboard Layout
-    st.markdown("## 📊 System Overview")
-
     # Job Metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -1047,8 +1077,19 @@ def render_dashboard_view():
         total_jobs = len(monitored_jobs) if not monitored_jobs.empty else 0
         st.metric("📋 Total Monitored Jobs", total_jobs)
 
-    # Table Metrics
-    st.markdown("---")
+
+def render_table_metrics_panel(table_stats):
+    healthy_tables_count = 0
+    warning_tables_count = 0
+    error_tables_count = 0
+
+    if not table_stats.empty:
+        # Status Category was classified when the snapshot was built
+        category_counts = table_stats['Status Category'].value_counts()
+        healthy_tables_count = int(category_counts.get('Healthy', 0))
+        warning_tables_count = int(category_counts.get('Warning', 0))
+        error_tables_count = int(category_counts.get('Error', 0))
+
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("✅ Healthy Tables", healthy_tables_count)
@@ -1061,14 +1102,17 @@ def render_dashboard_view():
                   delta=f"{error_tables_count} tables" if error_tables_count > 0 else None,
                   delta_color="inverse")
 
-    # Active Jobs Section
-    st.markdown("---")
+
+def render_running_jobs_panel():
     st.markdown("### 🔄 Currently Running Jobs")
+    with phase("job queries"):
+        active_jobs = get_active_jobs()
     if not active_jobs.empty:
         # Filter to only show monitored jobs
-        if not saved_jobs.empty:
+        monitored_job_names = get_monitored_job_names()
+        if monitored_job_names:
             active_jobs = active_jobs[active_jobs['Job Name'].isin(
-                saved_jobs['job_name'])]
+                monitored_job_names)]
 
         if not active_jobs.empty:
             for _, job in active_jobs.iterrows():
@@ -1095,12 +1139,11 @@ def render_dashboard_view():
     else:
         st.info("No jobs are currently running")
 
-    # Recent Problems Section
-    st.markdown("---")
-    # Removed st.columns(2) for vertical layout
 
-    # Recent Job Failures
+def render_recent_failures_panel():
     st.markdown("### ❌ Recent Job Failures")
+    with phase("job queries"):
+        job_history = get_job_history(24)  # Last 24 hours
     if not job_history.empty:
         failed_jobs = job_history[job_history['Status'] == 'Failed'].head(
             5)
@@ -1113,13 +1156,12 @@ def render_dashboard_view():
     else:
         st.info("No recent job failures to display.")
 
-    st.markdown("---")  # Adding a separator for clarity
 
-    # Table Issues
+def render_table_issues_panel(table_stats):
     st.markdown("### ⚠️ Table Issues")
     if not table_stats.empty:
         # Filter for tables that are not 'OK' or 'OK-ColumnConditionMet'
-        issue_tables = table_stats[~table_stats['Status'].isin(ok_statuses)]
+        issue_tables = table_stats[table_stats['Status Category'] != 'Healthy']
         if not issue_tables.empty:
             # Add filters at the top of the Table Issues section
             filter_col1, filter_col2 = st.columns(2)
@@ -1141,7 +1183,7 @@ def render_dashboard_view():
                 )
 
             # Apply filters
-            filtered_tables = issue_tables.copy()
+            filtered_tables = issue_tables
             if status_filter:
                 filtered_tables = filtered_tables[filtered_tables['Status'].isin(
                     status_filter)]
@@ -1167,129 +1209,35 @@ def render_dashboard_view():
                         cursor.execute(query_count)
                         affected_count = cursor.fetchone()[0]
                         warning_message += f" ({affected_count} unprocessed records)"
-
-                        # Then get the actual rows with correct columns
-                        if affected_count > 0:
-                            query_rows = """
-                            SELECT MoveFramesID, FrameNumber, ShopOrderNumber, MoveDate, 
-                                   CAST(MoveDate AS DATE) as MoveDateOnly, Processed
-                            FROM [{0}].[dbo].[{1}] 
-                            WHERE CAST(MoveDate AS DATE) = CAST(GETDATE() AS DATE)
-                            AND Processed = 0
-                            ORDER BY MoveDate DESC
-                            """.format(table['Database'], table['Table'])
-                            df = pd.read_sql(query_rows, conn)
-
-                            # Add column filtering
-                            if not df.empty:
-                                st.warning(warning_message)
-
-                                # Add column filters
-                                col_filters = st.expander(
-                                    "Column Filters", expanded=False)
-                                with col_filters:
-                                    filter_cols = st.multiselect(
-                                        "Filter by columns",
-                                        options=df.columns.tolist(),  # Convert to list
-                                        default=[]
-                                    )
-
-                                    filtered_df = df.copy()
-                                    for col in filter_cols:
-                                        if col in df.columns:
-                                            # Convert unique values to list and handle non-string types
-                                            unique_vals = df[col].unique()
-                                            if not isinstance(unique_vals[0], str):
-                                                unique_vals = [
-                                                    str(val) for val in unique_vals]
-                                            else:
-                                                unique_vals = unique_vals.tolist()
-
-                                            selected_vals = st.multiselect(
-                                                f"Select {col} values",
-                                                options=unique_vals,
-                                                default=unique_vals
-                                            )
-
-                                            # Convert selected values to appropriate type for comparison
-                                            if not isinstance(df[col].iloc[0], str):
-                                                selected_vals = [type(df[col].iloc[0])(
-                                                    val) for val in selected_vals]
-
-                                            filtered_df = filtered_df[filtered_df[col].isin(
-                                                selected_vals)]
-
-                                    st.dataframe(
-                                        filtered_df, use_container_width=True)
                     finally:
                         if cursor:
                             cursor.close()
                         if conn:
                             conn.close()
+
+                    # Then page through the actual rows instead of loading them all
+                    if affected_count > 0:
+                        st.warning(warning_message)
+                        render_table_drilldown(
+                            table['Database'], table['Table'],
+                            key_prefix=f"drill_{table['Database']}_{table['Table']}",
+                            columns=["MoveFramesID", "FrameNumber",
+                                     "ShopOrderNumber", "MoveDate", "Processed"],
+                            where_sql="CAST(MoveDate AS DATE) = CAST(GETDATE() AS DATE) AND Processed = 0"
+                        )
                 elif table['Status'] == "Empty":
                     warning_message += " (0 rows)"
                     st.warning(warning_message)
                 elif "LowCount" in table['Status'] or "HighCount" in table['Status']:
-                    conn = get_connection(table['Database'])
-                    try:
-                        query = f"""
-                        SELECT * 
-                        FROM [{table['Database']}].[dbo].[{table['Table']}]
-                        {'TOP 1000' if 'HighCount' in table['Status'] else ''}
-                        """
-                        df = pd.read_sql(query, conn)
-
-                        if "LowCount" in table['Status']:
-                            warning_message += f" (Current: {table['Row Count']} rows, Required: {table['Min Rows']} rows)"
-                        else:
-                            warning_message += f" (Current: {table['Row Count']} rows, Maximum: {table['Max Rows']} rows)"
-
-                        st.warning(warning_message)
-
-                        # Add column filters
-                        if not df.empty:
-                            col_filters = st.expander(
-                                "Column Filters", expanded=False)
-                            with col_filters:
-                                filter_cols = st.multiselect(
-                                    "Filter by columns",
-                                    options=df.columns.tolist(),  # Convert to list
-                                    default=[]
-                                )
-
-                                filtered_df = df.copy()
-                                for col in filter_cols:
-                                    if col in df.columns:
-                                        # Convert unique values to list and handle non-string types
-                                        unique_vals = df[col].unique()
-                                        if not isinstance(unique_vals[0], str):
-                                            unique_vals = [
-                                                str(val) for val in unique_vals]
-                                        else:
-                                            unique_vals = unique_vals.tolist()
-
-                                        selected_vals = st.multiselect(
-                                            f"Select {col} values",
-                                            options=unique_vals,
-                                            default=unique_vals
-                                        )
-
-                                        # Convert selected values to appropriate type for comparison
-                                        if not isinstance(df[col].iloc[0], str):
-                                            selected_vals = [type(df[col].iloc[0])(
-                                                val) for val in selected_vals]
-
-                                        filtered_df = filtered_df[filtered_df[col].isin(
-                                            selected_vals)]
-
-                            st.dataframe(
-                                filtered_df, use_container_width=True)
+                    if "LowCount" in table['Status']:
+                        warning_message += f" (Current: {table['Row Count']} rows, Required: {table['Min Rows']} rows)"
+                    else:
+                        warning_message += f" (Current: {table['Row Count']} rows, Maximum: {table['Max Rows']} rows)"
 
-                            if "HighCount" in table['Status'] and int(table['Row Count']) > 1000:
-                                st.info("Showing first 1000 rows only")
-                    finally:
-                        if conn:
-                            conn.close()
+                    st.warning(warning_message)
+                    render_table_drilldown(
+                        table['Database'], table['Table'],
+                        key_prefix=f"drill_{table['Database']}_{table['Table']}")
                 elif "Error" in table['Status']:
                     warning_message += f" (Error accessing table)"
                     st.error(warning_message)
@@ -1300,11 +1248,280 @@ def render_dashboard_view():
             st.info("No tables being monitored")
 
 
+def render_slowest_checks_panel():
+    """Where SQL Server time goes: per monitored object, per query function, slowest calls"""
+    since = datetime.fromtimestamp(telemetry_since()).strftime('%Y-%m-%d %H:%M:%S')
+    col_caption, col_reset = st.columns([5, 1])
+    with col_caption:
+        st.caption(f"SQL Server time spent by this server since {since}, including "
+                   f"connection setup. Jobs are listed under msdb.")
+    with col_reset:
+        # Cleared before the tables below are drawn, so this run already shows it
+        if st.button("Reset", key="reset_query_telemetry"):
+            reset_telemetry()
+
+    objects = object_costs(limit=20)
+    if objects.empty:
+        st.info("No SQL Server calls recorded yet")
+        return
+    st.markdown("**Monitored objects**")
+    st.dataframe(objects, use_container_width=True, hide_index=True)
+    st.markdown("**Query functions**")
+    st.dataframe(function_costs(), use_container_width=True, hide_index=True)
+
+    slow_queries = get_slow_queries(hours_back=24)
+    if not slow_queries.empty:
+        st.markdown("**Slowest sampled calls (24h)**")
+        st.dataframe(slow_queries, use_container_width=True, hide_index=True)
+
+
+def render_dashboard_view():
+    # --- Auto-refresh interval configuration ---
+    if 'refresh_interval' not in st.session_state:
+        st.session_state.refresh_interval = 30  # default 5 seconds
+    if 'panel_intervals' not in st.session_state:
+        st.session_state.panel_intervals = dict(DEFAULT_PANEL_INTERVALS)
+    col_refresh, col_panels, _ = st.columns([1, 2, 7])
+    with col_refresh:
+        refresh_interval = st.number_input(
+            "Auto-refresh interval (seconds)",
+            min_value=1,
+            max_value=3600,
+            value=st.session_state.refresh_interval,
+            step=1,
+            key="refresh_interval_input",
+            help="Full refresh, including every table check"
+        )
+        st.session_state.refresh_interval = refresh_interval
+    with col_panels:
+        with st.expander("Panel refresh intervals"):
+            for panel, label in [('metrics', "Job metrics"),
+                                 ('running_jobs', "Running jobs"),
+                                 ('failures', "Recent failures")]:
+                st.session_state.panel_intervals[panel] = st.number_input(
+                    f"{label} (seconds)",
+                    min_value=1,
+                    max_value=3600,
+                    value=st.session_state.panel_intervals[panel],
+                    step=1,
+                    key=f"panel_interval_{panel}"
+                )
+
+    # The full rerun re-checks every table; faster panels below refresh on their own.
+    # Never tick faster than recent collection cycles can keep up with.
+    effective_interval = refresh_governor.effective_interval(
+        st.session_state.refresh_interval)
+    st_autorefresh(interval=effective_interval *
+                   1000, key="dashboard_autorefresh")
+
+    cycle_stats = refresh_governor.stats()
+    cycle_cost = f"{cycle_stats['last_duration']:.1f}s" if cycle_stats['last_duration'] is not None else "n/a"
+    refresh_note = f"⏱️ Effective refresh: every {effective_interval}s · Last cycle cost: {cycle_cost}"
+    if effective_interval > st.session_state.refresh_interval:
+        refresh_note += f" (raised from {st.session_state.refresh_interval}s to stay above recent cycle times)"
+    if cycle_stats['running_for'] is not None:
+        refresh_note += f" · Cycle running for {cycle_stats['running_for']:.0f}s"
+    if cycle_stats['skipped_ticks']:
+        refresh_note += f" · Skipped ticks: {cycle_stats['skipped_ticks']}"
+    st.caption(refresh_note)
+
+    # --- Professional Last Updated Display ---
+    last_updated_time = st.session_state.dashboard_snapshot.collected_at
+    if st.session_state.dashboard_snapshot.restored:
+        st.warning(
+            f"Showing the last saved snapshot from {last_updated_time} while fresh checks run in the background.")
+    st.markdown(f"""
+        <div style='display: flex; align-items: center; margin-bottom: 0.5rem;'>
+            <span style='font-size: 1.2rem; color: #888; font-weight: 500; margin-right: 0.5rem;'>🕒 Last updated:</span>
+            <span style='font-size: 1.3rem; color: #2b9348; font-weight: bold;'>{last_updated_time}</span>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+        <style>
+            .stMetricValue {
+                font-size: 4rem !important;
+            }
+            .stMetricLabel {
+                font-size: 1.2rem !important;
+            }
+            section[data-testid="stSidebar"] {
+                width: 350px !important;
+            }
+            .reportview-container .main .block-container {
+                padding-top: 0rem;
+                padding-bottom: 0rem;
+                max-width: 95%;
+            }
+        </style>
+    """, unsafe_allow_html=True)
+
+    # Table results were already checked by render_ui for this run; reuse the shared
+    # snapshot instead of checking every table a second time
+    table_stats = st.session_state.dashboard_snapshot.tables
+
+    intervals = st.session_state.panel_intervals
+
+    # Dashboard Layout
+    st.markdown("## 📊 System Overview")
+    fragment(intervals['metrics'])(render_job_metrics_panel)()
+
+    st.markdown("---")
+    render_table_metrics_panel(table_stats)
+
+    st.markdown("---")
+    fragment(intervals['running_jobs'])(render_running_jobs_panel)()
+
+    st.markdown("---")
+    fragment(intervals['failures'])(render_recent_failures_panel)()
+
+    st.markdown("---")  # Adding a separator for clarity
+    render_table_issues_panel(table_stats)
+
+    st.markdown("---")
+    with st.expander("🐢 Slowest checks"):
+        render_slowest_checks_panel()
+
+
+def render_alert_log_page(page_size, alert_type, status, hours_back, source_prefix):
+    """Fetch and paginate the newest-first alert list; returns the current page"""
+    # The cursor stack holds the start cursor of every page visited so far;
+    # changing any filter starts again from the newest alert.
+    filter_signature = (alert_type, status, hours_back, source_prefix)
+    if st.session_state.get("alert_page_filters") != filter_signature:
+        st.session_state.alert_page_filters = filter_signature
+        st.session_state.alert_page_cursors = [None]
+        st.session_state.alert_next_cursor = None
+
+    def go_to_next_page():
+        if st.session_state.alert_next_cursor:
+            st.session_state.alert_page_cursors.append(
+                st.session_state.alert_next_cursor)
+
+    def go_to_previous_page():
+        if len(st.session_state.alert_page_cursors) > 1:
+            st.session_state.alert_page_cursors.pop()
+
+    # Get one page of alerts based on filters
+    alerts, next_cursor = get_alerts_page(
+        page_size=page_size,
+        cursor=st.session_state.alert_page_cursors[-1],
+        alert_type=alert_type,
+        status=status,
+        hours_back=hours_back,
+        source_prefix=source_prefix or None
+    )
+    st.session_state.alert_next_cursor = next_cursor
+
+    page_number = len(st.session_state.alert_page_cursors)
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("⬅️ Newer", key="alert_prev_page", on_click=go_to_previous_page,
+                  disabled=page_number == 1, use_container_width=True)
+    with page_col:
+        st.markdown(f"Page {page_number}")
+    with next_col:
+        st.button("Older ➡️", key="alert_next_page", on_click=go_to_next_page,
+                  disabled=next_cursor is None, use_container_width=True)
+
+    return alerts
+
+
+def render_alert_search_page(search_text, page_size, alert_type, status, hours_back, source_prefix):
+    """Run a ranked full-text search over the alert log; returns the current page of hits"""
+    # Same cursor stack as render_alert_log_page, with (rank, id) cursors
+    search_signature = (search_text, alert_type, status, hours_back, source_prefix)
+    if st.session_state.get("alert_search_signature") != search_signature:
+        st.session_state.alert_search_signature = search_signature
+        st.session_state.alert_search_cursors = [None]
+        st.session_state.alert_search_next_cursor = None
+
+    def go_to_next_page():
+        if st.session_state.alert_search_next_cursor:
+            st.session_state.alert_search_cursors.append(
+                st.session_state.alert_search_next_cursor)
+
+    def go_to_previous_page():
+        if len(st.session_state.alert_search_cursors) > 1:
+            st.session_state.alert_search_cursors.pop()
+
+    hits, next_cursor = search_alerts(
+        search_text,
+        page_size=page_size,
+        cursor=st.session_state.alert_search_cursors[-1],
+        alert_type=alert_type,
+        status=status,
+        hours_back=hours_back,
+        source_prefix=source_prefix or None
+    )
+    st.session_state.alert_search_next_cursor = next_cursor
+
+    page_number = len(st.session_state.alert_search_cursors)
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("⬅️ Better matches", key="alert_search_prev_page", on_click=go_to_previous_page,
+                  disabled=page_number == 1, use_container_width=True)
+    with page_col:
+        st.markdown(f"Search results page {page_number}")
+    with next_col:
+        st.button("More matches ➡️", key="alert_search_next_page", on_click=go_to_next_page,
+                  disabled=next_cursor is None, use_container_width=True)
+
+    if not hits.empty:
+        with st.expander("Matching text", expanded=True):
+            for _, hit in hits.iterrows():
+                st.markdown(
+                    f"**#{hit['id']}** {hit['source_name']} ({hit['status']}): {hit['snippet']}")
+
+    return hits
+
+
+def render_table_trends():
+    st.header("📈 Table Trends")
+
+    saved_tables = load_saved_table_config()
+    if saved_tables.empty:
+        st.info("No tables are being monitored yet.")
+        return
+
+    table_options = [f"{row.db_name}.{row.table_name}"
+                     for row in saved_tables.itertuples()]
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        selected = st.selectbox(
+            "Table", range(len(table_options)),
+            format_func=lambda i: table_options[i], key="trend_table")
+    with col2:
+        range_label = st.selectbox(
+            "Range", list(TREND_RANGES), key="trend_range")
+
+    db_name = saved_tables.iloc[selected]["db_name"]
+    table_name = saved_tables.iloc[selected]["table_name"]
+    # Each series is capped at MAX_TREND_POINTS points, however long the range
+    row_counts, sizes = get_table_trends(
+        db_name, table_name, TREND_RANGES[range_label])
+
+    if row_counts.empty and sizes.empty:
+        st.info("No checks have been logged for this table in the selected range.")
+        return
+
+    st.subheader("Row Count")
+    if not row_counts.empty:
+        st.line_chart(row_counts.set_index("check_time")[
+                      "row_count"], use_container_width=True)
+    st.subheader("Size (MB)")
+    if not sizes.empty:
+        st.line_chart(sizes.set_index("check_time")[
+                      "total_mb"], use_container_width=True)
+    else:
+        st.info("No size samples logged for this table yet.")
+
+
 def render_alert_log():
     st.header("🚨 Alert Log")
 
     # Filters for the alert log
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         alert_type_filter = st.selectbox(
             "Alert Type",
@@ -1324,8 +1541,13 @@ def render_alert_log():
             ["All Time", "Last 24 Hours", "Last 7 Days", "Last 30 Days"],
             key="time_filter"
         )
+    with col4:
+        source_prefix = st.text_input(
+            "Source starts with",
+            key="alert_source_prefix_filter"
+        ).strip()
 
-    # Convert filter selections to parameters for get_alerts
+    # Convert filter selections to parameters for get_alerts_page
     alert_type = None if alert_type_filter == "All" else alert_type_filter
     status = None if status_filter == "All" else status_filter
 
@@ -1337,13 +1559,20 @@ def render_alert_log():
     elif time_filter == "Last 30 Days":
         hours_back = 24 * 30
 
-    # Get alerts based on filters
-    alerts = get_alerts(
-        limit=100,
-        alert_type=alert_type,
-        status=status,
-        hours_back=hours_back
-    )
+    page_size = 100
+
+    search_text = st.text_input(
+        "🔎 Search alert messages and details",
+        key="alert_search_text",
+        placeholder="e.g. timeout, MoveFrames, deadlock"
+    ).strip()
+
+    if search_text:
+        alerts = render_alert_search_page(
+            search_text, page_size, alert_type, status, hours_back, source_prefix)
+    else:
+        alerts = render_alert_log_page(
+            page_size, alert_type, status, hours_back, source_prefix)
 
     if alerts.empty:
         st.info("No alerts found for the selected filters.")
@@ -1395,11 +1624,62 @@ def render_alert_log():
                 f"Missing required columns in alert data: {', '.join(missing_columns)}")
 
 
+def render_config_import_export():
+    st.header("📦 Import / Export")
+
+    st.subheader("Export")
+    export_format = st.radio(
+        "Format", ["yaml", "csv"], horizontal=True, key="config_export_format")
+    try:
+        st.download_button(
+            "Download Configuration",
+            data=dump_config(export_config(), export_format),
+            file_name=f"sql_monitor_config.{export_format}",
+            mime="text/csv" if export_format == "csv" else "application/x-yaml",
+            key="config_export_download"
+        )
+    except RuntimeError as e:
+        st.error(str(e))
+
+    st.subheader("Import")
+    st.info("Upload a YAML or CSV file to preview changes before applying them in one transaction.")
+    uploaded_file = st.file_uploader(
+        "Configuration file", type=["yaml", "yml", "csv"], key="config_import_file")
+    replace = st.checkbox(
+        "Replace: remove tables, columns and jobs that are not in the file",
+        key="config_import_replace")
+    check_server = st.checkbox(
+        "Validate names against SQL Server", value=True, key="config_import_check_server")
+
+    if uploaded_file is None:
+        return
+
+    try:
+        config = parse_config(uploaded_file.getvalue().decode(
+            "utf-8"), format_for_path(uploaded_file.name))
+        errors = validate_config(config, check_server=check_server)
+        diff_lines = format_diff(diff_config(config, replace=replace))
+    except driver_error() as e:
+        st.error(f"Could not validate names against SQL Server: {str(e)}")
+        return
+    except (ValueError, KeyError, RuntimeError) as e:
+        st.error(f"Could not read configuration file: {str(e)}")
+        return
+
+    st.markdown("**Dry run**")
+    st.code("\n".join(diff_lines), language=None)
+
+    if errors:
+        st.error(f"{len(errors)} validation error(s); nothing will be applied.")
+        st.text("\n".join(errors))
+    elif st.button("Apply Configuration", key="config_import_apply"):
+        import_config(config, replace=replace)
+        invalidate_dashboard_snapshot()
+        clear_tab_cache()
+        st.success("Configuration imported.")
+
+
 def init_session_state():
-    if 'table_results' not in st.session_state:
-        st.session_state.table_results = []
-    if 'job_results' not in st.session_state:
-        st.session_state.job_results = []
     if 'view_mode' not in st.session_state:
         st.session_state.view_mode = "📺 Dashboard View"
     if 'last_refresh' not in st.session_state:
@@ -1439,235 +1719,114 @@ def render_ui():
             ["📺 Dashboard View", "⚙️ Configuration"],
             index=0 if st.session_state.view_mode == "📺 Dashboard View" else 1
         )
+        # Forced on for every session by SQLMON_PROFILE=1
+        profiling = st.checkbox(
+            "🔬 Profile reruns", value=profiling_enabled_by_env(), key="profile_reruns",
+            disabled=profiling_enabled_by_env(),
+            help="Profile each full rerun and show the slowest phases and functions")
+
+    with profile_run(st.session_state.view_mode, profiling) as run:
+        if st.session_state.view_mode == "📺 Dashboard View":
+            # Get latest data for dashboard
+            snapshot = get_dashboard_snapshot(
+                st.session_state.get('refresh_interval', 30))
+
+            # Sessions share the snapshot; keep only a reference and its version
+            st.session_state.dashboard_snapshot = snapshot
+            st.session_state.dashboard_snapshot_version = snapshot.version
+
+            # Show notifications and render dashboard
+            show_notifications(snapshot.tables, snapshot.jobs)
+            render_dashboard_view()
+        else:
+            render_config_view()
 
-    if st.session_state.view_mode == "📺 Dashboard View":
-        # Get latest data for dashboard
-        table_results = get_latest_table_results()
-        job_results = get_latest_job_results()
+    if run is not None:
+        st.markdown("---")
+        with st.expander("🔬 Rerun profiles", expanded=True):
+            render_profile_panel()
 
-        # Update session state
-        st.session_state.table_results = table_results
-        st.session_state.job_results = job_results
 
-        # Show notifications and render dashboard
-        show_notifications(table_results, job_results)
-        render_dashboard_view()
-    else:
-        render_config_view()
+def render_profile_panel():
+    """Phase breakdown of the stored profiled reruns and the hotspots of one of them"""
+    runs = get_profile_runs()
+    if runs.empty:
+        st.info("No profiled reruns stored yet")
+        return
 
+    st.caption("Milliseconds per phase of the most recent profiled reruns, newest first. "
+               "Table checks running on worker threads count as time waited for them.")
+    st.dataframe(runs, use_container_width=True, hide_index=True)
 
-def render_config_view():
-    st.header("⚙️ Configuration")
+    run_id = st.selectbox(
+        "Run", runs["id"].tolist(), key="profile_run_id",
+        format_func=lambda i: f"#{i} · {runs.loc[runs['id'] == i, 'profiled_at'].iloc[0]} · "
+                              f"{runs.loc[runs['id'] == i, 'total_ms'].iloc[0]:.0f} ms")
+    hotspots, profile = get_profile_run(run_id)
+    if hotspots is None:
+        st.info("That run has been rotated out")
+        return
+    st.markdown("**Hotspots by own time**")
+    st.dataframe(hotspots, use_container_width=True, hide_index=True)
+    st.download_button(
+        "Download .prof", profile_file_bytes(profile), file_name=f"rerun_{run_id}.prof",
+        help="Open with python -m pstats or snakeviz")
 
-    tab1, tab2, tab3 = st.tabs(
-        ["📊 Table Monitor", "🔄 Job Monitor", "🚨 Alert Log"])
 
-    with tab1:
-        table_results = render_table_monitor()
-        st.session_state.table_results = table_results
+CONFIG_TABS = ["📊 Table Monitor", "🔄 Job Monitor",
+               "🚨 Alert Log", "📈 Trends", "📦 Import / Export"]
 
-    with tab2:
-        job_results = render_job_monitor()
-        st.session_state.job_results = job_results
 
-    with tab3:
-        render_alert_log()
+# Seconds a tab value is reused for unless the call passes the TTL of its data source
+TAB_CACHE_TTL = 60
 
 
-def get_latest_table_results():
-    saved_tables = load_saved_table_config()
-    results = []
+def tab_cached(key, compute, ttl=TAB_CACHE_TTL):
+    """
+    Return the value computed for key while the user stays on the current
+    configuration tab, computing it on first use and again once it is ttl seconds old.
+    """
+    cache = st.session_state.setdefault('config_tab_cache', {})
+    entry = cache.get(key)
+    if entry is None or time.time() - entry[0] >= ttl:
+        entry = cache[key] = (time.time(), compute())
+    return entry[1]
 
-    if not saved_tables.empty:
-        for _, row in saved_tables.iterrows():
-            try:
-                # Get table specific thresholds
-                table_min = row['min_rows'] if pd.notna(
-                    row['min_rows']) else None
-                table_max = row['max_rows'] if pd.notna(
-                    row['max_rows']) else None
-                table_col_min_match = row['column_min_match_count'] if pd.notna(
-                    row['column_min_match_count']) else 1
-
-                table_min_dict = {
-                    row['table_name']: table_min} if table_min is not None else {}
-                table_max_dict = {
-                    row['table_name']: table_max} if table_max is not None else {}
-                table_col_min_match_dict = {
-                    row['table_name']: table_col_min_match}
-
-                # Get table status
-                check_result_df = check_selected_tables(
-                    row["db_name"], [row["table_name"]], table_min_dict, table_max_dict, table_col_min_match_dict)
-
-                count = 0
-                status = "Error"
-                if not check_result_df.empty:
-                    count = int(
-                        check_result_df.iloc[0]["Rows"]) if check_result_df.iloc[0]["Rows"].isdigit() else 0
-                    if count == 0:  # Explicitly check for empty tables first
-                        status = "Empty"
-                    else:
-                        status = check_result_df.iloc[0]["Status"]
-
-                # Get size info
-                size_info = get_table_size_info(
-                    row["db_name"], row["table_name"])
-                data_mb = size_info['data_kb'] / 1024
-                index_mb = size_info['index_kb'] / 1024
-                total_mb = data_mb + index_mb
-
-                results.append({
-                    'Database': row["db_name"],
-                    'Table': row["table_name"],
-                    'Row Count': count,
-                    'Status': status,
-                    'Min Rows': table_min if table_min is not None else "None",
-                    'Max Rows': table_max if table_max is not None else "None",
-                    'Data MB': round(data_mb, 2),
-                    'Index MB': round(index_mb, 2),
-                    'Total MB': round(total_mb, 2),
-                    'Last Check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
-
-                # Log check result to table_check_log
-                log_table_check_result(
-                    row["db_name"],
-                    row["table_name"],
-                    count,
-                    status
-                )
 
-                # Special handling for MoveFrames unprocessed records
-                if row["table_name"] == "MoveFrames":
-                    table_column_configs = load_column_config(
-                        row["db_name"], row["table_name"])
-                    if not table_column_configs.empty:
-                        # Check if we're monitoring Processed=0
-                        processed_config = table_column_configs[
-                            (table_column_configs["column_name"] == "Processed") &
-                            (table_column_configs["condition_value"] == "0")
-                        ]
-                        if not processed_config.empty:
-                            conn = get_connection(row["db_name"])
-                            cursor = conn.cursor()
-                            try:
-                                # Count unprocessed records for today
-                                query = """
-                                SELECT COUNT(*) 
-                                FROM [{0}].[dbo].[MoveFrames] 
-                                WHERE CAST(MoveDate AS DATE) = CAST(GETDATE() AS DATE)
-                                AND Processed = 0
-                                """.format(row["db_name"])
-                                cursor.execute(query)
-                                unprocessed_count = cursor.fetchone()[0]
-
-                                if unprocessed_count > 0:
-                                    status = "Warn-UnprocessedRecords"
-                                    details = f"Database: {row['db_name']}\n"
-                                    details += f"Table: {row['table_name']}\n"
-                                    details += f"Unprocessed Records: {unprocessed_count}\n"
-                                    details += f"Date: {datetime.now().strftime('%Y-%m-%d')}\n"
-
-                                    log_alert(
-                                        alert_type="Table",
-                                        source_type="Unprocessed Records",
-                                        source_name=f"{row['db_name']}.{row['table_name']}",
-                                        status=status,
-                                        message=f"Found {unprocessed_count} unprocessed records in {row['table_name']} for today",
-                                        details=details
-                                    )
-                            finally:
-                                if cursor:
-                                    cursor.close()
-                                if conn:
-                                    conn.close()
-
-                # Log alerts for other table issues
-                elif status != "OK":
-                    source_type = ""
-                    if status == "Empty":
-                        source_type = "Empty Table"
-                    elif status.startswith("Error"):
-                        source_type = "Table Error"
-                    elif status == "Warn-LowCount":
-                        source_type = "Low Row Count"
-                    elif status == "Warn-HighCount":
-                        source_type = "High Row Count"
-
-                    if source_type:
-                        details = f"Database: {row['db_name']}\n"
-                        details += f"Table: {row['table_name']}\n"
-                        details += f"Row Count: {count}\n"
-
-                        if status == "Warn-LowCount" and table_min is not None:
-                            details += f"Min Threshold: {table_min}\n"
-                        elif status == "Warn-HighCount" and table_max is not None:
-                            details += f"Max Threshold: {table_max}\n"
-
-                        log_alert(
-                            alert_type="Table",
-                            source_type=source_type,
-                            source_name=f"{row['db_name']}.{row['table_name']}",
-                            status=status,
-                            message=f"Table {row['db_name']}.{row['table_name']} has {status} status",
-                            details=details
-                        )
-            except Exception as e:
-                print(
-                    f"Error processing table {row['db_name']}.{row['table_name']}: {str(e)}")
-                continue
-
-    return results
-
-
-def get_latest_job_results():
-    saved_jobs = load_saved_job_config()
-    results = []
+def clear_tab_cache():
+    st.session_state.config_tab_cache = {}
 
-    if not saved_jobs.empty:
-        # Last 24 hours with anomaly detection
-        job_history = get_job_history(24, detect_anomalies=True)
-        filtered_history = job_history[job_history['Job Name'].isin(
-            saved_jobs['job_name'])]
-
-        # Log alerts for job issues
-        for _, job in filtered_history.iterrows():
-            # Log failed jobs
-            if job['Status'] == 'Failed':
-                details = f"Job Name: {job['Job Name']}\n"
-                details += f"Run Date: {job['Run Date']}\n"
-                details += f"Run Time: {job['Run Time']}\n"
-                details += f"Duration: {job['Duration']}\n"
-                details += f"Message: {job['Message']}\n"
-
-                log_alert(
-                    alert_type="Job",
-                    source_type="Failed Job",
-                    source_name=job['Job Name'],
-                    status="Failed",
-                    message=f"Job {job['Job Name']} failed at {job['Run Date']} {job['Run Time']}",
-                    details=details
-                )
 
-            # Log duration anomalies if present
-            if 'Duration Status' in job and job['Duration Status'] in ['Slow', 'Fast']:
-                details = f"Job Name: {job['Job Name']}\n"
-                details += f"Run Date: {job['Run Date']}\n"
-                details += f"Run Time: {job['Run Time']}\n"
-                details += f"Duration: {job['Duration']}\n"
-                details += f"Normal Duration: {job['Duration Status']}\n"
-                if 'Duration Seconds' in job:
-                    details += f"Duration in seconds: {job['Duration Seconds']}\n"
-
-                log_alert(
-                    alert_type="Job",
-                    source_type="Duration Anomaly",
-                    source_name=job['Job Name'],
-                    status=job['Duration Status'],
-                    message=f"Job {job['Job Name']} had abnormal duration ({job['Duration Status']}) at {job['Run Date']} {job['Run Time']}",
-                    details=details
-                )
+def render_config_view():
+    st.header("⚙️ Configuration")
 
-        return filtered_history.to_dict('records')
-    return []
+    # Unlike st.tabs, which runs every tab body on each rerun, only the
+    # selected section is rendered (and queried)
+    selected_tab = st.radio(
+        "Section", CONFIG_TABS, horizontal=True, key="config_tab",
+        label_visibility="collapsed")
+
+    # Cached tab data is only reused while the user stays on the same tab
+    if st.session_state.get('config_tab_cache_owner') != selected_tab:
+        st.session_state.config_tab_cache_owner = selected_tab
+        clear_tab_cache()
+    # ... and until new checks or alerts are logged
+    store_versions = get_store_versions()
+    if st.session_state.get('config_tab_cache_versions') != store_versions:
+        st.session_state.config_tab_cache_versions = store_versions
+        clear_tab_cache()
+
+    if selected_tab in (CONFIG_TABS[0], CONFIG_TABS[1]):
+        if st.button("🔄 Refresh", key="config_tab_refresh", help="Re-run checks and queries for this tab"):
+            clear_tab_cache()
+
+    if selected_tab == CONFIG_TABS[0]:
+        render_table_monitor()
+    elif selected_tab == CONFIG_TABS[1]:
+        render_job_monitor()
+    elif selected_tab == CONFIG_TABS[2]:
+        render_alert_log()
+    elif selected_tab == CONFIG_TABS[3]:
+        render_table_trends()
+    else:
+        render_config_import_export()